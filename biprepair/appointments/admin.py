@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import AdminUser, Appointment
+from .models import AdminUser, Appointment, DeviceBrand, DeviceModel, ServiceOffering, ServicePrice, StatusNotification
 
 
 @admin.register(AdminUser)
@@ -14,4 +14,34 @@ class AppointmentAdmin(admin.ModelAdmin):
     list_display = ('appointment_id', 'full_name', 'device_type', 'service_type', 'status', 'preferred_datetime')
     list_filter = ('device_type', 'status', 'location', 'created_at')
     search_fields = ('appointment_id', 'full_name', 'contact_number', 'brand_model')
-    readonly_fields = ('appointment_id', 'created_at', 'updated_at')
+    readonly_fields = ('appointment_id', 'created_at', 'updated_at', 'completed_at', 'version')
+
+
+@admin.register(StatusNotification)
+class StatusNotificationAdmin(admin.ModelAdmin):
+    list_display = ('appointment', 'status', 'recipient', 'state', 'created_at', 'sent_at')
+    list_filter = ('state', 'status')
+    search_fields = ('recipient', 'appointment__appointment_id')
+
+
+class DeviceModelInline(admin.TabularInline):
+    model = DeviceModel
+    extra = 0
+
+
+@admin.register(DeviceBrand)
+class DeviceBrandAdmin(admin.ModelAdmin):
+    list_display = ('label', 'code', 'device_type', 'position')
+    list_filter = ('device_type',)
+    inlines = [DeviceModelInline]
+
+
+class ServicePriceInline(admin.StackedInline):
+    model = ServicePrice
+
+
+@admin.register(ServiceOffering)
+class ServiceOfferingAdmin(admin.ModelAdmin):
+    list_display = ('label', 'code', 'device_type', 'position')
+    list_filter = ('device_type',)
+    inlines = [ServicePriceInline]
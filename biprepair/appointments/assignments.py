@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import generations
+from .models import AdminUser, Appointment
+
+
+def _claimable():
+    # Oldest first; appointments_queue_idx covers the filter and the order.
+    return Appointment.objects.filter(status=Appointment.STATUS_PENDING, assigned_to__isnull=True).order_by(
+        'created_at', 'id'
+    )
+
+
+def _assign(queryset, admin: AdminUser | None) -> int:
+    # update() sends no signals; the list pages show who holds each row.
+    now = timezone.now()
+    changed = queryset.update(assigned_to=admin, assigned_at=now if admin else None, updated_at=now)
+    if changed:
+        generations.bump_on_commit(generations.APPOINTMENTS)
+    return changed
+
+
+def _claim_skipping_locked(admin: AdminUser) -> int | None:
+    # Rows another claimer has locked are passed over rather than waited on,
+    # so concurrent claimers walk down the queue side by side.
+    with transaction.atomic():
+        pk = _claimable().select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+        if pk is not None:
+            _assign(Appointment.objects.filter(pk=pk), admin)
+    return pk
+
+
+def _claim_conditionally(admin: AdminUser) -> int | None:
+    # Without row locks (SQLite) the claim is a single UPDATE that only
+    # matches while the row is still unclaimed. Writers are serialized, so
+    # losing a row means another claimer took it; move on to the next one.
+    while True:
+        pk = _claimable().values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        if _assign(_claimable().filter(pk=pk), admin):
+            return pk
+
+
+def claim_next(admin: AdminUser) -> Appointment | None:
+    # Gives the oldest unassigned pending appointment to exactly one caller,
+    # however many technicians ask at once.
+    if connections[router.db_for_write(Appointment)].features.has_select_for_update_skip_locked:
+        pk = _claim_skipping_locked(admin)
+    else:
+        pk = _claim_conditionally(admin)
+    return None if pk is None else Appointment.objects.select_related('assigned_to').get(pk=pk)
+
+
+def claim(appointment: Appointment, admin: AdminUser) -> bool:
+    # Only succeeds while nobody else holds the appointment and it is still
+    # open; finished ones (completed, declined, ...) can't be picked up.
+    holders = Q(assigned_to__isnull=True) | Q(assigned_to=admin)
+    open_rows = Appointment.objects.filter(holders, pk=appointment.pk, status__in=Appointment.ACTIVE_STATUSES)
+    return bool(_assign(open_rows, admin))
+
+
+def release(appointment: Appointment, admin: AdminUser) -> bool:
+    return bool(_assign(Appointment.objects.filter(pk=appointment.pk, assigned_to=admin), None))
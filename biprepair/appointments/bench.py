@@ -0,0 +1,889 @@
+from __future__ import annotations
+
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from http.cookies import SimpleCookie
+from socketserver import ThreadingMixIn
+from urllib.parse import urlencode, urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import django
+from django.conf import settings
+from django.db import connection, connections
+from django.utils import timezone
+
+from .models import AdminUser, Appointment, ClientAccount, ContactMessage
+from .seeding import MESSAGE_TOPICS, DeviceCatalogSampler, ScaleDataSeeder, open_slot
+
+BENCH_PASSWORD = 'bench-pass-123'
+BENCH_ADMIN_USERNAME = 'bench-admin'
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+DEFAULT_MIX = {
+    'anonymous_home': 4,
+    'client_booking': 1,
+    'messenger_poll': 3,
+    'admin_triage': 2,
+}
+
+SUITES = {}
+
+
+# Built on first use: the sampler reads the catalog, which now means a
+# database query, and importing this module shouldn't need a database.
+@lru_cache(maxsize=None)
+def _catalog() -> DeviceCatalogSampler:
+    return DeviceCatalogSampler()
+
+
+def register_suite(name: str):
+    def decorator(func):
+        SUITES[name] = func
+        return func
+
+    return decorator
+
+
+class FlowError(Exception):
+    pass
+
+
+def seed_database(clients: int, appointments: int, threads: int, seed: int) -> dict:
+    seeder = ScaleDataSeeder(seed=seed, months=12, password=BENCH_PASSWORD, email_domain='bench.campus.test')
+    AdminUser.objects.create(username=BENCH_ADMIN_USERNAME, full_name='Bench Admin', password=seeder.password_hash)
+    seeder.seed_admins()
+    seeder.seed_clients(clients)
+    appointment_ids = seeder.seed_appointments(appointments)
+    messaging_emails = seeder.seed_threads(threads)
+    seeder.refresh_counters()
+    seeder.refresh_daily_stats()
+    client_emails = [client[1] for client in seeder.clients]
+    return {
+        'client_emails': client_emails,
+        'messaging_emails': messaging_emails or client_emails,
+        'appointment_ids': appointment_ids,
+    }
+
+
+@contextmanager
+def benchmark_database():
+    # A throwaway database built with the test runner's machinery. SQLite gets
+    # a real file so a gunicorn child process can open the same data.
+    old_name = connection.settings_dict['NAME']
+    tmpdir = None
+    if connection.vendor == 'sqlite':
+        tmpdir = tempfile.mkdtemp(prefix='repairhub-bench-')
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tmpdir, 'bench.sqlite3')
+    name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    env = {'SQLITE_PATH': name} if connection.vendor == 'sqlite' else {'MYSQL_DATABASE': name}
+    try:
+        yield env
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def in_process_server():
+    from django.core.wsgi import get_wsgi_application
+
+    httpd = make_server(
+        '127.0.0.1', 0, get_wsgi_application(), server_class=_ThreadingWSGIServer, handler_class=_QuietHandler
+    )
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    rate_limited, settings.RATELIMIT_ENABLED = settings.RATELIMIT_ENABLED, False
+    try:
+        yield f'http://127.0.0.1:{httpd.server_port}'
+    finally:
+        settings.RATELIMIT_ENABLED = rate_limited
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def gunicorn_server(
+    workers: int, env: dict, extra_args: list[str] | None = None, app: str = 'biprepair.wsgi:application'
+):
+    port = _free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', app,
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers),
+        '--log-level', 'warning',
+        *(extra_args or []),
+    ]
+    # Every simulated user comes from 127.0.0.1, which the login and lookup
+    # rate limits would otherwise throttle as a single client.
+    process = subprocess.Popen(
+        command, cwd=settings.BASE_DIR, env={**os.environ, 'RATELIMIT_ENABLED': 'false', **env}
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                raise FlowError(f'gunicorn exited with status {process.returncode}.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise FlowError('gunicorn did not start listening within 60s.')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.statuses: dict[str, dict[str, int]] = {}
+
+    def record(self, label: str, seconds: float, status: int, ok: bool) -> None:
+        with self._lock:
+            self.samples.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+            counts = self.statuses.setdefault(label, {})
+            counts[str(status)] = counts.get(str(status), 0) + 1
+
+
+class BenchSession:
+    # One browser: its own cookie jar, one connection per request (gunicorn's
+    # sync workers close the connection after every response anyway).
+    def __init__(self, base_url: str, recorder: Recorder):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.recorder = recorder
+        self.cookies: dict[str, str] = {}
+
+    def request(self, label: str, method: str, path: str, data: dict | None = None, expect=(200,)) -> str:
+        headers = {'Connection': 'close'}
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{key}={value}' for key, value in self.cookies.items())
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            self.recorder.record(label, time.perf_counter() - started, 0, False)
+            raise FlowError(f'{label}: {exc}') from exc
+        finally:
+            conn.close()
+        elapsed = time.perf_counter() - started
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for key, morsel in SimpleCookie(header).items():
+                if morsel['max-age'] == '0':
+                    self.cookies.pop(key, None)
+                else:
+                    self.cookies[key] = morsel.value
+        ok = response.status in expect
+        self.recorder.record(label, elapsed, response.status, ok)
+        if not ok:
+            raise FlowError(f'{label}: HTTP {response.status}')
+        return payload.decode('utf-8', 'replace')
+
+    def get(self, label: str, path: str, expect=(200,)) -> str:
+        return self.request(label, 'GET', path, expect=expect)
+
+    def post_form(self, label: str, path: str, page: str, data: dict, expect=(302,)) -> str:
+        match = CSRF_INPUT.search(page)
+        if not match:
+            raise FlowError(f'{label}: no CSRF token on the form page')
+        return self.request(label, 'POST', path, {**data, 'csrfmiddlewaretoken': match.group(1)}, expect=expect)
+
+
+def _client_login(session: BenchSession, email: str) -> None:
+    page = session.get('client_login GET', '/clients/login/')
+    session.post_form('client_login POST', '/clients/login/', page, {'email': email, 'password': BENCH_PASSWORD})
+
+
+def anonymous_home(user: dict, data: dict, rng: random.Random) -> None:
+    BenchSession(user['base_url'], user['recorder']).get('home', '/')
+
+
+def _booking_form(rng: random.Random) -> dict:
+    device_type, brand, model, service = _catalog().sample(rng)
+    return {
+        'full_name': 'Bench Client',
+        'contact_number': '09170000000',
+        'device_type': device_type,
+        'device_brand': brand,
+        'brand_model': model,
+        'service_type': service,
+        'issue_description': 'Cracked screen after a drop.',
+        'preferred_datetime': open_slot(rng, timezone.now()).strftime('%Y-%m-%dT%H:%M'),
+        'location': rng.choice(Appointment.LOCATION_CHOICES)[0],
+        'payment_method': Appointment.PAYMENT_PERSONAL,
+        'accept_booking_policies': 'on',
+    }
+
+
+def client_booking(user: dict, data: dict, rng: random.Random) -> None:
+    # A fresh visitor every time: sign in, book, land on the status page.
+    session = BenchSession(user['base_url'], user['recorder'])
+    _client_login(session, rng.choice(data['client_emails']))
+    page = session.get('book_appointment GET', '/book/')
+    session.post_form('book_appointment POST', '/book/', page, _booking_form(rng))
+    session.get('check_status', '/status/')
+
+
+def booking_burst(user: dict, data: dict, rng: random.Random) -> None:
+    # Write-heavy: a signed-in client that keeps booking and messaging without
+    # following the redirects, so nearly every request is an INSERT.
+    session = user.get('booking_burst')
+    if session is None:
+        session = user['booking_burst'] = BenchSession(user['base_url'], user['recorder'])
+        _client_login(session, rng.choice(data['client_emails']))
+        user['booking_page'] = session.get('book_appointment GET', '/book/')
+    page = user['booking_page']
+    for _ in range(3):
+        session.post_form('book_appointment POST', '/book/', page, _booking_form(rng))
+    session.post_form(
+        'contact_admin POST',
+        '/clients/contact/',
+        page,
+        {'subject': 'Messenger conversation', 'body': rng.choice(MESSAGE_TOPICS), 'preferred_contact': 'email'},
+    )
+
+
+def messenger_poll(user: dict, data: dict, rng: random.Random) -> None:
+    session = user.get('messenger_poll')
+    if session is None:
+        session = user['messenger_poll'] = BenchSession(user['base_url'], user['recorder'])
+        _client_login(session, rng.choice(data['messaging_emails']))
+    for _ in range(5):
+        session.get('contact_admin_history', '/clients/contact/history/')
+
+
+def admin_triage(user: dict, data: dict, rng: random.Random) -> None:
+    session = user.get('admin_triage')
+    if session is None:
+        session = user['admin_triage'] = BenchSession(user['base_url'], user['recorder'])
+        page = session.get('admin_login GET', '/admin/login/')
+        session.post_form(
+            'admin_login POST', '/admin/login/', page, {'username': BENCH_ADMIN_USERNAME, 'password': BENCH_PASSWORD}
+        )
+    status = rng.choice(['', Appointment.STATUS_PENDING, Appointment.STATUS_APPROVED])
+    session.get('admin_appointments', f'/admin/appointments/?status={status}' if status else '/admin/appointments/')
+    for appointment_id in rng.sample(data['appointment_ids'], min(3, len(data['appointment_ids']))):
+        session.get('admin_detail', f'/admin/appointments/{appointment_id}/')
+
+
+SCENARIOS = {
+    'anonymous_home': anonymous_home,
+    'client_booking': client_booking,
+    'messenger_poll': messenger_poll,
+    'admin_triage': admin_triage,
+    'booking_burst': booking_burst,
+}
+
+
+def parse_mix(value: str | None) -> dict[str, int]:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario "{name}". Choose from {", ".join(SCENARIOS)}.')
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def drive(base_url: str, mix: dict[str, int], data: dict, concurrency: int, duration: float, seed: int) -> tuple[Recorder, float, int]:
+    recorder = Recorder()
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    deadline = time.monotonic() + duration
+    failures = []
+
+    def virtual_user(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        user = {'base_url': base_url, 'recorder': recorder}
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            try:
+                SCENARIOS[name](user, data, rng)
+            except FlowError as exc:
+                failures.append(str(exc))
+                # Sign in again next time rather than reuse a broken session.
+                user.pop(name, None)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=virtual_user, args=(idx,), daemon=True) for idx in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return recorder, time.perf_counter() - started, len(failures)
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(recorder: Recorder, wall_seconds: float) -> dict:
+    endpoints = {}
+    for label, samples in sorted(recorder.samples.items()):
+        ordered = sorted(samples)
+        endpoints[label] = {
+            'requests': len(ordered),
+            'errors': recorder.errors.get(label, 0),
+            'throughput_rps': round(len(ordered) / wall_seconds, 2),
+            'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+            'p50_ms': round(_percentile(ordered, 50) * 1000, 2),
+            'p95_ms': round(_percentile(ordered, 95) * 1000, 2),
+            'p99_ms': round(_percentile(ordered, 99) * 1000, 2),
+            'max_ms': round(ordered[-1] * 1000, 2),
+            'status': recorder.statuses.get(label, {}),
+        }
+    total = sum(stats['requests'] for stats in endpoints.values())
+    return {
+        'endpoints': endpoints,
+        'totals': {
+            'requests': total,
+            'errors': sum(stats['errors'] for stats in endpoints.values()),
+            'throughput_rps': round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            'wall_seconds': round(wall_seconds, 2),
+        },
+    }
+
+
+def environment_info() -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'commit': commit,
+        'timestamp': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'debug': settings.DEBUG,
+        'cpus': os.cpu_count(),
+    }
+
+
+@register_suite('flows')
+def run_flows(options: dict, log) -> dict:
+    mix = parse_mix(options.get('mix'))
+    with benchmark_database() as db_env:
+        log(
+            f"Seeding {options['clients']} clients, {options['appointments']} appointments, "
+            f"{options['threads']} message threads..."
+        )
+        data = seed_database(options['clients'], options['appointments'], options['threads'], options['seed'])
+        if options['server'] == 'gunicorn':
+            server = gunicorn_server(options['workers'], db_env)
+        else:
+            server = in_process_server()
+        with server as base_url:
+            if options['warmup'] > 0:
+                log(f"Warming up for {options['warmup']}s...")
+                drive(base_url, mix, data, options['concurrency'], options['warmup'], options['seed'] + 1)
+            log(f"Running {options['duration']}s at concurrency {options['concurrency']} against {base_url}...")
+            recorder, wall, failures = drive(
+                base_url, mix, data, options['concurrency'], options['duration'], options['seed']
+            )
+    results = summarize(recorder, wall)
+    results['totals']['failed_flows'] = failures
+    results['config'] = {
+        key: options[key]
+        for key in ('server', 'workers', 'concurrency', 'duration', 'warmup', 'clients', 'appointments', 'threads', 'seed')
+    }
+    results['config']['mix'] = mix
+    return results
+
+
+# Each profile reaches the server two ways: env for a gunicorn child, and the
+# live settings for the in-process server and for the parent connection that
+# creates the database file (journal_mode=WAL is stored in the file itself).
+DB_PROFILES = {
+    'untuned': {'SQLITE_TUNING': 'false', 'DB_CONN_MAX_AGE': '0'},
+    'tuned': {'SQLITE_TUNING': 'true', 'DB_CONN_MAX_AGE': '60'},
+}
+
+
+@contextmanager
+def db_profile(name: str):
+    env = DB_PROFILES[name]
+    default = connections.settings['default']
+    saved = settings.SQLITE_PRAGMAS, default['CONN_MAX_AGE']
+    settings.SQLITE_PRAGMAS = saved[0] if env['SQLITE_TUNING'] == 'true' else {}
+    default['CONN_MAX_AGE'] = int(env['DB_CONN_MAX_AGE'])
+    try:
+        yield env
+    finally:
+        settings.SQLITE_PRAGMAS, default['CONN_MAX_AGE'] = saved
+
+
+@register_suite('sqlite-writers')
+def run_sqlite_writers(options: dict, log) -> dict:
+    if connection.vendor != 'sqlite':
+        raise ValueError('The sqlite-writers suite compares SQLite connection settings; run it without MYSQL_*.')
+    if not settings.SQLITE_PRAGMAS:
+        raise ValueError('Unset SQLITE_TUNING=false so the tuned profile has pragmas to apply.')
+    mix = parse_mix(options.get('mix') or 'booking_burst=1')
+    results = {'endpoints': {}, 'profiles': {}}
+    for name in DB_PROFILES:
+        with db_profile(name) as profile_env, benchmark_database() as db_env:
+            log(f'[{name}] Seeding...')
+            data = seed_database(options['clients'], options['appointments'], options['threads'], options['seed'])
+            if options['server'] == 'gunicorn':
+                server = gunicorn_server(options['workers'], {**db_env, **profile_env})
+            else:
+                server = in_process_server()
+            with server as base_url:
+                if options['warmup'] > 0:
+                    drive(base_url, mix, data, options['concurrency'], options['warmup'], options['seed'] + 1)
+                log(f"[{name}] Running {options['duration']}s at concurrency {options['concurrency']}...")
+                recorder, wall, failures = drive(
+                    base_url, mix, data, options['concurrency'], options['duration'], options['seed']
+                )
+        summary = summarize(recorder, wall)
+        summary['totals']['failed_flows'] = failures
+        results['profiles'][name] = summary['totals']
+        for label, stats in summary['endpoints'].items():
+            results['endpoints'][f'{name}: {label}'] = stats
+    tuned, untuned = results['profiles']['tuned'], results['profiles']['untuned']
+    results['totals'] = dict(tuned)
+    results['totals']['speedup'] = (
+        round(tuned['throughput_rps'] / untuned['throughput_rps'], 2) if untuned['throughput_rps'] else 0.0
+    )
+    results['config'] = {
+        key: options[key]
+        for key in ('server', 'workers', 'concurrency', 'duration', 'warmup', 'clients', 'appointments', 'threads', 'seed')
+    }
+    results['config']['mix'] = mix
+    return results
+
+
+STARTUP_PROFILES = {
+    'cold': {'GUNICORN_PRELOAD': 'false', 'WARMUP_ON_LOAD': 'false'},
+    'warm': {'GUNICORN_PRELOAD': 'true', 'WARMUP_ON_LOAD': 'true'},
+}
+
+
+def _first_byte(base_url: str, path: str) -> float:
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+    started = time.perf_counter()
+    try:
+        conn.request('GET', path, headers={'Connection': 'close'})
+        response = conn.getresponse()
+        elapsed = time.perf_counter() - started
+        response.read()
+    finally:
+        conn.close()
+    if response.status != 200:
+        raise FlowError(f'GET {path}: HTTP {response.status}')
+    return elapsed
+
+
+@register_suite('startup')
+def run_startup(options: dict, log) -> dict:
+    # Boots gunicorn from scratch and, as soon as it listens, sends one request
+    # per worker at once: sync workers take one connection each, so every
+    # worker serves exactly one of them as its first request. A second round
+    # on the same workers is the warm reference.
+    workers = options['workers']
+    recorder = Recorder()
+    profiles = {}
+    suite_started = time.perf_counter()
+    with benchmark_database() as db_env:
+        seed_database(options['clients'], options['appointments'], options['threads'], options['seed'])
+        for name, profile_env in STARTUP_PROFILES.items():
+            boots = []
+            for boot in range(options['rounds']):
+                log(f'[{name}] Boot {boot + 1}/{options["rounds"]} with {workers} worker(s)...')
+                started = time.perf_counter()
+                with gunicorn_server(workers, {**db_env, **profile_env}) as base_url:
+                    boots.append(time.perf_counter() - started)
+                    for label in ('first request', 'second request'):
+                        timings = []
+                        threads = [
+                            threading.Thread(target=lambda: timings.append(_first_byte(base_url, '/')))
+                            for _ in range(workers)
+                        ]
+                        for thread in threads:
+                            thread.start()
+                        for thread in threads:
+                            thread.join()
+                        if len(timings) != workers:
+                            raise FlowError(f'[{name}] {workers - len(timings)} {label}(s) failed.')
+                        for seconds in timings:
+                            recorder.record(f'{name}: {label}', seconds, 200, True)
+            profiles[name] = {
+                'listen_seconds': round(sum(boots) / len(boots), 3),
+                'first_byte_p50_ms': round(_percentile(sorted(recorder.samples[f'{name}: first request']), 50) * 1000, 2),
+            }
+    results = summarize(recorder, time.perf_counter() - suite_started)
+    results['profiles'] = profiles
+    results['config'] = {key: options[key] for key in ('workers', 'rounds', 'clients', 'appointments', 'threads', 'seed')}
+    return results
+
+
+# Run in a fresh interpreter per sample. Django imports each app's models
+# through django.apps.config.import_module, which the probe wraps to time.
+IMPORT_PROBE = """
+import json, os, time
+import django
+from django.apps import config
+
+timings = {}
+_import_module = config.import_module
+
+
+def timed_import(name):
+    started = time.perf_counter()
+    try:
+        return _import_module(name)
+    finally:
+        timings[name] = time.perf_counter() - started
+
+
+def rss_kb():
+    with open('/proc/self/status') as status:
+        return int(next(line for line in status if line.startswith('VmRSS')).split()[1])
+
+
+config.import_module = timed_import
+started = time.perf_counter()
+django.setup()
+setup_seconds = time.perf_counter() - started
+setup_rss = rss_kb()
+from appointments.catalog import catalog
+
+started = time.perf_counter()
+catalog.load()
+print(json.dumps({
+    'models_seconds': timings['appointments.models'],
+    'setup_seconds': setup_seconds,
+    'catalog_seconds': time.perf_counter() - started,
+    'setup_rss_kb': setup_rss,
+    'catalog_rss_kb': rss_kb(),
+}))
+"""
+
+
+def _memory_kb(pid: int) -> dict[str, int]:
+    # Pss splits pages shared copy-on-write between the processes mapping them.
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def _worker_pids(pidfile: str) -> list[int]:
+    with open(pidfile) as handle:
+        master = int(handle.read().strip())
+    with open(f'/proc/{master}/task/{master}/children') as handle:
+        return [int(pid) for pid in handle.read().split()]
+
+
+@register_suite('footprint')
+def run_footprint(options: dict, log) -> dict:
+    recorder = Recorder()
+    probes = []
+    log(f"Timing `import appointments.models` in {options['rounds']} fresh interpreter(s)...")
+    for _ in range(options['rounds']):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'biprepair.settings')},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        probes.append(probe)
+        recorder.record('import appointments.models', probe['models_seconds'], 200, True)
+        recorder.record('django.setup()', probe['setup_seconds'], 200, True)
+        recorder.record('catalog load', probe['catalog_seconds'], 200, True)
+
+    workers = options['workers']
+    with benchmark_database() as db_env, tempfile.TemporaryDirectory() as tmpdir:
+        pidfile = os.path.join(tmpdir, 'gunicorn.pid')
+        log(f'Measuring RSS/PSS of {workers} gunicorn worker(s) after their first page...')
+        with gunicorn_server(workers, db_env, ['--pid', pidfile]) as base_url:
+            threads = [threading.Thread(target=_first_byte, args=(base_url, '/')) for _ in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            memory = [_memory_kb(pid) for pid in _worker_pids(pidfile)]
+
+    results = summarize(recorder, sum(probe['setup_seconds'] for probe in probes))
+    results['profiles'] = {
+        'interpreter': {
+            'setup_rss_kb': round(sum(probe['setup_rss_kb'] for probe in probes) / len(probes)),
+            'catalog_rss_kb': round(sum(probe['catalog_rss_kb'] for probe in probes) / len(probes)),
+        },
+        'worker': {
+            'rss_kb': round(sum(item['rss'] for item in memory) / len(memory)),
+            'pss_kb': round(sum(item['pss'] for item in memory) / len(memory)),
+        },
+    }
+    results['config'] = {key: options[key] for key in ('workers', 'rounds')}
+    return results
+
+
+CONNECTION_SERVERS = {
+    'wsgi': ('biprepair.wsgi:application', []),
+    'asgi': ('biprepair.asgi:application', ['--worker-class', 'uvicorn.workers.UvicornWorker']),
+}
+CONNECTION_LEVELS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+HOLD_SECONDS = 2.0
+
+
+def _messenger_cookies(emails: list[str], count: int) -> list[tuple[str, str]]:
+    # Sessions are written straight into the benchmark database; logging in
+    # hundreds of clients through the server would dominate the run.
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.db.models import Count, Max
+
+    from .constants import SESSION_CLIENT_KEY
+    from .views import _thread_version
+
+    clients = list(ClientAccount.objects.filter(email__in=emails).values_list('id', flat=True))
+    versions = {}
+    for client_id in clients:
+        state = ContactMessage.objects.filter(client_id=client_id).aggregate(count=Count('id'), updated=Max('updated_at'))
+        versions[client_id] = _thread_version(state['count'], state['updated'])
+    cookies = []
+    for index in range(count):
+        client_id = clients[index % len(clients)]
+        session = SessionStore()
+        session[SESSION_CLIENT_KEY] = client_id
+        session.create()
+        cookies.append((f'{settings.SESSION_COOKIE_NAME}={session.session_key}', versions[client_id]))
+    return cookies
+
+
+def _timed_get(base_url: str, path: str, cookie: str, timeout: float) -> tuple[float, int]:
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    started = time.perf_counter()
+    try:
+        conn.request('GET', path, headers={'Connection': 'close', 'Cookie': cookie})
+        response = conn.getresponse()
+        response.read()
+        return time.perf_counter() - started, response.status
+    except (OSError, http.client.HTTPException):
+        return time.perf_counter() - started, 0
+    finally:
+        conn.close()
+
+
+@register_suite('connections')
+def run_connections(options: dict, log) -> dict:
+    # One worker process per server. Each level opens that many messenger
+    # long-polls at once; the threads never change, so the server holds every
+    # one for HOLD_SECONDS and answers 204. A level is within capacity when all
+    # of them come back within HOLD_SECONDS + 1s: the ASGI worker waits on
+    # them side by side, a sync WSGI worker serves them one after another.
+    # Status lookups from another client measure what everyone else sees
+    # meanwhile. --concurrency caps the largest level tried.
+    levels = [level for level in CONNECTION_LEVELS if level <= options['concurrency']] or [1]
+    recorder = Recorder()
+    profiles = {}
+    env = {'MESSENGER_LONGPOLL_SECONDS': str(HOLD_SECONDS)}
+    suite_started = time.perf_counter()
+    with benchmark_database() as db_env:
+        data = seed_database(options['clients'], options['appointments'], options['threads'], options['seed'])
+        cookies = _messenger_cookies(data['messaging_emails'], levels[-1])
+        lookup = f"/status/lookup/?appointment_id={data['appointment_ids'][0]}"
+        for name, (app, extra_args) in CONNECTION_SERVERS.items():
+            capacity = 0
+            with gunicorn_server(1, {**db_env, **env}, extra_args, app=app) as base_url:
+                for level in levels:
+                    log(f'[{name}] {level} held connection(s)...')
+                    held, probes = [], []
+
+                    def hold(cookie: str, version: str) -> None:
+                        path = f'/clients/contact/history/?{urlencode({"since": version})}'
+                        held.append(_timed_get(base_url, path, cookie, HOLD_SECONDS * 2 + 5))
+
+                    def probe() -> None:
+                        time.sleep(HOLD_SECONDS / 4)
+                        for _ in range(5):
+                            probes.append(_timed_get(base_url, lookup, '', HOLD_SECONDS * 2 + 5))
+
+                    threads = [threading.Thread(target=hold, args=cookie) for cookie in cookies[:level]]
+                    threads.append(threading.Thread(target=probe))
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                    for seconds, status in held:
+                        recorder.record(f'{name}: long-poll x{level}', seconds, status, status == 204)
+                    for seconds, status in probes:
+                        recorder.record(f'{name}: status lookup x{level}', seconds, status, status == 200)
+                    on_time = sum(1 for seconds, status in held if status == 204 and seconds <= HOLD_SECONDS + 1)
+                    if on_time < level:
+                        log(f'[{name}] {on_time}/{level} answered within {HOLD_SECONDS + 1:.0f}s; stopping.')
+                        break
+                    capacity = level
+            profiles[name] = {'held_connections': capacity, 'largest_level': levels[-1]}
+    results = summarize(recorder, time.perf_counter() - suite_started)
+    results['profiles'] = profiles
+    results['config'] = {
+        key: options[key] for key in ('concurrency', 'clients', 'appointments', 'threads', 'seed')
+    }
+    results['config']['hold_seconds'] = HOLD_SECONDS
+    return results
+
+
+# (URL name, who is signed in). Exports stream; the rest are single bodies.
+COMPRESSION_PAGES = (
+    ('home', None),
+    ('book_appointment', 'client'),
+    ('check_status', 'client'),
+    ('contact_admin_history', 'client'),
+    ('admin_appointments', 'admin'),
+    ('admin_clients', 'admin'),
+    ('admin_messages', 'admin'),
+    ('admin_export_appointments', 'admin'),
+)
+COMPRESSION_ENCODINGS = ('identity', 'gzip', 'br')
+
+
+def _fetch(base_url: str, path: str, headers: dict) -> tuple[float, int, int, str]:
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+    started = time.perf_counter()
+    try:
+        conn.request('GET', path, headers={'Connection': 'close', **headers})
+        response = conn.getresponse()
+        body = response.read()
+    finally:
+        conn.close()
+    return time.perf_counter() - started, response.status, len(body), response.getheader('Content-Encoding', '')
+
+
+@register_suite('compression')
+def run_compression(options: dict, log) -> dict:
+    # Fetches each page --rounds times per Accept-Encoding from the in-process
+    # server and reports bytes on the wire next to the server's own
+    # compression counters, so bandwidth saved and CPU spent are per endpoint.
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.urls import reverse
+
+    from .constants import SESSION_ADMIN_KEY, SESSION_CLIENT_KEY
+    from .metrics import registry
+
+    recorder = Recorder()
+    profiles = {}
+    suite_started = time.perf_counter()
+    with benchmark_database():
+        data = seed_database(options['clients'], options['appointments'], options['threads'], options['seed'])
+        cookies = {None: ''}
+        for role, key, user_id in (
+            ('client', SESSION_CLIENT_KEY, ClientAccount.objects.get(email=data['messaging_emails'][0]).id),
+            ('admin', SESSION_ADMIN_KEY, AdminUser.objects.get(username=BENCH_ADMIN_USERNAME).id),
+        ):
+            session = SessionStore()
+            session[key] = user_id
+            session.create()
+            cookies[role] = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+        with in_process_server() as base_url:
+            for name, role in COMPRESSION_PAGES:
+                path = reverse(name)
+                profile = profiles[name] = {}
+                for encoding in COMPRESSION_ENCODINGS:
+                    log(f'{name} [{encoding}]...')
+                    registry.reset()
+                    sizes, used = [], set()
+                    for _ in range(options['rounds']):
+                        seconds, status, size, content_encoding = _fetch(
+                            base_url, path, {'Cookie': cookies[role], 'Accept-Encoding': encoding}
+                        )
+                        recorder.record(f'{name} [{encoding}]', seconds, status, status == 200)
+                        sizes.append(size)
+                        used.add(content_encoding or 'identity')
+                    stats = registry.snapshot().get(name, {})
+                    compressed = stats.get('compressed_responses', 0)
+                    profile[encoding] = {
+                        'served_as': sorted(used),
+                        'wire_bytes': round(sum(sizes) / len(sizes)),
+                        'compress_ms': round(stats.get('compress_seconds', 0) / compressed * 1000, 3)
+                        if compressed
+                        else 0.0,
+                    }
+                plain = profile['identity']['wire_bytes']
+                for encoding in COMPRESSION_ENCODINGS[1:]:
+                    wire = profile[encoding]['wire_bytes']
+                    profile[encoding]['ratio'] = round(wire / plain, 3) if plain else 1.0
+    results = summarize(recorder, time.perf_counter() - suite_started)
+    results['profiles'] = profiles
+    results['config'] = {key: options[key] for key in ('rounds', 'clients', 'appointments', 'threads', 'seed')}
+    return results
+
+
+def compare(baseline: dict, current: dict) -> list[tuple]:
+    rows = []
+    for label, stats in current.get('endpoints', {}).items():
+        before = baseline.get('endpoints', {}).get(label)
+        if not before:
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+            old, new = before.get(key, 0), stats.get(key, 0)
+            deltas.append((old, new, ((new - old) / old * 100) if old else 0.0))
+        rows.append((label, *deltas))
+    return rows
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import Appointment
+
+
+@contextmanager
+def manual_timestamps(model, *field_names: str):
+    # bulk_create runs pre_save() on every field, which would stamp
+    # auto_now/auto_now_add columns with the current time. Imported and
+    # generated history has to keep its own dates, so switch those flags off
+    # for the duration of the block.
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _appointment_id_for(created_at, random_source=None) -> str:
+    day = timezone.localtime(created_at) if timezone.is_aware(created_at) else created_at
+    if random_source is None:
+        segment = get_random_string(4).upper()
+    else:
+        segment = ''.join(random_source.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789') for _ in range(4))
+    return f"BIP-{day.strftime('%y%m%d')}-{segment}"
+
+
+def allocate_appointment_ids(appointments: list[Appointment], random_source=None, check_database: bool = True) -> None:
+    # Same format as Appointment.save(), but allocated for a whole batch with
+    # one uniqueness query per round instead of one INSERT attempt per row.
+    taken = {appointment.appointment_id for appointment in appointments if appointment.appointment_id}
+    pending = [appointment for appointment in appointments if not appointment.appointment_id]
+    while pending:
+        candidates = {}
+        for appointment in pending:
+            candidate = _appointment_id_for(appointment.created_at or timezone.now(), random_source)
+            if candidate in taken or candidate in candidates:
+                continue
+            candidates[candidate] = appointment
+        clashes = set()
+        if check_database and candidates:
+            clashes = set(
+                Appointment.objects.filter(appointment_id__in=list(candidates)).values_list(
+                    'appointment_id', flat=True
+                )
+            )
+        for candidate, appointment in candidates.items():
+            if candidate in clashes:
+                continue
+            appointment.appointment_id = candidate
+            taken.add(candidate)
+        pending = [appointment for appointment in pending if not appointment.appointment_id]
+
+
+def _init_hash_worker(settings_module: str) -> None:
+    # Spawned (non-forked) workers start without configured settings.
+    import django
+    from django.conf import settings
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    if not settings.configured:
+        django.setup()
+
+
+def password_hasher_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        initializer=_init_hash_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'biprepair.settings'),),
+    )
+
+
+def hash_passwords(raw_passwords: list[str | None], pool: ProcessPoolExecutor | None = None) -> list[str]:
+    if pool is None:
+        return [make_password(raw) for raw in raw_passwords]
+    chunksize = max(1, len(raw_passwords) // ((os.cpu_count() or 1) * 4))
+    return list(pool.map(make_password, raw_passwords, chunksize=chunksize))
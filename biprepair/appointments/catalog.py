@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+
+from . import generations
+
+CATALOG_PATH = Path(__file__).resolve().parent / 'data' / 'catalog.json'
+
+
+def _normalize_model(name: str) -> str:
+    return name.replace('-', ' ').lower()
+
+
+def _read_tables() -> dict | None:
+    from .models import DeviceBrand, DeviceModel, ServiceOffering
+
+    services: dict[str, list] = {}
+    pricing: dict[str, dict] = {}
+    for offering in ServiceOffering.objects.select_related('price').order_by('device_type', 'position', 'id'):
+        services.setdefault(offering.device_type, []).append((offering.code, offering.label))
+        price = getattr(offering, 'price', None)
+        pricing.setdefault(offering.device_type, {})[offering.code] = price.amount if price else 0
+    brands: dict[str, list] = {}
+    for brand in DeviceBrand.objects.order_by('device_type', 'position', 'id'):
+        brands.setdefault(brand.device_type, []).append((brand.code, brand.label))
+    models: dict[str, dict] = {}
+    rows = DeviceModel.objects.order_by('brand__device_type', 'brand__position', 'brand_id', 'position', 'id')
+    for device_type, code, name in rows.values_list('brand__device_type', 'brand__code', 'name'):
+        models.setdefault(device_type, {}).setdefault(code, []).append(name)
+    if not services and not brands:
+        return None
+    return {'services': services, 'pricing': pricing, 'brands': brands, 'models': models}
+
+
+class Catalog:
+    # Read-only snapshot of the catalog tables (services, prices, brands,
+    # model suggestions). Lookups are plain dict reads on the snapshot; the
+    # tables are only queried to rebuild it after an edit. Edits replace the
+    # generation token in the shared cache (see signals.py) and each worker
+    # compares its token at most every CATALOG_CHECK_SECONDS at request start.
+    # The token has to live in a cache every worker can see; with a per-process
+    # cache such as LocMemCache other workers never notice an edit.
+    # Before the catalog migration has run (or with empty tables) the snapshot
+    # comes from data/catalog.json, the file the migration seeds from.
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data: dict | None = None
+        self._checked_at = 0.0
+
+    def _loaded(self) -> dict:
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    # Read the token before the tables, so an edit that lands
+                    # mid-build leaves us on a stale token and triggers a reload.
+                    generation = generations.current(generations.CATALOG)
+                    self._data = self._index(self._read(), generation)
+                data = self._data
+        return data
+
+    def _read(self) -> dict:
+        try:
+            raw = _read_tables()
+        except DatabaseError:
+            raw = None
+        if raw is None:
+            raw = json.loads(self.path.read_text(encoding='utf-8'))
+        return raw
+
+    @staticmethod
+    def _index(raw: dict, generation: str) -> dict:
+        services = {device: tuple(map(tuple, choices)) for device, choices in raw['services'].items()}
+        brands = {device: tuple(map(tuple, choices)) for device, choices in raw['brands'].items()}
+        models = {
+            device: MappingProxyType({brand: tuple(names) for brand, names in by_brand.items()})
+            for device, by_brand in raw['models'].items()
+        }
+        # Labels resolve to the first device type that lists the code.
+        service_labels: dict[str, str] = {}
+        for choices in services.values():
+            for code, label in choices:
+                service_labels.setdefault(code, label)
+        brand_labels: dict[str, str] = {}
+        for choices in brands.values():
+            for code, label in choices:
+                brand_labels.setdefault(code, label)
+        service_map = {
+            device: tuple({'value': code, 'label': label} for code, label in choices)
+            for device, choices in services.items()
+        }
+        brand_map = {
+            device: tuple({'value': code, 'label': label} for code, label in choices)
+            for device, choices in brands.items()
+        }
+        return {
+            'generation': generation,
+            'services': MappingProxyType(services),
+            'pricing': MappingProxyType(
+                {device: MappingProxyType(dict(prices)) for device, prices in raw['pricing'].items()}
+            ),
+            'brands': MappingProxyType(brands),
+            'models': MappingProxyType(models),
+            'known_models': MappingProxyType(
+                {
+                    (device, brand): frozenset(map(_normalize_model, names))
+                    for device, by_brand in models.items()
+                    for brand, names in by_brand.items()
+                }
+            ),
+            'service_labels': MappingProxyType(service_labels),
+            'brand_labels': MappingProxyType(brand_labels),
+            'service_map': MappingProxyType(service_map),
+            'brand_map': MappingProxyType(brand_map),
+            'page_json': MappingProxyType(
+                {
+                    'service_map_json': json.dumps(service_map),
+                    'brand_map_json': json.dumps(brand_map),
+                    'model_map_json': json.dumps(raw['models']),
+                    'service_pricing_json': json.dumps(raw['pricing']),
+                }
+            ),
+        }
+
+    def load(self) -> None:
+        self._loaded()
+
+    async def aload(self) -> None:
+        # Async views call this before any lookup: building the snapshot
+        # queries the catalog tables, which can't happen on the event loop.
+        if self._data is None:
+            await sync_to_async(self._loaded)()
+
+    def refresh_if_changed(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < settings.CATALOG_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        data = self._data
+        if data is not None and data['generation'] != generations.current(generations.CATALOG):
+            self._data = None
+
+    def invalidate(self) -> None:
+        generations.bump(generations.CATALOG)
+        self._data = None
+
+    @property
+    def version(self) -> str:
+        return self._loaded()['generation']
+
+    def service_choices(self, device_type: str) -> tuple[tuple[str, str], ...]:
+        return self._loaded()['services'].get(device_type, ())
+
+    def brand_choices(self, device_type: str) -> tuple[tuple[str, str], ...]:
+        return self._loaded()['brands'].get(device_type, ())
+
+    def model_suggestions(self, device_type: str, brand: str) -> tuple[str, ...]:
+        return self._loaded()['models'].get(device_type, {}).get(brand, ())
+
+    def is_known_model(self, device_type: str, brand: str, model: str) -> bool:
+        # Brands without suggestions accept any model name.
+        known = self._loaded()['known_models'].get((device_type, brand))
+        return not known or _normalize_model(model) in known
+
+    def price(self, device_type: str, service_type: str) -> int:
+        return self._loaded()['pricing'].get(device_type, {}).get(service_type, 0)
+
+    def service_label(self, code: str) -> str:
+        return self._loaded()['service_labels'].get(code, code)
+
+    def brand_label(self, code: str) -> str:
+        return self._loaded()['brand_labels'].get(code, code)
+
+    def service_map(self):
+        return self._loaded()['service_map']
+
+    def brand_map(self):
+        return self._loaded()['brand_map']
+
+    def model_map(self):
+        return self._loaded()['models']
+
+    def pricing(self):
+        return self._loaded()['pricing']
+
+    def page_json(self):
+        # Pre-serialized maps for the booking page scripts.
+        return self._loaded()['page_json']
+
+
+catalog = Catalog(CATALOG_PATH)
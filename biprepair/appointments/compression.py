@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import time
+import zlib
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .metrics import registry, view_name
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/manifest+json',
+    'image/svg+xml',
+)
+
+
+def breach_safe(view_func):
+    # Marks a view whose GET pages reflect nothing from the request, so they
+    # may be compressed even though they carry a (masked) CSRF token.
+    view_func.breach_safe = True
+    return view_func
+
+
+def accepted_encoding(header: str) -> str | None:
+    weights = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name.strip().lower()] = quality
+    wildcard = weights.get('*', 0.0)
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    scored = [(weights.get(encoding, wildcard), encoding) for encoding in offered]
+    best = max(scored, key=lambda pair: pair[0])
+    return best[1] if best[0] > 0 else None
+
+
+@lru_cache(maxsize=None)
+def _gzip_prototype(level: int):
+    # Deflate state is set up once; each stream starts from a copy of it.
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return zlib.compress(data, settings.COMPRESSION_GZIP_LEVEL, wbits=31)
+
+
+class _Stream:
+    # Compresses chunk by chunk and flushes after each one, so a streamed
+    # export keeps reaching the client while it is being generated.
+    def __init__(self, encoding: str, view: str):
+        self.view = view
+        self.raw = self.wire = 0
+        self.seconds = 0.0
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            self._compressor = _gzip_prototype(settings.COMPRESSION_GZIP_LEVEL).copy()
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def _timed(self, method, *args) -> bytes:
+        started = time.perf_counter()
+        data = method(*args)
+        self.seconds += time.perf_counter() - started
+        self.wire += len(data)
+        return data
+
+    def chunk(self, data) -> bytes:
+        if isinstance(data, str):
+            data = data.encode()
+        self.raw += len(data)
+        return self._timed(self._compress, data) + self._timed(self._flush)
+
+    def finish(self) -> bytes:
+        data = self._timed(self._finish)
+        registry.observe_compression(self.view, self.raw, self.wire, self.seconds)
+        return data
+
+    def wrap(self, chunks):
+        for data in chunks:
+            yield self.chunk(data)
+        yield self.finish()
+
+    async def awrap(self, chunks):
+        async for data in chunks:
+            yield self.chunk(data)
+        yield self.finish()
+
+
+class CompressionMiddleware:
+    # Negotiates br (when the Brotli package is installed) or gzip for dynamic
+    # HTML, JSON and exports. Static files never get here: WhiteNoise, higher
+    # up the stack, serves its own precompressed copies. Pages that rendered
+    # a CSRF token are left alone unless the view is @breach_safe: compressing
+    # a secret next to attacker-controlled text lets its length leak it.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return _compressed(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return _compressed(request, await self.get_response(request))
+
+
+def _eligible(request, response) -> bool:
+    if not settings.COMPRESSION_ENABLED or response.has_header('Content-Encoding'):
+        return False
+    if response.status_code in (204, 304) or request.method == 'HEAD':
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return False
+    if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_BYTES:
+        return False
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        match = getattr(request, 'resolver_match', None)
+        safe = match is not None and getattr(match.func, 'breach_safe', False)
+        if not (safe and request.method == 'GET'):
+            return False
+    return True
+
+
+def _compressed(request, response):
+    if not _eligible(request, response):
+        return response
+    # Whatever we send, caches must keep encoded and plain copies apart.
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = accepted_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return response
+    view = view_name(request)
+    if response.streaming:
+        stream = _Stream(encoding, view)
+        if response.is_async:
+            response.streaming_content = stream.awrap(response.streaming_content)
+        else:
+            response.streaming_content = stream.wrap(response.streaming_content)
+        del response['Content-Length']
+    else:
+        started = time.perf_counter()
+        content = _compress(encoding, response.content)
+        seconds = time.perf_counter() - started
+        registry.observe_compression(view, len(response.content), len(content), seconds)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+    # The encoded body is a different representation of the same resource.
+    etag = response.get('ETag', '')
+    if etag.startswith('"'):
+        response['ETag'] = f'W/{etag}'
+    response['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+
+from .constants import SESSION_ADMIN_KEY, SESSION_CLIENT_KEY
+from .routers import reading_replica
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+@lru_cache(maxsize=None)
+def release() -> str:
+    # Pages cached by browsers must not outlive the templates and static
+    # files they were rendered with. Every worker on a host computes the same
+    # value, so an ETag from one worker validates on the others.
+    if settings.APP_RELEASE:
+        return settings.APP_RELEASE
+    roots = [Path(directory) for engine in settings.TEMPLATES for directory in engine.get('DIRS', ())]
+    roots += [Path(config.path) / 'templates' for config in apps.get_app_configs()]
+    digest = hashlib.sha1()
+    files = [path for root in roots if root.is_dir() for path in root.rglob('*') if path.is_file()]
+    files.append(Path(settings.STATIC_ROOT) / 'staticfiles.json')
+    for path in sorted(files):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        digest.update(f'{path}:{stat.st_mtime_ns}:{stat.st_size}\n'.encode())
+    return digest.hexdigest()[:16]
+
+
+def _etag(request, version: str) -> str:
+    parts = [
+        release(),
+        version,
+        request.get_full_path(),
+        str(request.session.get(SESSION_ADMIN_KEY, '')),
+        str(request.session.get(SESSION_CLIENT_KEY, '')),
+        # Pages embed a CSRF token derived from this cookie.
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ]
+    if reading_replica():
+        # A lagging replica can render rows older than the version; rolling
+        # the tag bounds how long a browser keeps such a copy.
+        parts.append(str(int(time.time() // max(1, settings.DB_REPLICA_PIN_SECONDS))))
+    return quote_etag(hashlib.sha1('|'.join(parts).encode()).hexdigest())
+
+
+def _precondition(validator, request, args, kwargs):
+    # Returns (etag, response); a response means the view doesn't need to run.
+    if not settings.CONDITIONAL_GET_ENABLED or request.method not in SAFE_METHODS:
+        return None, None
+    # The copy a browser holds may show flash messages that are already
+    # gone; with messages pending the page is rendered and not tagged.
+    if len(get_messages(request)):
+        return None, None
+    version = validator(request, *args, **kwargs)
+    if version is None:
+        return None, None
+    etag = _etag(request, version)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        _tag(response, etag)
+    return etag, response
+
+
+def _tag(response, etag: str) -> None:
+    response['ETag'] = etag
+    # Browsers keep the page but ask again every time; shared caches don't store it.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+
+
+def _finish(response, etag: str | None):
+    if etag is None or response.status_code != 200 or response.streaming or response.has_header('ETag'):
+        return response
+    _tag(response, etag)
+    return response
+
+
+def conditional(validator):
+    # validator(request, *args, **kwargs) returns a cheap string that changes
+    # whenever the response would (generation tokens, a catalog version), or
+    # None to opt a request out. GET and HEAD requests whose If-None-Match
+    # still matches get a 304 before the view runs. Works for pages and JSON
+    # endpoints, sync or async; apply it inside @admin_guard/@replica_reads so
+    # the validator sees the same user and database as the view.
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                etag, response = await sync_to_async(_precondition)(validator, request, args, kwargs)
+                if response is not None:
+                    return response
+                return _finish(await view_func(request, *args, **kwargs), etag)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            etag, response = _precondition(validator, request, args, kwargs)
+            if response is not None:
+                return response
+            return _finish(view_func(request, *args, **kwargs), etag)
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,4 @@
 SESSION_ADMIN_KEY = 'admin_user_id'
 SESSION_CLIENT_KEY = 'client_user_id'
+SESSION_PRIMARY_UNTIL_KEY = 'db_primary_until'
 POLICIES_VERSION = '2025-01'
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+APPOINTMENT_EXPORT_FIELDS = [
+    'appointment_id',
+    'created_at',
+    'updated_at',
+    'completed_at',
+    'status',
+    'full_name',
+    'contact_number',
+    'notification_email',
+    'client__email',
+    'client__student_id',
+    'client__school_program',
+    'device_type',
+    'device_brand',
+    'brand_model',
+    'service_type',
+    'preferred_datetime',
+    'location',
+    'payment_method',
+    'quoted_price',
+    'parts_ordered',
+]
+
+CLIENT_EXPORT_FIELDS = [
+    'id',
+    'created_at',
+    'full_name',
+    'email',
+    'student_id',
+    'contact_number',
+    'school_program',
+    'student_type',
+    'is_active',
+    'policies_version',
+    'appointment_count',
+    'active_appointment_count',
+    'last_appointment_at',
+    'lifetime_spend',
+]
+
+MESSAGE_EXPORT_FIELDS = [
+    'id',
+    'created_at',
+    'updated_at',
+    'status',
+    'client__full_name',
+    'client__email',
+    'subject',
+    'body',
+    'preferred_contact',
+    'admin_reply',
+]
+
+
+class _Echo:
+    # csv.writer only needs an object with ``write``; returning the line lets
+    # the generator hand it straight to the response.
+    def write(self, value: str) -> str:
+        return value
+
+
+def _iter_rows(queryset, fields: list[str], chunk_size: int):
+    # Walk the table in primary-key order, one bounded chunk at a time. MySQL
+    # drivers buffer a whole result set client side, so a single iterator()
+    # over millions of rows would not keep memory flat on its own.
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = 0
+        for row in chunk.values_list('pk', *fields)[:chunk_size].iterator(chunk_size=chunk_size):
+            rows += 1
+            last_pk = row[0]
+            yield row[1:]
+        if rows < chunk_size:
+            return
+
+
+# Spreadsheet apps run a cell starting with one of these as a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    # Client-entered text is quoted with a leading apostrophe so it opens as
+    # text. NDJSON keeps values as they are.
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _csv_lines(rows, fields: list[str]):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def _ndjson_lines(rows, fields: list[str]):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def stream_rows(rows, fields: list[str], export_format: str, basename: str) -> StreamingHttpResponse:
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'csv'
+    lines = _csv_lines if export_format == 'csv' else _ndjson_lines
+    response = StreamingHttpResponse(lines(rows, fields), content_type=EXPORT_FORMATS[export_format])
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+    response['Content-Disposition'] = f'attachment; filename="{basename}-{stamp}.{export_format}"'
+    response['Cache-Control'] = 'no-store'
+    # Ask reverse proxies not to buffer the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def stream_export(queryset, fields: list[str], export_format: str, basename: str) -> StreamingHttpResponse:
+    return stream_rows(_iter_rows(queryset, fields, settings.EXPORT_CHUNK_SIZE), fields, export_format, basename)
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+from datetime import timedelta
+
 from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
-from .models import AdminUser, Appointment, ClientAccount, ContactMessage, ContactMessageReply
+from .catalog import catalog
+from .models import (
+    AdminUser,
+    Appointment,
+    ClientAccount,
+    ContactMessage,
+    ContactMessageReply,
+    DeviceBrand,
+    DeviceModel,
+    ServiceOffering,
+)
 
 
 class StyledFieldsMixin:
@@ -125,11 +137,9 @@ class AppointmentForm(StyledModelForm):
         device_type = (
             self.data.get('device_type')
             or self.initial.get('device_type')
-            if self.initial
-            else None
+            or Appointment.DEVICE_ANDROID
         )
-        device_type = device_type or Appointment.DEVICE_ANDROID
-        self.fields['service_type'].choices = Appointment.SERVICE_CHOICES.get(device_type, [])
+        self.fields['service_type'].choices = catalog.service_choices(device_type)
 
     def clean_preferred_datetime(self):
         preferred = self.cleaned_data['preferred_datetime']
@@ -158,7 +168,7 @@ class AppointmentForm(StyledModelForm):
     def clean_service_type(self):
         service_type = self.cleaned_data['service_type']
         device_type = self.data.get('device_type') or self.cleaned_data.get('device_type')
-        allowed_codes = {value for value, _ in Appointment.SERVICE_CHOICES.get(device_type, [])}
+        allowed_codes = {value for value, _ in catalog.service_choices(device_type)}
         if service_type not in allowed_codes:
             raise ValidationError('Select a service compatible with the chosen device.')
         return service_type
@@ -168,7 +178,7 @@ class AppointmentForm(StyledModelForm):
         device_type = self.data.get('device_type') or self.cleaned_data.get('device_type')
         if device_type == Appointment.DEVICE_IPHONE:
             return 'apple'
-        choices = Appointment.BRAND_CHOICES.get(device_type, [])
+        choices = catalog.brand_choices(device_type)
         allowed_values = {value for value, _ in choices}
         normalized = device_brand.lower()
         label_to_value = {label.lower(): value for value, label in choices}
@@ -210,6 +220,39 @@ class CheckStatusForm(StyledForm):
         return cleaned
 
 
+class AnalyticsFilterForm(StyledForm):
+    GRANULARITY_CHOICES = [('day', 'Day'), ('week', 'Week'), ('month', 'Month')]
+    DEFAULT_SPAN = timedelta(days=364)
+    MAX_SPAN = timedelta(days=3660)
+
+    granularity = forms.ChoiceField(choices=GRANULARITY_CHOICES, required=False)
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    device_type = forms.ChoiceField(choices=[('', 'All devices')] + Appointment.DEVICE_CHOICES, required=False)
+    device_brand = forms.CharField(max_length=50, required=False)
+    service_type = forms.CharField(max_length=50, required=False)
+    location = forms.ChoiceField(choices=[('', 'All locations')] + Appointment.LOCATION_CHOICES, required=False)
+    school_program = forms.ChoiceField(
+        choices=[('', 'All programs')] + ClientAccount.SCHOOL_PROGRAM_CHOICES, required=False
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        cleaned['granularity'] = cleaned.get('granularity') or 'month'
+        if 'start' in self.errors or 'end' in self.errors:
+            return cleaned
+        end = cleaned.get('end') or timezone.localdate()
+        start = cleaned.get('start') or end - self.DEFAULT_SPAN
+        if start > end:
+            raise ValidationError('The start date must not be after the end date.')
+        if end - start > self.MAX_SPAN:
+            raise ValidationError('Analytics ranges are limited to ten years.')
+        cleaned['start'], cleaned['end'] = start, end
+        for name in ('device_brand', 'service_type'):
+            cleaned[name] = cleaned.get(name, '').strip().lower()
+        return cleaned
+
+
 class AdminLoginForm(StyledForm):
     username = forms.CharField(max_length=100)
     password = forms.CharField(widget=forms.PasswordInput)
@@ -255,8 +298,10 @@ class AdminRegisterForm(StyledForm):
 class StatusUpdateForm(StyledModelForm):
     class Meta:
         model = Appointment
-        fields = ['status', 'quoted_price', 'parts_ordered', 'admin_notes']
+        # version is the one the page was rendered from; see admin_detail.
+        fields = ['status', 'quoted_price', 'parts_ordered', 'admin_notes', 'version']
         widgets = {
+            'version': forms.HiddenInput,
             'admin_notes': forms.Textarea(attrs={'rows': 3}),
             'parts_ordered': forms.CheckboxInput(attrs={'class': 'toggle-input'}),
             'quoted_price': forms.NumberInput(attrs={'step': '0.01', 'min': '0'}),
@@ -342,3 +387,45 @@ class AdminMessageReplyForm(StyledModelForm):
         widgets = {
             'body': forms.Textarea(attrs={'rows': 3, 'placeholder': 'Write a reply…'}),
         }
+
+
+class _DeviceScopedCodeMixin:
+    # device_type comes from the page, not the form, so the model's
+    # (device_type, code) constraint isn't checked by ModelForm validation.
+    def clean_code(self):
+        code = self.cleaned_data['code']
+        siblings = type(self.instance).objects.filter(device_type=self.instance.device_type, code=code)
+        if siblings.exclude(pk=self.instance.pk).exists():
+            raise ValidationError('That code is already used for this device type.')
+        return code
+
+
+class DeviceBrandForm(_DeviceScopedCodeMixin, StyledModelForm):
+    class Meta:
+        model = DeviceBrand
+        fields = ['code', 'label', 'position']
+
+
+class DeviceModelForm(StyledModelForm):
+    class Meta:
+        model = DeviceModel
+        fields = ['brand', 'name', 'position']
+
+    def __init__(self, *args, device_type: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['brand'].queryset = DeviceBrand.objects.filter(device_type=device_type)
+
+    def clean(self):
+        cleaned = super().clean()
+        brand, name = cleaned.get('brand'), cleaned.get('name')
+        if brand and name and DeviceModel.objects.filter(brand=brand, name__iexact=name).exists():
+            raise ValidationError(f'{brand.label} already lists {name}.')
+        return cleaned
+
+
+class ServiceOfferingForm(_DeviceScopedCodeMixin, StyledModelForm):
+    amount = forms.IntegerField(min_value=0, label='Price')
+
+    class Meta:
+        model = ServiceOffering
+        fields = ['code', 'label', 'position']
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+# A generation is an opaque token in the shared cache that is replaced
+# whenever the data it covers changes. Anything cached under a key that
+# includes the token simply stops being read. Tokens are fresh uuids rather
+# than an incremented counter: the default file cache can't increment
+# atomically, and two racing bumps must never land on the same value.
+APPOINTMENTS = 'appointments'
+CLIENTS = 'clients'
+CATALOG = 'catalog'
+MESSAGES = 'messages'
+
+
+def _key(name: str) -> str:
+    return f'{name}:generation'
+
+
+def current(name: str) -> str:
+    generation = cache.get(_key(name))
+    if generation is None:
+        cache.add(_key(name), uuid.uuid4().hex, None)
+        generation = cache.get(_key(name))
+    return generation
+
+
+def bump(*names: str) -> None:
+    cache.set_many({_key(name): uuid.uuid4().hex for name in names}, None)
+
+
+def bump_on_commit(*names: str) -> None:
+    transaction.on_commit(lambda: bump(*names))
@@ -0,0 +1,319 @@
+import csv
+import json
+import os
+import sys
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from appointments import generations
+from appointments.bulk import allocate_appointment_ids, hash_passwords, manual_timestamps, password_hasher_pool
+from appointments.models import Appointment, ClientAccount, DailyAppointmentStat, local_day
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+
+
+def _read_records(handle, file_format: str):
+    if file_format == 'csv':
+        for line_no, row in enumerate(csv.DictReader(handle), start=2):
+            yield line_no, row
+        return
+    for line_no, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+            continue
+        if not isinstance(record, dict):
+            record = ValidationError('Each line must be a JSON object.')
+        yield line_no, record
+
+
+def _text(row: dict, key: str, default: str = '') -> str:
+    value = row.get(key)
+    if value is None:
+        return default
+    return str(value).strip()
+
+
+def _parse_timestamp(value: str, field: str):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError(f'{field} must be an ISO 8601 date/time.')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.get_current_timezone())
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import ClientAccount or legacy Appointment rows from CSV/NDJSON. "
+        "Rows are streamed, validated, and written with bulk_create in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['clients', 'appointments'], help='Record type in the file')
+        parser.add_argument('path', type=str, help='CSV or NDJSON file ("-" reads stdin)')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per transaction')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (clients)')
+        parser.add_argument('--checkpoint', type=str, help='Progress file used to resume an interrupted import')
+        parser.add_argument('--max-errors', type=int, default=100, help='Abort after this many invalid rows')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        self.kind = options['kind']
+        self.max_errors = options['max_errors']
+        self.errors = 0
+
+        checkpoint_path = Path(options['checkpoint']) if options['checkpoint'] else None
+        state = self._load_checkpoint(checkpoint_path, path)
+        self.checkpoint_path, self.state = checkpoint_path, state
+        if state['rows_done']:
+            self.stdout.write(f"Resuming after {state['rows_done']} row(s) from {checkpoint_path}.")
+
+        self.pool = password_hasher_pool(options['workers']) if self.kind == 'clients' else None
+        handle = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            records = islice(_read_records(handle, file_format), state['rows_done'], None)
+            while True:
+                chunk = list(islice(records, batch_size))
+                if not chunk:
+                    break
+                written, duplicates = self._import_chunk(chunk)
+                state['rows_done'] += len(chunk)
+                state['written'] += written
+                state['duplicates'] = state.get('duplicates', 0) + duplicates
+                state['allocated_ids'] = {}
+                self._save_checkpoint(checkpoint_path, state)
+                self.stdout.write(
+                    f"{state['rows_done']} row(s) read, {state['written']} written, "
+                    f"{state['duplicates']} already present."
+                )
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+            if self.pool is not None:
+                self.pool.shutdown()
+
+        style = self.style.SUCCESS if not self.errors else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"Imported {state['written']} {self.kind}; {state.get('duplicates', 0)} already present "
+                f"and {self.errors} invalid row(s) skipped."
+            )
+        )
+
+    def _reject(self, line_no: int, error) -> None:
+        self.errors += 1
+        if isinstance(error, ValidationError) and hasattr(error, 'error_dict'):
+            message = '; '.join(
+                text if field == NON_FIELD_ERRORS else f'{field}: {text}'
+                for field, texts in error.message_dict.items()
+                for text in texts
+            )
+        elif isinstance(error, ValidationError):
+            message = '; '.join(error.messages)
+        else:
+            message = str(error)
+        self.stderr.write(f'Line {line_no}: {message}')
+        if self.errors >= self.max_errors:
+            raise CommandError(f'Stopped after {self.errors} invalid rows.')
+
+    def _import_chunk(self, chunk) -> tuple[int, int]:
+        if self.kind == 'clients':
+            objects = self._build_clients(chunk)
+            model, key, timestamps = ClientAccount, 'email', ('created_at',)
+        else:
+            objects = self._build_appointments(chunk)
+            model, key, timestamps = Appointment, 'appointment_id', ('created_at', 'updated_at')
+        if not objects:
+            return 0, 0
+        # Unique keys (client email, appointment ID) make a replayed batch a
+        # no-op when resuming after a crash between commit and checkpoint.
+        # Rows whose key is already stored, or repeated within the batch, are
+        # reported as already present rather than written.
+        with transaction.atomic(), manual_timestamps(model, *timestamps):
+            keys = [getattr(obj, key) for obj in objects]
+            seen = set(model.objects.filter(**{f'{key}__in': keys}).values_list(key, flat=True))
+            fresh = []
+            for obj in objects:
+                if getattr(obj, key) not in seen:
+                    seen.add(getattr(obj, key))
+                    fresh.append(obj)
+            fresh = self._insert(model, key, fresh)
+            if fresh and model is Appointment:
+                ClientAccount.refresh_counters({appointment.client_id for appointment in fresh})
+                DailyAppointmentStat.refresh_days({local_day(appointment.created_at) for appointment in fresh})
+                generations.bump_on_commit(generations.APPOINTMENTS, generations.CLIENTS)
+            elif fresh:
+                generations.bump_on_commit(generations.CLIENTS)
+        return len(fresh), len(objects) - len(fresh)
+
+    def _insert(self, model, key: str, objects: list) -> list:
+        # Another writer may store one of these keys after the check above.
+        # Rather than ignore_conflicts, which skips rows without saying which,
+        # drop the keys that are now taken and retry, so the caller can count
+        # exactly what was written.
+        while objects:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(objects, batch_size=len(objects))
+                return objects
+            except IntegrityError:
+                keys = [getattr(obj, key) for obj in objects]
+                taken = set(model.objects.filter(**{f'{key}__in': keys}).values_list(key, flat=True))
+                if not taken:
+                    raise
+                objects = [obj for obj in objects if getattr(obj, key) not in taken]
+        return objects
+
+    def _build_clients(self, chunk) -> list[ClientAccount]:
+        clients, raw_passwords = [], []
+        for line_no, row in chunk:
+            if isinstance(row, Exception):
+                self._reject(line_no, row)
+                continue
+            try:
+                client = ClientAccount(
+                    email=_text(row, 'email').lower(),
+                    full_name=_text(row, 'full_name'),
+                    student_id=_text(row, 'student_id'),
+                    contact_number=_text(row, 'contact_number'),
+                    school_program=_text(row, 'school_program'),
+                    student_type=_text(row, 'student_type', 'regular') or 'regular',
+                    is_active=_text(row, 'is_active', 'true').lower() in TRUE_VALUES,
+                    created_at=_parse_timestamp(_text(row, 'created_at'), 'created_at') or timezone.now(),
+                )
+                # Field rules (email format, lengths, choices). Duplicate
+                # emails are left to _import_chunk; the password is hashed below.
+                client.full_clean(exclude=['password'], validate_unique=False)
+            except ValidationError as exc:
+                self._reject(line_no, exc)
+                continue
+            clients.append(client)
+            raw_passwords.append(_text(row, 'password') or None)
+        for client, hashed in zip(clients, hash_passwords(raw_passwords, self.pool)):
+            client.password = hashed
+        return clients
+
+    def _build_appointments(self, chunk) -> list[Appointment]:
+        emails = {
+            _text(row, 'client_email').lower()
+            for _line, row in chunk
+            if isinstance(row, dict) and _text(row, 'client_email')
+        }
+        client_ids = dict(
+            ClientAccount.objects.filter(email__in=emails).values_list('email', 'id')
+        ) if emails else {}
+
+        appointments, unnumbered = [], []
+        now = timezone.now()
+        for line_no, row in chunk:
+            if isinstance(row, Exception):
+                self._reject(line_no, row)
+                continue
+            try:
+                client_email = _text(row, 'client_email').lower()
+                if client_email and client_email not in client_ids:
+                    raise ValidationError(f'No client account for {client_email}.')
+                status = _text(row, 'status', Appointment.STATUS_PENDING) or Appointment.STATUS_PENDING
+                payment_method = _text(row, 'payment_method', Appointment.PAYMENT_PERSONAL) or Appointment.PAYMENT_PERSONAL
+                preferred = _parse_timestamp(_text(row, 'preferred_datetime'), 'preferred_datetime')
+                if preferred is None:
+                    raise ValidationError('preferred_datetime is required.')
+                created_at = _parse_timestamp(_text(row, 'created_at'), 'created_at') or now
+                try:
+                    quoted_price = Decimal(_text(row, 'quoted_price') or '0')
+                except InvalidOperation:
+                    raise ValidationError('quoted_price must be a number.')
+                appointment = Appointment(
+                    client_id=client_ids.get(client_email),
+                    appointment_id=_text(row, 'appointment_id').upper(),
+                    full_name=_text(row, 'full_name'),
+                    contact_number=_text(row, 'contact_number'),
+                    notification_email=_text(row, 'notification_email'),
+                    device_type=_text(row, 'device_type'),
+                    device_brand=_text(row, 'device_brand').lower(),
+                    brand_model=_text(row, 'brand_model'),
+                    service_type=_text(row, 'service_type'),
+                    issue_description=_text(row, 'issue_description'),
+                    preferred_datetime=preferred,
+                    location=_text(row, 'location'),
+                    location_notes=_text(row, 'location_notes'),
+                    payment_method=payment_method,
+                    status=status,
+                    quoted_price=quoted_price,
+                    admin_notes=_text(row, 'admin_notes'),
+                    parts_ordered=_text(row, 'parts_ordered').lower() in TRUE_VALUES,
+                    created_at=created_at,
+                    updated_at=_parse_timestamp(_text(row, 'updated_at'), 'updated_at') or created_at,
+                )
+                if status == Appointment.STATUS_COMPLETED:
+                    appointment.completed_at = (
+                        _parse_timestamp(_text(row, 'completed_at'), 'completed_at') or appointment.updated_at
+                    )
+                # Field rules (lengths, choices, required values) plus the
+                # catalog and safety rules the booking form enforces. The
+                # client was resolved above and duplicate IDs are left to
+                # _import_chunk, so neither costs a query per row.
+                exclude = ['client'] if appointment.appointment_id else ['client', 'appointment_id']
+                appointment.full_clean(exclude=exclude, validate_unique=False)
+                if not appointment.quoted_price:
+                    appointment.quoted_price = appointment.service_price
+            except ValidationError as exc:
+                self._reject(line_no, exc)
+                continue
+            appointments.append(appointment)
+            if not appointment.appointment_id:
+                unnumbered.append((str(line_no), appointment))
+        # Rows without an ID get a random one. The IDs are written to the
+        # checkpoint before the batch commits, so a resume after a crash
+        # between commit and checkpoint reuses them and the replayed rows are
+        # skipped as already present instead of stored a second time.
+        allocated = self.state.setdefault('allocated_ids', {})
+        for line, appointment in unnumbered:
+            appointment.appointment_id = allocated.get(line, '')
+        allocate_appointment_ids(appointments)
+        if unnumbered:
+            allocated.update((line, appointment.appointment_id) for line, appointment in unnumbered)
+            self._save_checkpoint(self.checkpoint_path, self.state)
+        return appointments
+
+    def _load_checkpoint(self, checkpoint_path: Path | None, source: str) -> dict:
+        state = {
+            'source': os.path.abspath(source),
+            'kind': self.kind,
+            'rows_done': 0,
+            'written': 0,
+            'duplicates': 0,
+            'allocated_ids': {},
+        }
+        if not checkpoint_path or not checkpoint_path.exists():
+            return state
+        saved = json.loads(checkpoint_path.read_text())
+        if saved.get('source') != state['source'] or saved.get('kind') != self.kind:
+            raise CommandError(f'{checkpoint_path} belongs to a different import; remove it to start over.')
+        return saved
+
+    def _save_checkpoint(self, checkpoint_path: Path | None, state: dict) -> None:
+        if not checkpoint_path:
+            return
+        tmp_path = checkpoint_path.with_suffix(checkpoint_path.suffix + '.tmp')
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, checkpoint_path)
@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from appointments.bench import SUITES, compare, environment_info
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a benchmark suite against a freshly seeded throwaway database and "
+        "report throughput and p50/p95/p99 latency per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suite', choices=sorted(SUITES), default='flows', help='Benchmark suite to run')
+        parser.add_argument('--server', choices=['inprocess', 'gunicorn'], default='inprocess')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+        parser.add_argument('--concurrency', type=int, default=4, help='Simulated users')
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+        parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before the run')
+        parser.add_argument(
+            '--mix',
+            help='Scenario weights, e.g. "anonymous_home=4,client_booking=1,messenger_poll=3,admin_triage=2"',
+        )
+        parser.add_argument('--clients', type=int, default=200)
+        parser.add_argument('--appointments', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=200, help='Contact message threads')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for data and traffic')
+        parser.add_argument('--rounds', type=int, default=3, help='Server boots per profile (startup suite)')
+        parser.add_argument('--output', help='Results file (default: benchmarks/<suite>-<timestamp>.json, which git ignores)')
+        parser.add_argument('--compare', help='Earlier results file to diff against')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('--concurrency and --duration must be positive.')
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read {options['compare']}: {exc}")
+
+        try:
+            results = SUITES[options['suite']](options, self.stdout.write)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        results = {'suite': options['suite'], 'environment': environment_info(), **results}
+
+        self._print_table(results)
+        output = Path(options['output']) if options['output'] else (
+            Path(settings.BASE_DIR) / 'benchmarks'
+            / f"{options['suite']}-{timezone.localtime().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2) + '\n')
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if baseline is not None:
+            self._print_comparison(baseline, results)
+
+    def _print_table(self, results):
+        self.stdout.write(
+            f"{'endpoint':<28} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for label, stats in results['endpoints'].items():
+            self.stdout.write(
+                f"{label:<28} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.2f} "
+                f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+            )
+        for name, totals in results.get('profiles', {}).items():
+            if 'throughput_rps' not in totals:
+                self.stdout.write(f'{name}: ' + ', '.join(f'{key} {value}' for key, value in totals.items()))
+                continue
+            self.stdout.write(
+                f"{name}: {totals['requests']} requests in {totals['wall_seconds']}s "
+                f"({totals['throughput_rps']} req/s), {totals['errors']} error(s)."
+            )
+        if 'speedup' in results['totals']:
+            self.stdout.write(f"Tuned vs untuned throughput: {results['totals']['speedup']}x")
+            return
+        totals = results['totals']
+        self.stdout.write(
+            f"Total: {totals['requests']} requests in {totals['wall_seconds']}s "
+            f"({totals['throughput_rps']} req/s), {totals['errors']} error(s)."
+        )
+
+    def _print_comparison(self, baseline, results):
+        commit = baseline.get('environment', {}).get('commit') or 'baseline'
+        self.stdout.write(f'Change vs {commit} (negative latency / positive rps is better):')
+        for label, *deltas in compare(baseline, results):
+            cells = ' '.join(
+                f'{name} {old:.1f}->{new:.1f} ({change:+.0f}%)'
+                for name, (old, new, change) in zip(('p50', 'p95', 'p99', 'rps'), deltas)
+            )
+            self.stdout.write(f'{label:<28} {cells}')
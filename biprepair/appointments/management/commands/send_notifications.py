@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from appointments.models import StatusNotification
+from appointments.notifications import send_pending_notifications
+
+
+class Command(BaseCommand):
+    help = "Send queued Approved/Completed status notifications over a single SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Maximum notifications per connection')
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Requeue failed notifications, and interrupted ones older than --stale-after, before sending',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=float,
+            default=30,
+            help='Minutes a notification may stay "sending" before --retry-failed treats it as interrupted',
+        )
+
+    def handle(self, *args, **options):
+        if options['stale_after'] <= 0:
+            raise CommandError('--stale-after must be positive.')
+        if options['retry_failed']:
+            # Rows still "sending" may belong to a live sender; only requeue
+            # those claimed long enough ago that the sender must have died.
+            cutoff = timezone.now() - timedelta(minutes=options['stale_after'])
+            interrupted = Q(state=StatusNotification.STATE_SENDING) & (
+                Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True)
+            )
+            requeued = StatusNotification.objects.filter(
+                Q(state=StatusNotification.STATE_FAILED) | interrupted
+            ).update(state=StatusNotification.STATE_QUEUED, dispatch_token='', claimed_at=None)
+            self.stdout.write(f'Requeued {requeued} notification(s).')
+
+        totals = {'sent': 0, 'failed': 0}
+        while True:
+            result = send_pending_notifications(options['batch_size'])
+            if not result['sent'] and not result['failed']:
+                break
+            totals['sent'] += result['sent']
+            totals['failed'] += result['failed']
+
+        style = self.style.SUCCESS if not totals['failed'] else self.style.WARNING
+        self.stdout.write(style(f"Sent {totals['sent']} notification(s), {totals['failed']} failed."))
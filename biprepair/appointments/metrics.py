@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNRESOLVED_VIEW = '<unresolved>'
+SUMMED_KEYS = (
+    'requests',
+    'seconds',
+    'db_queries',
+    'db_seconds',
+    'template_seconds',
+    'response_bytes',
+    'compressed_responses',
+    'compress_input_bytes',
+    'compress_output_bytes',
+    'compress_seconds',
+)
+
+_current_request: ContextVar[dict | None] = ContextVar('repairhub_request_timings', default=None)
+
+
+def _empty_view_stats() -> dict:
+    return {
+        'requests': 0,
+        'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+        'seconds': 0.0,
+        'db_queries': 0,
+        'db_seconds': 0.0,
+        'template_seconds': 0.0,
+        'response_bytes': 0,
+        'compressed_responses': 0,
+        'compress_input_bytes': 0,
+        'compress_output_bytes': 0,
+        'compress_seconds': 0.0,
+        'status': {},
+    }
+
+
+class MetricsRegistry:
+    # Sync workers serve one request at a time, so the lock is uncontended in
+    # practice; it only matters for threaded workers. Each process keeps its
+    # own totals and periodically writes them to ``worker-<pid>.json``; the
+    # scrape merges every worker file.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: dict[str, dict] = {}
+        self._last_flush = 0.0
+
+    def observe(self, view: str, status_code: int, timings: dict, response_bytes: int) -> None:
+        duration = timings['total']
+        bucket = next((idx for idx, bound in enumerate(LATENCY_BUCKETS) if duration <= bound), len(LATENCY_BUCKETS))
+        status_class = f'{status_code // 100}xx'
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = _empty_view_stats()
+            stats['requests'] += 1
+            stats['buckets'][bucket] += 1
+            stats['seconds'] += duration
+            stats['db_queries'] += timings['db_queries']
+            stats['db_seconds'] += timings['db_seconds']
+            stats['template_seconds'] += timings['template_seconds']
+            stats['response_bytes'] += response_bytes
+            stats['status'][status_class] = stats['status'].get(status_class, 0) + 1
+        self.maybe_flush()
+
+    def observe_compression(self, view: str, input_bytes: int, output_bytes: int, seconds: float) -> None:
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = _empty_view_stats()
+            stats['compressed_responses'] += 1
+            stats['compress_input_bytes'] += input_bytes
+            stats['compress_output_bytes'] += output_bytes
+            stats['compress_seconds'] += seconds
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return json.loads(json.dumps(self._views))
+
+    def maybe_flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        write_worker_file(metrics_dir(), self.snapshot())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views = {}
+
+
+registry = MetricsRegistry()
+
+
+def metrics_dir() -> Path:
+    return Path(settings.METRICS_DIR)
+
+
+def write_worker_file(directory: Path, payload) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f'worker-{os.getpid()}.json'
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix='.worker-', suffix='.tmp')
+    with os.fdopen(fd, 'w') as handle:
+        json.dump(payload, handle)
+    os.replace(tmp_name, target)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user.
+        return True
+    return True
+
+
+def read_worker_files(directory: Path) -> list:
+    # Every other live process's last flush; the caller adds its own live
+    # state. Files left by exited workers are deleted, so a recycled worker's
+    # totals stop counting (scrapers see that as an ordinary counter reset).
+    own_file = f'worker-{os.getpid()}.json'
+    payloads = []
+    if directory.exists():
+        for path in directory.glob('worker-*.json'):
+            if path.name == own_file:
+                continue
+            pid = path.stem.removeprefix('worker-')
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                payloads.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+    return payloads
+
+
+def collect() -> dict[str, dict]:
+    merged: dict[str, dict] = {}
+    sources = [registry.snapshot(), *read_worker_files(metrics_dir())]
+    for source in sources:
+        for view, stats in source.items():
+            total = merged.setdefault(view, _empty_view_stats())
+            for key in SUMMED_KEYS:
+                total[key] += stats.get(key, 0)
+            for idx, count in enumerate(stats.get('buckets', [])[: len(total['buckets'])]):
+                total['buckets'][idx] += count
+            for status_class, count in stats.get('status', {}).items():
+                total['status'][status_class] = total['status'].get(status_class, 0) + count
+    return merged
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(stats: dict[str, dict] | None = None) -> str:
+    stats = collect() if stats is None else stats
+    views = sorted(stats)
+    lines = [
+        '# HELP repairhub_http_request_duration_seconds Request latency by URL name.',
+        '# TYPE repairhub_http_request_duration_seconds histogram',
+    ]
+    for view in views:
+        data, label = stats[view], _label(view)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, data['buckets']):
+            cumulative += count
+            lines.append(f'repairhub_http_request_duration_seconds_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'repairhub_http_request_duration_seconds_bucket{{view="{label}",le="+Inf"}} {data["requests"]}')
+        lines.append(f'repairhub_http_request_duration_seconds_sum{{view="{label}"}} {data["seconds"]:.6f}')
+        lines.append(f'repairhub_http_request_duration_seconds_count{{view="{label}"}} {data["requests"]}')
+
+    lines += [
+        '# HELP repairhub_http_requests_total Responses by URL name and status class.',
+        '# TYPE repairhub_http_requests_total counter',
+    ]
+    for view in views:
+        for status_class, count in sorted(stats[view]['status'].items()):
+            lines.append(f'repairhub_http_requests_total{{view="{_label(view)}",status="{status_class}"}} {count}')
+
+    counters = [
+        ('repairhub_db_queries_total', 'db_queries', 'Database queries executed.', '{}'),
+        ('repairhub_db_query_seconds_total', 'db_seconds', 'Time spent in database queries.', '{:.6f}'),
+        ('repairhub_template_render_seconds_total', 'template_seconds', 'Time spent rendering templates.', '{:.6f}'),
+        ('repairhub_http_response_bytes_total', 'response_bytes', 'Response body bytes sent (non-streaming).', '{}'),
+        ('repairhub_compressed_responses_total', 'compressed_responses', 'Responses compressed.', '{}'),
+        ('repairhub_compress_input_bytes_total', 'compress_input_bytes', 'Body bytes before compression.', '{}'),
+        ('repairhub_compress_output_bytes_total', 'compress_output_bytes', 'Body bytes after compression.', '{}'),
+        ('repairhub_compress_seconds_total', 'compress_seconds', 'Time spent compressing bodies.', '{:.6f}'),
+    ]
+    for name, key, help_text, value_format in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for view in views:
+            lines.append(f'{name}{{view="{_label(view)}"}} {value_format.format(stats[view][key])}')
+    return '\n'.join(lines) + '\n'
+
+
+class _TimedTemplate:
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        timings = _current_request.get()
+        if timings is None:
+            return self._template.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            timings['template_seconds'] += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    # Only top-level renders pass through the backend; includes and
+    # {% extends %} are resolved inside the engine, so nothing is counted twice.
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = {'db_queries': 0, 'db_seconds': 0.0, 'template_seconds': 0.0, 'total': 0.0}
+        with _timed(timings):
+            response = self.get_response(request)
+        return _finish(request, response, timings)
+
+    async def __acall__(self, request):
+        # ORM calls from async views run in sync_to_async threads, which
+        # inherit this context and so the same connection objects and wrappers.
+        timings = {'db_queries': 0, 'db_seconds': 0.0, 'template_seconds': 0.0, 'total': 0.0}
+        with _timed(timings):
+            response = await self.get_response(request)
+        return _finish(request, response, timings)
+
+
+@contextmanager
+def _timed(timings: dict):
+    def record_query(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            timings['db_queries'] += 1
+            timings['db_seconds'] += time.perf_counter() - started
+
+    token = _current_request.set(timings)
+    started = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(record_query))
+            yield
+    finally:
+        _current_request.reset(token)
+        timings['total'] = time.perf_counter() - started
+
+
+def view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name if match else None) or UNRESOLVED_VIEW
+
+
+def _finish(request, response, timings: dict):
+    size = 0 if response.streaming else len(response.content)
+    registry.observe(view_name(request), response.status_code, timings, size)
+    # Timings reveal how much work a request caused, so only signed-in admins
+    # (set by admin_guard, no session lookup here) and DEBUG see them.
+    if not settings.DEBUG and getattr(request, 'admin_user', None) is None:
+        return response
+    response['Server-Timing'] = ', '.join(
+        [
+            f'db;dur={timings["db_seconds"] * 1000:.1f};desc="{timings["db_queries"]} queries"',
+            f'tpl;dur={timings["template_seconds"] * 1000:.1f}',
+            f'total;dur={timings["total"] * 1000:.1f}',
+        ]
+    )
+    return response
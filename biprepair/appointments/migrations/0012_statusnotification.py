@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0011_alter_appointment_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('parts_unavailable', 'Rejected - Parts unavailable'), ('declined', 'Declined - Unsupported')], max_length=20)),
+                ('recipient', models.EmailField(max_length=254)),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('dispatch_token', models.CharField(blank=True, default='', max_length=32)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_notifications', to='appointments.appointment')),
+            ],
+            options={
+                'db_table': 'status_notifications',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['state', 'created_at'], name='status_noti_state_f0a90d_idx')],
+            },
+        ),
+    ]
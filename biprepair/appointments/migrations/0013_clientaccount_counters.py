@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:51
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+import django.db.models.functions.text
+
+
+def backfill_counters(apps, schema_editor):
+    Appointment = apps.get_model('appointments', 'Appointment')
+    ClientAccount = apps.get_model('appointments', 'ClientAccount')
+    per_client = Appointment.objects.filter(client=models.OuterRef('pk')).order_by().values('client')
+
+    def aggregate(queryset, expression):
+        return models.Subquery(queryset.annotate(value=expression).values('value')[:1])
+
+    ClientAccount.objects.update(
+        appointment_count=Coalesce(aggregate(per_client, models.Count('id')), 0),
+        active_appointment_count=Coalesce(
+            aggregate(per_client.filter(status__in=['pending', 'approved', 'in_progress']), models.Count('id')), 0
+        ),
+        last_appointment_at=aggregate(per_client, models.Max('created_at')),
+        lifetime_spend=Coalesce(
+            aggregate(per_client.filter(status__in=['approved', 'completed']), models.Sum('quoted_price')),
+            models.Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0012_statusnotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientaccount',
+            name='active_appointment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='clientaccount',
+            name='appointment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='clientaccount',
+            name='last_appointment_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='clientaccount',
+            name='lifetime_spend',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='clientaccount',
+            index=models.Index(fields=['full_name', 'id'], name='clients_name_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientaccount',
+            index=models.Index(django.db.models.functions.text.Lower('full_name'), name='clients_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientaccount',
+            index=models.Index(django.db.models.functions.text.Lower('student_id'), name='clients_student_id_lower_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
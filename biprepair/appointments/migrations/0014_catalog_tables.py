@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:23
+
+import json
+from pathlib import Path
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CATALOG_FILE = Path(__file__).resolve().parent.parent / 'data' / 'catalog.json'
+
+
+def load_catalog_file(apps, schema_editor):
+    DeviceBrand = apps.get_model('appointments', 'DeviceBrand')
+    DeviceModel = apps.get_model('appointments', 'DeviceModel')
+    ServiceOffering = apps.get_model('appointments', 'ServiceOffering')
+    ServicePrice = apps.get_model('appointments', 'ServicePrice')
+    raw = json.loads(CATALOG_FILE.read_text(encoding='utf-8'))
+    for device_type, choices in raw['brands'].items():
+        for position, (code, label) in enumerate(choices):
+            brand = DeviceBrand.objects.create(device_type=device_type, code=code, label=label, position=position)
+            names = raw['models'].get(device_type, {}).get(code, [])
+            DeviceModel.objects.bulk_create(
+                DeviceModel(brand=brand, name=name, position=index) for index, name in enumerate(names)
+            )
+    for device_type, choices in raw['services'].items():
+        for position, (code, label) in enumerate(choices):
+            offering = ServiceOffering.objects.create(
+                device_type=device_type, code=code, label=label, position=position
+            )
+            ServicePrice.objects.create(offering=offering, amount=raw['pricing'][device_type].get(code, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0013_clientaccount_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceBrand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_type', models.CharField(choices=[('android', 'Android Phone'), ('iphone', 'iPhone'), ('laptop', 'Laptop')], max_length=20)),
+                ('code', models.SlugField()),
+                ('label', models.CharField(max_length=100)),
+                ('position', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'device_brands',
+                'ordering': ['device_type', 'position', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DeviceModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('position', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'device_models',
+                'ordering': ['brand', 'position', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceOffering',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_type', models.CharField(choices=[('android', 'Android Phone'), ('iphone', 'iPhone'), ('laptop', 'Laptop')], max_length=20)),
+                ('code', models.SlugField()),
+                ('label', models.CharField(max_length=100)),
+                ('position', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'service_offerings',
+                'ordering': ['device_type', 'position', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ServicePrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('offering', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='price', to='appointments.serviceoffering')),
+            ],
+            options={
+                'db_table': 'service_prices',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='serviceoffering',
+            constraint=models.UniqueConstraint(fields=('device_type', 'code'), name='unique_service_per_device'),
+        ),
+        migrations.AddField(
+            model_name='devicemodel',
+            name='brand',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='device_models', to='appointments.devicebrand'),
+        ),
+        migrations.AddConstraint(
+            model_name='devicebrand',
+            constraint=models.UniqueConstraint(fields=('device_type', 'code'), name='unique_brand_per_device'),
+        ),
+        migrations.AddConstraint(
+            model_name='devicemodel',
+            constraint=models.UniqueConstraint(fields=('brand', 'name'), name='unique_model_per_brand'),
+        ),
+        migrations.RunPython(load_catalog_file, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,137 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:55
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.utils import timezone
+
+DIMENSIONS = ('device_type', 'device_brand', 'service_type', 'location', 'school_program')
+MEASURES = ('bookings', 'completed', 'earnings', 'turnaround_seconds', 'turnaround_count')
+
+
+def backfill_daily_stats(apps, schema_editor):
+    Appointment = apps.get_model('appointments', 'Appointment')
+    DailyAppointmentStat = apps.get_model('appointments', 'DailyAppointmentStat')
+    DailyAppointmentRollup = apps.get_model('appointments', 'DailyAppointmentRollup')
+    # The best record of when a completed appointment was finished.
+    Appointment.objects.filter(status='completed', completed_at__isnull=True).update(
+        completed_at=models.F('updated_at')
+    )
+    tz = timezone.get_default_timezone()
+    facts = {}
+    rows = Appointment.objects.order_by().values_list(
+        'created_at',
+        'device_type',
+        'device_brand',
+        'service_type',
+        'location',
+        'client__school_program',
+        'status',
+        'quoted_price',
+        'completed_at',
+    )
+    for created_at, device_type, brand, service, location, program, status, price, completed_at in rows.iterator(
+        chunk_size=5000
+    ):
+        day = timezone.localtime(created_at, tz).date() if timezone.is_aware(created_at) else created_at.date()
+        key = (day, device_type, brand, service, location, program or '')
+        fact = facts.setdefault(key, [0, 0, Decimal('0'), 0, 0])
+        fact[0] += 1
+        if status in ('approved', 'completed'):
+            fact[2] += price
+        if status == 'completed':
+            fact[1] += 1
+            if completed_at is not None:
+                fact[3] += max(0, int((completed_at - created_at).total_seconds()))
+                fact[4] += 1
+    rollups = {}
+    for (day, *values), measures in facts.items():
+        for dimension, value in (('', ''), *zip(DIMENSIONS, values)):
+            total = rollups.setdefault((day, dimension, value), [0, 0, Decimal('0'), 0, 0])
+            for index, measure in enumerate(measures):
+                total[index] += measure
+    DailyAppointmentStat.objects.bulk_create(
+        [
+            DailyAppointmentStat(day=day, **dict(zip(DIMENSIONS, values)), **dict(zip(MEASURES, measures)))
+            for (day, *values), measures in facts.items()
+        ],
+        batch_size=1000,
+    )
+    DailyAppointmentRollup.objects.bulk_create(
+        [
+            DailyAppointmentRollup(day=day, dimension=dimension, value=value, **dict(zip(MEASURES, measures)))
+            for (day, dimension, value), measures in rollups.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0014_catalog_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAppointmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('turnaround_seconds', models.BigIntegerField(default=0)),
+                ('turnaround_count', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(blank=True, max_length=20)),
+                ('value', models.CharField(blank=True, max_length=60)),
+            ],
+            options={
+                'db_table': 'daily_appointment_rollups',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyAppointmentStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('turnaround_seconds', models.BigIntegerField(default=0)),
+                ('turnaround_count', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField()),
+                ('device_type', models.CharField(choices=[('android', 'Android Phone'), ('iphone', 'iPhone'), ('laptop', 'Laptop')], max_length=20)),
+                ('device_brand', models.CharField(max_length=50)),
+                ('service_type', models.CharField(max_length=50)),
+                ('location', models.CharField(choices=[('meetup-central', 'Study Hub'), ('meetup-east', 'Tech 226'), ('meetup-tech', 'Student Center'), ('meetup-canteen', 'Canteen')], max_length=50)),
+                ('school_program', models.CharField(blank=True, max_length=60)),
+            ],
+            options={
+                'db_table': 'daily_appointment_stats',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['created_at'], name='appointments_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyappointmentstat',
+            constraint=models.UniqueConstraint(fields=('day', 'device_type', 'device_brand', 'service_type', 'location', 'school_program'), name='unique_daily_stat'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyappointmentrollup',
+            index=models.Index(fields=['day'], name='daily_rollups_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyappointmentrollup',
+            constraint=models.UniqueConstraint(fields=('dimension', 'value', 'day'), name='unique_daily_rollup'),
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0015_daily_appointment_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='assigned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_appointments', to='appointments.adminuser'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'assigned_to', 'created_at'], name='appointments_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0017_appointment_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatLock',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+            ],
+            options={
+                'db_table': 'daily_stat_locks',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0018_daily_stat_locks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statusnotification',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import Appointment, StatusNotification
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEMPLATES = {
+    Appointment.STATUS_APPROVED: (
+        'Your repair appointment {appointment_id} is approved',
+        'emails/status_approved.txt',
+    ),
+    Appointment.STATUS_COMPLETED: (
+        'Your repair appointment {appointment_id} is completed',
+        'emails/status_completed.txt',
+    ),
+}
+
+
+def _build_messages(batch: list[StatusNotification]) -> list[tuple[StatusNotification, EmailMessage]]:
+    # Templates are resolved once per status type and reused for every
+    # recipient in the batch.
+    templates = {}
+    prepared = []
+    for notification in batch:
+        subject_format, template_name = STATUS_TEMPLATES[notification.status]
+        template = templates.get(notification.status)
+        if template is None:
+            template = templates[notification.status] = get_template(template_name)
+        appointment = notification.appointment
+        body = template.render({'appointment': appointment})
+        message = EmailMessage(
+            subject=subject_format.format(appointment_id=appointment.appointment_id),
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[notification.recipient],
+        )
+        prepared.append((notification, message))
+    return prepared
+
+
+def send_pending_notifications(limit: int | None = None) -> dict[str, int]:
+    limit = limit or settings.NOTIFICATION_BATCH_SIZE
+    pending_ids = list(
+        StatusNotification.objects.filter(state=StatusNotification.STATE_QUEUED)
+        .order_by('created_at')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not pending_ids:
+        return {'sent': 0, 'failed': 0}
+
+    # Claim the rows with a token so two workers flushing at once never send
+    # the same notification twice.
+    token = get_random_string(32)
+    StatusNotification.objects.filter(
+        id__in=pending_ids, state=StatusNotification.STATE_QUEUED
+    ).update(state=StatusNotification.STATE_SENDING, dispatch_token=token, claimed_at=timezone.now())
+    batch = list(
+        StatusNotification.objects.filter(dispatch_token=token, state=StatusNotification.STATE_SENDING)
+        .select_related('appointment')
+        .order_by('created_at')
+    )
+
+    sent_ids: list[int] = []
+    failures: dict[str, list[int]] = {}
+    prepared = _build_messages(batch)
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for notification, message in prepared:
+                try:
+                    connection.send_messages([message])
+                except Exception as exc:  # noqa: BLE001 - recorded per notification
+                    failures.setdefault(str(exc) or exc.__class__.__name__, []).append(notification.id)
+                else:
+                    sent_ids.append(notification.id)
+    except Exception as exc:  # noqa: BLE001 - connection could not be opened
+        logger.warning('Could not open mail connection: %s', exc)
+        handled = set(sent_ids) | {pk for ids in failures.values() for pk in ids}
+        remaining = [notification.id for notification in batch if notification.id not in handled]
+        failures.setdefault(str(exc) or exc.__class__.__name__, []).extend(remaining)
+
+    if sent_ids:
+        StatusNotification.objects.filter(id__in=sent_ids).update(
+            state=StatusNotification.STATE_SENT, sent_at=timezone.now(), error=''
+        )
+    for error, ids in failures.items():
+        StatusNotification.objects.filter(id__in=ids).update(
+            state=StatusNotification.STATE_FAILED, error=error
+        )
+    failed = sum(len(ids) for ids in failures.values())
+    if failed:
+        logger.warning('%s status notification(s) failed to send.', failed)
+    return {'sent': len(sent_ids), 'failed': failed}
+
+
+class NotificationDispatcher:
+    def __init__(self, window: float | None = None):
+        self._window = window
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    @property
+    def window(self) -> float:
+        if self._window is not None:
+            return self._window
+        return settings.NOTIFICATION_BATCH_WINDOW
+
+    def enqueue(self, appointment: Appointment) -> StatusNotification | None:
+        if appointment.status not in STATUS_TEMPLATES or not appointment.notification_email:
+            return None
+        notification = StatusNotification.objects.create(
+            appointment=appointment,
+            status=appointment.status,
+            recipient=appointment.notification_email,
+        )
+        transaction.on_commit(self.schedule)
+        return notification
+
+    def schedule(self) -> None:
+        if self.window <= 0:
+            send_pending_notifications()
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> dict[str, int]:
+        with self._lock:
+            self._timer = None
+        try:
+            return send_pending_notifications()
+        except Exception:  # noqa: BLE001 - the timer thread must not die loudly
+            logger.exception('Status notification flush failed.')
+            return {'sent': 0, 'failed': 0}
+        finally:
+            connections.close_all()
+
+    def enqueue_many(self, appointments) -> list[StatusNotification]:
+        notifications = StatusNotification.objects.bulk_create(
+            [
+                StatusNotification(
+                    appointment=appointment,
+                    status=appointment.status,
+                    recipient=appointment.notification_email,
+                )
+                for appointment in appointments
+                if appointment.status in STATUS_TEMPLATES and appointment.notification_email
+            ]
+        )
+        if notifications:
+            transaction.on_commit(self.schedule)
+        return notifications
+
+
+dispatcher = NotificationDispatcher()
+
+
+def queue_status_notification(appointment: Appointment) -> StatusNotification | None:
+    return dispatcher.enqueue(appointment)
+
+
+def queue_status_notifications(appointments) -> list[StatusNotification]:
+    return dispatcher.enqueue_many(appointments)
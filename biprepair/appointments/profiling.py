@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .constants import SESSION_ADMIN_KEY
+from .models import AdminUser
+
+PROFILE_QUERY_PARAM = '__profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_OFF_VALUES = {'0', 'false', 'no', 'off'}
+PROFILE_SORTS = {
+    'cumulative': 'Cumulative time',
+    'tottime': 'Own time',
+    'ncalls': 'Calls',
+}
+PROFILE_ID_RE = re.compile(r'^\d{8}-\d{6}-[a-z0-9]{6}$')
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR)
+
+
+def _profile_path(profile_id: str, suffix: str) -> Path | None:
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = profile_dir() / f'{profile_id}{suffix}'
+    return path if path.exists() else None
+
+
+def list_profiles() -> list[dict]:
+    directory = profile_dir()
+    if not directory.exists():
+        return []
+    profiles = []
+    for path in directory.glob('*.json'):
+        try:
+            meta = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        meta.pop('queries', None)
+        profiles.append(meta)
+    return sorted(profiles, key=lambda meta: meta.get('created_at', ''), reverse=True)
+
+
+def load_profile(profile_id: str) -> dict | None:
+    path = _profile_path(profile_id, '.json')
+    if path is None:
+        return None
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def stats_path(profile_id: str) -> Path | None:
+    return _profile_path(profile_id, '.prof')
+
+
+def _short_location(filename: str, line: int) -> str:
+    for prefix in sorted({str(settings.BASE_DIR), *sys.path}, key=len, reverse=True):
+        if prefix and filename.startswith(prefix + os.sep):
+            filename = filename[len(prefix) + 1 :]
+            break
+    return f'{filename}:{line}' if line else filename
+
+
+def top_functions(profile_id: str, sort: str = 'cumulative', limit: int = 40) -> list[dict]:
+    path = stats_path(profile_id)
+    if path is None:
+        return []
+    stats = pstats.Stats(str(path))
+    stats.sort_stats(sort if sort in PROFILE_SORTS else 'cumulative')
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        primitive_calls, calls, own, cumulative, _callers = stats.stats[func]
+        filename, line, name = func
+        rows.append(
+            {
+                'function': name,
+                'location': _short_location(filename, line),
+                'calls': calls if calls == primitive_calls else f'{calls}/{primitive_calls}',
+                'tottime_ms': own * 1000,
+                'cumtime_ms': cumulative * 1000,
+                'percall_ms': cumulative * 1000 / primitive_calls if primitive_calls else 0,
+            }
+        )
+    return rows
+
+
+def _prune(directory: Path, keep: int) -> None:
+    metas = sorted(directory.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for meta in metas[keep:]:
+        meta.unlink(missing_ok=True)
+        meta.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def _switched_on(value: str | None) -> bool:
+    # A bare ?__profile or an empty header counts as on; 0/false/no/off don't.
+    return value is not None and value.strip().lower() not in PROFILE_OFF_VALUES
+
+
+def _wants_profile(request) -> bool:
+    # The substring test keeps ordinary requests from parsing the query
+    # string here; only a likely hit reads the real parameter value.
+    if PROFILE_QUERY_PARAM in request.META.get('QUERY_STRING', ''):
+        if _switched_on(request.GET.get(PROFILE_QUERY_PARAM)):
+            return True
+    return _switched_on(request.META.get(PROFILE_HEADER))
+
+
+def _profiling_admin(request) -> int | None:
+    admin_id = request.session.get(SESSION_ADMIN_KEY)
+    if not admin_id or not AdminUser.objects.filter(pk=admin_id).exists():
+        return None
+    return admin_id
+
+
+class ProfilingMiddleware:
+    # Off the profiled path this is a substring test on the raw query string
+    # and a dict lookup; no session access or database work.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not _wants_profile(request):
+            return self.get_response(request)
+        admin_id = _profiling_admin(request)
+        if not admin_id:
+            return self.get_response(request)
+        return self._profile(request, admin_id, self.get_response)
+
+    async def __acall__(self, request):
+        if not _wants_profile(request):
+            return await self.get_response(request)
+        admin_id = await sync_to_async(_profiling_admin)(request)
+        if not admin_id:
+            return await self.get_response(request)
+        # Profile from a worker thread that drives the rest of the stack via
+        # async_to_sync. cProfile only sees that thread, which is where sync
+        # views and every ORM call run; awaits in async views are not captured.
+        return await sync_to_async(self._profile)(request, admin_id, async_to_sync(self.get_response))
+
+    def _profile(self, request, admin_id: int, get_response):
+        queries = []
+
+        def record_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append(
+                    {
+                        'alias': context['connection'].alias,
+                        'sql': sql,
+                        'params': repr(params)[:500],
+                        'ms': round((time.perf_counter() - started) * 1000, 3),
+                    }
+                )
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(record_query))
+            response = profiler.runcall(get_response, request)
+        duration = time.perf_counter() - started
+
+        now = timezone.now()
+        profile_id = f"{timezone.localtime(now).strftime('%Y%m%d-%H%M%S')}-{get_random_string(6).lower()}"
+        match = getattr(request, 'resolver_match', None)
+        meta = {
+            'id': profile_id,
+            'created_at': now.isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': (match.view_name if match else None) or '',
+            'status': response.status_code,
+            'admin_id': admin_id,
+            'duration_ms': round(duration * 1000, 2),
+            'query_count': len(queries),
+            'query_ms': round(sum(query['ms'] for query in queries), 2),
+            'queries': queries,
+        }
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(directory / f'{profile_id}.prof'))
+        (directory / f'{profile_id}.json').write_text(json.dumps(meta))
+        _prune(directory, settings.PROFILE_KEEP)
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import UNRESOLVED_VIEW, read_worker_files, write_worker_file
+
+OVERFLOW_FINGERPRINT = '<other statements>'
+QUERYLOG_SORTS = {
+    'total': 'total_seconds',
+    'max': 'max_seconds',
+    'mean': 'mean_seconds',
+    'count': 'count',
+    'slow': 'slow_count',
+}
+EXPORT_FIELDS = [
+    'view',
+    'fingerprint',
+    'count',
+    'total_seconds',
+    'mean_seconds',
+    'max_seconds',
+    'slow_count',
+    'explain_sql',
+    'explain',
+]
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"`.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER_GROUP = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_GROUPS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    # Literals and placeholders become "?", and IN lists / multi-row VALUES
+    # collapse to "(...)", so one statement shape maps to one key regardless
+    # of its arguments.
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_GROUP.sub('(...)', sql)
+    sql = _REPEATED_GROUPS.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def querylog_dir() -> Path:
+    return Path(settings.QUERYLOG_DIR)
+
+
+def _reset_marker() -> str:
+    try:
+        return (querylog_dir() / 'reset').read_text()
+    except OSError:
+        return ''
+
+
+def _empty_entry(view: str, shape: str) -> dict:
+    return {
+        'view': view,
+        'fingerprint': shape,
+        'count': 0,
+        'total_seconds': 0.0,
+        'max_seconds': 0.0,
+        'slow_count': 0,
+        'explain': '',
+        'explain_sql': '',
+        'explain_seconds': 0.0,
+    }
+
+
+class QueryLogRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._entries: dict[str, dict] = {}
+        self._last_flush = 0.0
+        self._reset_seen = _reset_marker()
+
+    def observe(self, view: str, sql: str, params, seconds: float, connection, can_explain: bool = True) -> None:
+        if getattr(self._local, 'explaining', False):
+            return
+        shape = fingerprint(sql)
+        key = hashlib.sha1(f'{view}\n{shape}'.encode()).hexdigest()[:16]
+        slow = seconds * 1000 >= settings.QUERYLOG_SLOW_MS
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= settings.QUERYLOG_MAX_ENTRIES:
+                    key = hashlib.sha1(f'{view}\n{OVERFLOW_FINGERPRINT}'.encode()).hexdigest()[:16]
+                    shape = OVERFLOW_FINGERPRINT
+                    entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _empty_entry(view, shape)
+            entry['count'] += 1
+            entry['total_seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            # Keep the plan of the slowest run seen so far.
+            wants_plan = (
+                slow
+                and can_explain
+                and shape != OVERFLOW_FINGERPRINT
+                and seconds > entry['explain_seconds']
+                and sql.lstrip()[:6].upper() == 'SELECT'
+            )
+            if slow:
+                entry['slow_count'] += 1
+        if wants_plan:
+            plan = self._explain(connection, sql, params)
+            with self._lock:
+                entry.update(explain=plan, explain_sql=sql, explain_seconds=seconds)
+        self.maybe_flush()
+
+    def _explain(self, connection, sql: str, params) -> str:
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        self._local.explaining = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                columns = [column[0] for column in cursor.description or []]
+                rows = cursor.fetchall()
+        except Exception as exc:  # noqa: BLE001 - a failed plan must not fail the request
+            return f'EXPLAIN failed: {exc}'
+        finally:
+            self._local.explaining = False
+        lines = [' | '.join(columns)] if columns else []
+        lines += [' | '.join('' if value is None else str(value) for value in row) for row in rows]
+        return '\n'.join(lines)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._entries.items()}
+
+    def maybe_flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        # Another worker may have reset the log since the last flush; drop
+        # what this one gathered before then instead of writing it back.
+        marker = _reset_marker()
+        if marker != self._reset_seen:
+            self.reset(marker)
+        write_worker_file(querylog_dir(), self.snapshot())
+
+    def reset(self, marker: str | None = None) -> None:
+        with self._lock:
+            self._entries = {}
+            self._reset_seen = _reset_marker() if marker is None else marker
+
+
+registry = QueryLogRegistry()
+
+
+def collect() -> dict[str, dict]:
+    merged: dict[str, dict] = {}
+    for source in [registry.snapshot(), *read_worker_files(querylog_dir())]:
+        for key, entry in source.items():
+            total = merged.get(key)
+            if total is None:
+                merged[key] = dict(entry)
+                continue
+            total['count'] += entry['count']
+            total['total_seconds'] += entry['total_seconds']
+            total['slow_count'] += entry['slow_count']
+            total['max_seconds'] = max(total['max_seconds'], entry['max_seconds'])
+            if entry['explain_seconds'] > total['explain_seconds']:
+                total.update(
+                    explain=entry['explain'],
+                    explain_sql=entry['explain_sql'],
+                    explain_seconds=entry['explain_seconds'],
+                )
+    return merged
+
+
+def report(sort: str = 'total', view: str = '', limit: int | None = None) -> list[dict]:
+    entries = []
+    for entry in collect().values():
+        if view and entry['view'] != view:
+            continue
+        entry['mean_seconds'] = entry['total_seconds'] / entry['count'] if entry['count'] else 0.0
+        entries.append(entry)
+    entries.sort(key=lambda entry: entry[QUERYLOG_SORTS.get(sort, 'total_seconds')], reverse=True)
+    return entries[:limit] if limit else entries
+
+
+def reset() -> None:
+    # Clears every worker: the files are removed here, and each worker sees
+    # the new marker token at its next flush and empties its own registry.
+    directory = querylog_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'reset').write_text(uuid.uuid4().hex)
+    registry.reset()
+    for path in directory.glob('worker-*.json'):
+        path.unlink(missing_ok=True)
+
+
+class QueryLogMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERYLOG_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with _logged(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with _logged(request):
+            return await self.get_response(request)
+
+
+@contextmanager
+def _logged(request):
+    def record_query(execute, sql, params, many, context):
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            result = execute(sql, params, many, context)
+            succeeded = True
+            return result
+        finally:
+            registry.observe(
+                _view_for(request),
+                sql,
+                params,
+                time.perf_counter() - started,
+                context['connection'],
+                can_explain=succeeded and not many,
+            )
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(record_query))
+        yield
+
+
+def _view_for(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name if match else None) or UNRESOLVED_VIEW
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+
+from .constants import SESSION_CLIENT_KEY
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_local = threading.local()
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    # "5/m": a bucket of 5 tokens that refills completely over a minute.
+    count, _, period = rate.partition('/')
+    return int(count), float(PERIODS[period])
+
+
+def _store() -> sqlite3.Connection:
+    # Buckets live in their own SQLite file shared by every worker on the
+    # host, not in a cache: a cache culls entries once it fills up, so a
+    # client spraying identifiers could evict everyone else's buckets.
+    # SQLite's write lock makes each take-a-token step atomic across
+    # processes. One connection per thread, reopened in a forked worker.
+    path = str(settings.RATELIMIT_DB_PATH)
+    store = getattr(_local, 'store', None)
+    if store is None or _local.pid != os.getpid() or _local.path != path:
+        store = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        store.execute('PRAGMA journal_mode = WAL')
+        store.execute('PRAGMA synchronous = NORMAL')
+        store.execute(
+            'CREATE TABLE IF NOT EXISTS buckets '
+            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, expires REAL NOT NULL)'
+        )
+        store.execute('CREATE INDEX IF NOT EXISTS buckets_expires ON buckets (expires)')
+        _local.store, _local.pid, _local.path = store, os.getpid(), path
+    return store
+
+
+def consume(bucket: str, rate: str) -> float:
+    # Takes one token; returns 0 when allowed, otherwise seconds until a token
+    # is available. A bucket that would be full again simply expires.
+    capacity, period = parse_rate(rate)
+    refill = capacity / period
+    store = _store()
+    store.execute('BEGIN IMMEDIATE')
+    try:
+        now = time.time()
+        row = store.execute(
+            'SELECT tokens, updated FROM buckets WHERE key = ? AND expires > ?', (bucket, now)
+        ).fetchone()
+        tokens, updated = row or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        wait = 0.0
+        if tokens < 1:
+            wait = (1 - tokens) / refill
+        else:
+            store.execute(
+                'INSERT INTO buckets (key, tokens, updated, expires) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET '
+                'tokens = excluded.tokens, updated = excluded.updated, expires = excluded.expires',
+                (bucket, tokens - 1, now, now + period),
+            )
+            store.execute('DELETE FROM buckets WHERE expires <= ?', (now,))
+        store.execute('COMMIT')
+    except BaseException:
+        store.execute('ROLLBACK')
+        raise
+    return wait
+
+
+def client_ip(request) -> str:
+    return request.META.get(settings.RATELIMIT_CLIENT_IP_HEADER) or request.META.get('REMOTE_ADDR', '')
+
+
+def field(*names: str):
+    def key(request) -> str:
+        data = request.POST if request.method == 'POST' else request.GET
+        return '|'.join(data.get(name, '').strip().lower() for name in names)
+
+    return key
+
+
+def session_client(request) -> str:
+    return str(request.session.get(SESSION_CLIENT_KEY) or '')
+
+
+def _bucket(scope: str, key, request) -> str | None:
+    identity = client_ip(request) if key == 'ip' else key(request)
+    if not identity.strip('|'):
+        return None
+    # Identifiers are emails and phone numbers; only a digest goes in the key.
+    return f'{scope}:{hashlib.sha1(identity.encode()).hexdigest()[:20]}'
+
+
+def _check(scope: str, rate: str, key, methods, request) -> HttpResponse | None:
+    if not settings.RATELIMIT_ENABLED or request.method not in methods:
+        return None
+    bucket = _bucket(scope, key, request)
+    if bucket is None:
+        return None
+    try:
+        wait = consume(bucket, rate)
+    except (OSError, sqlite3.Error):
+        # An unusable bucket file must not lock users out.
+        return None
+    if not wait:
+        return None
+    retry_after = max(1, math.ceil(wait))
+    response = HttpResponse(
+        f'Too many attempts. Try again in {retry_after} seconds.', status=429, content_type='text/plain'
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(scope: str, rate: str, key='ip', methods=('POST',)):
+    # key is 'ip' or a callable returning the identifier to bucket on (empty
+    # means no bucket). Stack the decorator for several buckets per view.
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                limited = await sync_to_async(_check)(scope, rate, key, methods, request)
+                return limited or await view_func(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            return _check(scope, rate, key, methods, request) or view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .constants import SESSION_PRIMARY_UNTIL_KEY
+
+REPLICA_ALIAS = 'replica'
+READ_ONLY_METHODS = ('GET', 'HEAD')
+
+_use_replica: ContextVar[bool] = ContextVar('repairhub_use_replica', default=False)
+_wrote: ContextVar[bool] = ContextVar('repairhub_wrote', default=False)
+
+
+class ReplicaRouter:
+    # Reads go to the replica only inside a @replica_reads view; everything
+    # else, and every write, stays on the primary. Session rows are written on
+    # most requests and don't count as a write for read-your-writes pinning.
+    def db_for_read(self, model, **hints):
+        if settings.READ_REPLICA_ENABLED and _use_replica.get():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != 'sessions':
+            _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema through replication.
+        return db != REPLICA_ALIAS
+
+
+def reading_replica() -> bool:
+    return settings.READ_REPLICA_ENABLED and _use_replica.get()
+
+
+def _pinned_to_primary(request) -> bool:
+    return request.session.get(SESSION_PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+def _from_replica(chunks):
+    # Streamed exports run their queries after the view has returned, so the
+    # flag has to be set around each chunk as well.
+    iterator = iter(chunks)
+    while True:
+        token = _use_replica.set(True)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _use_replica.reset(token)
+        yield chunk
+
+
+def replica_reads(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if (
+            not settings.READ_REPLICA_ENABLED
+            or request.method not in READ_ONLY_METHODS
+            or _pinned_to_primary(request)
+        ):
+            return view_func(request, *args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            response = view_func(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+        if response.streaming:
+            response.streaming_content = _from_replica(response.streaming_content)
+        return response
+
+    return wrapper
+
+
+class ReplicaPinMiddleware:
+    # Keeps a session on the primary for DB_REPLICA_PIN_SECONDS after any
+    # request in it writes, so it never reads stale rows from a lagging replica.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.READ_REPLICA_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                _pin(request)
+        finally:
+            _wrote.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        # sync_to_async copies context changes back, so writes made in the
+        # view's ORM threads still show up in _wrote here.
+        token = _wrote.set(False)
+        try:
+            response = await self.get_response(request)
+            if _wrote.get():
+                await sync_to_async(_pin)(request)
+        finally:
+            _wrote.reset(token)
+        return response
+
+
+def _pin(request) -> None:
+    request.session[SESSION_PRIMARY_UNTIL_KEY] = time.time() + settings.DB_REPLICA_PIN_SECONDS
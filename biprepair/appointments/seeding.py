@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import calendar
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import generations
+from .bulk import allocate_appointment_ids, manual_timestamps
+from .catalog import catalog
+from .forms import AppointmentForm
+from .models import (
+    AdminUser,
+    Appointment,
+    ClientAccount,
+    ContactMessage,
+    ContactMessageReply,
+    DailyAppointmentStat,
+)
+
+# Bookings follow the academic calendar: busy at the start of each semester
+# and around finals, quiet over the summer break and the holidays.
+MONTHLY_SEASONALITY = {
+    1: 1.1, 2: 1.0, 3: 1.25, 4: 0.6, 5: 0.45, 6: 0.6,
+    7: 0.85, 8: 1.35, 9: 1.2, 10: 1.15, 11: 1.0, 12: 0.7,
+}
+HOURLY_ACTIVITY = [0.2] * 7 + [0.6, 1.0, 1.2, 1.3, 1.3, 1.4, 1.4, 1.3, 1.2, 1.1, 1.0, 1.1, 1.2, 1.1, 0.8, 0.5, 0.3]
+DEVICE_WEIGHTS = {
+    Appointment.DEVICE_ANDROID: 0.55,
+    Appointment.DEVICE_IPHONE: 0.25,
+    Appointment.DEVICE_LAPTOP: 0.20,
+}
+UPCOMING_STATUS_MIX = {
+    Appointment.STATUS_PENDING: 0.55,
+    Appointment.STATUS_APPROVED: 0.35,
+    Appointment.STATUS_IN_PROGRESS: 0.10,
+}
+PAST_STATUS_MIX = {
+    Appointment.STATUS_COMPLETED: 0.70,
+    Appointment.STATUS_DECLINED: 0.09,
+    Appointment.STATUS_PARTS_UNAVAILABLE: 0.08,
+    Appointment.STATUS_PENDING: 0.05,
+    Appointment.STATUS_APPROVED: 0.05,
+    Appointment.STATUS_IN_PROGRESS: 0.03,
+}
+ISSUE_DESCRIPTIONS = {
+    'lcd': 'Screen cracked after a drop; touch still works in parts.',
+    'amoled': 'Green lines across the display and ghost touches.',
+    'back_cover': 'Back glass shattered, edges are sharp.',
+    'camera': 'Rear camera shows a black screen.',
+    'speaker': 'Earpiece is very quiet during calls.',
+    'buttons': 'Power button is stuck and does not click.',
+    'sub_board': 'Charging port only works at an angle.',
+    'frame': 'Frame is bent near the volume keys.',
+    'laptop_lcd': 'Display flickers and has a dead vertical band.',
+    'keyboard': 'Several keys stopped responding after a spill.',
+    'ram': 'Wants to go from 8GB to 16GB for coursework.',
+    'storage': 'Needs a bigger SSD; current drive is full.',
+    'fan': 'Fan grinds loudly under load.',
+    'thermal': 'Overheats and throttles during video calls.',
+    'io_board': 'USB ports on the left side stopped working.',
+}
+FIRST_NAMES = [
+    'Andrea', 'Miguel', 'Bea', 'Paolo', 'Carla', 'Joshua', 'Denise', 'Rafael', 'Erika', 'Mark',
+    'Francine', 'Carlo', 'Gabrielle', 'Kevin', 'Hannah', 'Luis', 'Isabel', 'Nathan', 'Janelle', 'Paul',
+]
+LAST_NAMES = [
+    'Santos', 'Reyes', 'Cruz', 'Bautista', 'Ocampo', 'Garcia', 'Mendoza', 'Torres', 'Tomas', 'Andrada',
+    'Castillo', 'Flores', 'Villanueva', 'Ramos', 'Castro', 'Rivera', 'Aquino', 'Navarro', 'Salazar', 'Mercado',
+]
+MESSAGE_TOPICS = [
+    ('Parts ETA', 'Any update on when the replacement part arrives?'),
+    ('Reschedule meet-up', 'Can we move my meet-up to Saturday instead?'),
+    ('Quote question', 'Is the quoted price inclusive of the screen protector?'),
+    ('Pickup location', 'Can I pick up at the canteen instead of the study hub?'),
+    ('Payment', 'I sent the GCash payment, please confirm.'),
+]
+REPLY_BODIES = [
+    'Thanks for reaching out, checking with the technician now.',
+    'Noted, we have updated your appointment.',
+    'The part is in transit and should arrive this week.',
+    'Payment received, see you at the meet-up.',
+]
+
+
+def _zipf_weights(count: int) -> list[float]:
+    return [1 / (rank + 1) for rank in range(count)]
+
+
+def _cumulative(weights) -> list[float]:
+    return list(accumulate(weights))
+
+
+def open_slot(rng: random.Random, after, days: int = 21):
+    # A preferred time the booking form accepts: a future day with at least
+    # one WEEKLY_AVAILABILITY window, on a quarter hour inside that window.
+    local_after = timezone.localtime(after)
+    while True:
+        day = local_after + timedelta(days=rng.randint(1, days))
+        windows = AppointmentForm.WEEKLY_AVAILABILITY.get(day.weekday(), [])
+        if not windows:
+            continue
+        start, end = rng.choice(windows)
+        quarter = rng.randrange(start * 4, end * 4)
+        return day.replace(hour=quarter // 4, minute=(quarter % 4) * 15, second=0, microsecond=0)
+
+
+class DeviceCatalogSampler:
+    # Brands and models are listed roughly by popularity in the catalog, so a
+    # Zipf weighting over list order gives a believable long tail. Cumulative
+    # weights are built once; rng.choices() is then a bisect per draw.
+    def __init__(self):
+        self.device_types = list(DEVICE_WEIGHTS)
+        self.device_cum = _cumulative(DEVICE_WEIGHTS.values())
+        self.brands = {}
+        self.models = {}
+        self.services = {}
+        for device_type in self.device_types:
+            ordered = [
+                value for value, _ in catalog.brand_choices(device_type) if catalog.model_suggestions(device_type, value)
+            ]
+            self.brands[device_type] = (ordered, _cumulative(_zipf_weights(len(ordered))))
+            for brand in ordered:
+                models = catalog.model_suggestions(device_type, brand)
+                self.models[(device_type, brand)] = (models, _cumulative(_zipf_weights(len(models))))
+            services = [value for value, _ in catalog.service_choices(device_type)]
+            self.services[device_type] = (services, _cumulative(_zipf_weights(len(services))))
+
+    def sample(self, rng: random.Random) -> tuple[str, str, str, str]:
+        device_type = rng.choices(self.device_types, cum_weights=self.device_cum)[0]
+        brands, brand_cum = self.brands[device_type]
+        brand = rng.choices(brands, cum_weights=brand_cum)[0]
+        models, model_cum = self.models[(device_type, brand)]
+        services, service_cum = self.services[device_type]
+        return (
+            device_type,
+            brand,
+            rng.choices(models, cum_weights=model_cum)[0],
+            rng.choices(services, cum_weights=service_cum)[0],
+        )
+
+
+class SeasonalClock:
+    # Draws timestamps inside [start, end) with MONTHLY_SEASONALITY and
+    # HOURLY_ACTIVITY applied.
+    def __init__(self, start: datetime, end: datetime):
+        self.tz = timezone.get_current_timezone()
+        self.start, self.end = start, end
+        self.months = []
+        cursor = timezone.localtime(start, self.tz).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        weights = []
+        while cursor < end:
+            days = calendar.monthrange(cursor.year, cursor.month)[1]
+            self.months.append((cursor.year, cursor.month, days))
+            weights.append(MONTHLY_SEASONALITY[cursor.month] * days)
+            cursor = (cursor + timedelta(days=days)).replace(day=1)
+        self.month_cum = _cumulative(weights)
+        self.hour_cum = _cumulative(HOURLY_ACTIVITY)
+
+    def sample(self, rng: random.Random) -> datetime:
+        while True:
+            year, month, days = rng.choices(self.months, cum_weights=self.month_cum)[0]
+            hour = rng.choices(range(24), cum_weights=self.hour_cum)[0]
+            moment = datetime(year, month, rng.randint(1, days), hour, rng.randrange(60), rng.randrange(60))
+            moment = timezone.make_aware(moment, self.tz)
+            if self.start <= moment < self.end:
+                return moment
+
+
+def _weighted_picker(mix: dict[str, float]):
+    values = list(mix)
+    cum = _cumulative(mix.values())
+    return lambda rng: rng.choices(values, cum_weights=cum)[0]
+
+
+class ScaleDataSeeder:
+    def __init__(
+        self,
+        seed: int = 1,
+        months: int = 24,
+        batch_size: int = 5000,
+        password: str = 'password123',
+        email_domain: str = 'seed.campus.test',
+        now: datetime | None = None,
+        log=None,
+    ):
+        self.rng = random.Random(seed)
+        # Appointment ids draw from their own stream so that --batch-size,
+        # which interleaves row and id generation, doesn't change the data.
+        self.id_rng = random.Random(f'{seed}:appointment-ids')
+        self.now = now or timezone.now()
+        self.clock = SeasonalClock(self.now - timedelta(days=months * 30), self.now)
+        self.catalog = DeviceCatalogSampler()
+        self.batch_size = batch_size
+        self.email_domain = email_domain
+        self.log = log or (lambda message: None)
+        # One PBKDF2 run for the whole dataset; every seeded account shares it.
+        self.password_hash = make_password(password)
+        self.upcoming_status = _weighted_picker(UPCOMING_STATUS_MIX)
+        self.past_status = _weighted_picker(PAST_STATUS_MIX)
+        self.clients: list[tuple[int, str, str, str]] = []
+        self.admin_ids: list[int] = []
+
+    def _next_id(self, model) -> int:
+        # Explicit primary keys: MySQL does not hand generated ids back from
+        # bulk_create, and children (appointments, replies) need them.
+        return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+    def seed_admins(self) -> None:
+        self.admin_ids = list(AdminUser.objects.values_list('id', flat=True))
+        if not self.admin_ids:
+            admin = AdminUser.objects.create(username='seed-admin', full_name='Seed Admin', password=self.password_hash)
+            self.admin_ids = [admin.id]
+
+    def seed_clients(self, count: int) -> None:
+        rng = self.rng
+        programs = [value for value, _ in ClientAccount.SCHOOL_PROGRAM_CHOICES]
+        first_id = self._next_id(ClientAccount)
+        for offset in range(0, count, self.batch_size):
+            batch = []
+            for pk in range(first_id + offset, first_id + min(count, offset + self.batch_size)):
+                full_name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+                email = f'client{pk}@{self.email_domain}'
+                contact_number = f'09{rng.randrange(10 ** 9):09d}'
+                batch.append(
+                    ClientAccount(
+                        id=pk,
+                        email=email,
+                        full_name=full_name,
+                        student_id=f'{rng.randint(2018, 2025)}-{pk:06d}',
+                        contact_number=contact_number,
+                        school_program=rng.choice(programs),
+                        student_type='irregular' if rng.random() < 0.15 else 'regular',
+                        password=self.password_hash,
+                        created_at=self.clock.sample(rng),
+                    )
+                )
+                self.clients.append((pk, email, full_name, contact_number))
+            with transaction.atomic(), manual_timestamps(ClientAccount, 'created_at'):
+                ClientAccount.objects.bulk_create(batch, batch_size=self.batch_size)
+            self.log(f'{offset + len(batch)}/{count} clients')
+        # bulk_create sends no signals, so the cached admin tables are retired here.
+        generations.bump(generations.CLIENTS)
+
+    def load_clients(self) -> None:
+        if not self.clients:
+            self.clients = list(ClientAccount.objects.values_list('id', 'email', 'full_name', 'contact_number'))
+
+    def _appointment(self, client, created_at) -> Appointment:
+        rng = self.rng
+        client_id, email, full_name, contact_number = client
+        device_type, brand, model, service = self.catalog.sample(rng)
+        preferred = open_slot(rng, created_at, days=14)
+        status = self.upcoming_status(rng) if preferred > self.now else self.past_status(rng)
+        updated_at = created_at if status == Appointment.STATUS_PENDING else min(
+            self.now, created_at + timedelta(hours=rng.randint(1, 72))
+        )
+        return Appointment(
+            client_id=client_id,
+            full_name=full_name,
+            contact_number=contact_number,
+            notification_email=email if rng.random() < 0.8 else '',
+            device_type=device_type,
+            device_brand=brand,
+            brand_model=model,
+            service_type=service,
+            issue_description=ISSUE_DESCRIPTIONS.get(service, 'Needs a technician to take a look.'),
+            preferred_datetime=preferred,
+            location=rng.choice(Appointment.LOCATION_CHOICES)[0],
+            payment_method=Appointment.PAYMENT_GCASH if rng.random() < 0.4 else Appointment.PAYMENT_PERSONAL,
+            status=status,
+            quoted_price=Decimal(catalog.price(device_type, service)),
+            parts_ordered=status in (Appointment.STATUS_APPROVED, Appointment.STATUS_IN_PROGRESS) and rng.random() < 0.3,
+            created_at=created_at,
+            updated_at=updated_at,
+            completed_at=updated_at if status == Appointment.STATUS_COMPLETED else None,
+        )
+
+    def seed_appointments(self, count: int) -> list[str]:
+        self.load_clients()
+        if not self.clients:
+            return []
+        rng = self.rng
+        sample_ids = []
+        for offset in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - offset)
+            batch = [self._appointment(rng.choice(self.clients), self.clock.sample(rng)) for _ in range(size)]
+            allocate_appointment_ids(batch, random_source=self.id_rng)
+            with transaction.atomic(), manual_timestamps(Appointment, 'created_at', 'updated_at'):
+                Appointment.objects.bulk_create(batch, batch_size=self.batch_size)
+            if len(sample_ids) < 1000:
+                sample_ids.extend(appointment.appointment_id for appointment in batch[: 1000 - len(sample_ids)])
+            self.log(f'{offset + size}/{count} appointments')
+        generations.bump(generations.APPOINTMENTS, generations.CLIENTS)
+        return sample_ids
+
+    def seed_threads(self, count: int, max_replies: int = 4) -> list[str]:
+        self.load_clients()
+        if not self.clients:
+            return []
+        if not self.admin_ids:
+            self.seed_admins()
+        rng = self.rng
+        first_id = self._next_id(ContactMessage)
+        emails = set()
+        for offset in range(0, count, self.batch_size):
+            messages, replies = [], []
+            for pk in range(first_id + offset, first_id + min(count, offset + self.batch_size)):
+                client_id, email, _name, _contact = rng.choice(self.clients)
+                subject, body = rng.choice(MESSAGE_TOPICS)
+                created_at = self.clock.sample(rng)
+                updated_at = created_at
+                for _ in range(rng.randint(0, max_replies)):
+                    updated_at = min(self.now, updated_at + timedelta(minutes=rng.randint(5, 2 * 24 * 60)))
+                    replies.append(
+                        ContactMessageReply(
+                            message_id=pk,
+                            admin_id=rng.choice(self.admin_ids),
+                            body=rng.choice(REPLY_BODIES),
+                            created_at=updated_at,
+                        )
+                    )
+                age = self.now - created_at
+                if age > timedelta(days=14):
+                    status = ContactMessage.STATUS_RESOLVED
+                elif updated_at > created_at:
+                    status = ContactMessage.STATUS_IN_REVIEW
+                else:
+                    status = ContactMessage.STATUS_OPEN
+                messages.append(
+                    ContactMessage(
+                        id=pk,
+                        client_id=client_id,
+                        subject=subject,
+                        body=body,
+                        preferred_contact=rng.choice(ContactMessage.PREFERRED_CHOICES)[0],
+                        status=status,
+                        created_at=created_at,
+                        updated_at=updated_at,
+                    )
+                )
+                if len(emails) < 1000:
+                    emails.add(email)
+            with transaction.atomic():
+                with manual_timestamps(ContactMessage, 'created_at', 'updated_at'):
+                    ContactMessage.objects.bulk_create(messages, batch_size=self.batch_size)
+                with manual_timestamps(ContactMessageReply, 'created_at'):
+                    ContactMessageReply.objects.bulk_create(replies, batch_size=self.batch_size)
+            self.log(f'{offset + len(messages)}/{count} message threads')
+        generations.bump(generations.MESSAGES)
+        return sorted(emails)
+
+    def refresh_counters(self) -> None:
+        client_ids = [client[0] for client in self.clients]
+        for offset in range(0, len(client_ids), self.batch_size):
+            with transaction.atomic():
+                ClientAccount.refresh_counters(client_ids[offset : offset + self.batch_size])
+        generations.bump(generations.CLIENTS)
+        self.log(f'Refreshed counters for {len(client_ids)} clients')
+
+    def refresh_daily_stats(self) -> None:
+        with transaction.atomic():
+            facts = DailyAppointmentStat.rebuild()
+        self.log(f'Rebuilt {facts} daily appointment facts')
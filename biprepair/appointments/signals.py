@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import generations
+from .catalog import catalog
+from .models import (
+    Appointment,
+    ClientAccount,
+    ContactMessage,
+    ContactMessageReply,
+    DailyAppointmentStat,
+    DeviceBrand,
+    DeviceModel,
+    ServiceOffering,
+    ServicePrice,
+    local_day,
+)
+
+CATALOG_MODELS = (DeviceBrand, DeviceModel, ServiceOffering, ServicePrice)
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_refreshes():
+    # Queryset deletes send post_delete once per row. Inside this block the
+    # receivers below only note the clients and days they would recompute,
+    # and each is recomputed (and the tables bumped) once when the block
+    # exits without an error.
+    pending = _deferred.pending = {'clients': set(), 'days': set()}
+    try:
+        yield
+    finally:
+        _deferred.pending = None
+    ClientAccount.refresh_counters(pending['clients'])
+    DailyAppointmentStat.refresh_days(pending['days'])
+    if pending['days']:
+        generations.bump_on_commit(generations.APPOINTMENTS, generations.CLIENTS)
+
+
+def _refresh_counters(client_ids) -> None:
+    pending = getattr(_deferred, 'pending', None)
+    if pending is None:
+        ClientAccount.refresh_counters(client_ids)
+    else:
+        pending['clients'].update(client_ids)
+
+
+def _refresh_days(days) -> None:
+    pending = getattr(_deferred, 'pending', None)
+    if pending is None:
+        DailyAppointmentStat.refresh_days(days)
+    else:
+        pending['days'].update(days)
+
+
+@receiver(post_init, sender=Appointment)
+def remember_loaded_client(sender, instance: Appointment, **kwargs) -> None:
+    instance._loaded_client_id = instance.client_id
+
+
+@receiver(post_save, sender=Appointment)
+def refresh_counters_on_save(sender, instance: Appointment, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+    _refresh_counters({instance.client_id, getattr(instance, '_loaded_client_id', None)})
+    instance._loaded_client_id = instance.client_id
+
+
+@receiver(post_delete, sender=Appointment)
+def refresh_counters_on_delete(sender, instance: Appointment, **kwargs) -> None:
+    _refresh_counters({instance.client_id})
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def refresh_daily_stats(sender, instance: Appointment, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        _refresh_days({local_day(instance.created_at)})
+
+
+@receiver(post_init, sender=ClientAccount)
+def remember_loaded_program(sender, instance: ClientAccount, **kwargs) -> None:
+    instance._loaded_school_program = instance.school_program
+
+
+@receiver(post_save, sender=ClientAccount)
+def refresh_daily_stats_on_program_change(
+    sender, instance: ClientAccount, created: bool = False, raw: bool = False, **kwargs
+) -> None:
+    # Facts are split by the client's program, so a change moves every day
+    # the client booked on.
+    changed = instance.school_program != getattr(instance, '_loaded_school_program', instance.school_program)
+    instance._loaded_school_program = instance.school_program
+    if created or raw or not changed:
+        return
+    DailyAppointmentStat.refresh_days(
+        local_day(created_at) for created_at in instance.appointments.values_list('created_at', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=ClientAccount)
+def remember_client_days(sender, instance: ClientAccount, **kwargs) -> None:
+    instance._booked_days = {
+        local_day(created_at) for created_at in instance.appointments.values_list('created_at', flat=True)
+    }
+
+
+@receiver(post_delete, sender=ClientAccount)
+def refresh_daily_stats_on_client_delete(sender, instance: ClientAccount, **kwargs) -> None:
+    # SET_NULL detaches the appointments with an UPDATE that sends no signals.
+    DailyAppointmentStat.refresh_days(getattr(instance, '_booked_days', ()))
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def bump_appointment_tables(sender, raw: bool = False, **kwargs) -> None:
+    # Both lists change: client rows show the appointment counters.
+    if not raw and getattr(_deferred, 'pending', None) is None:
+        generations.bump_on_commit(generations.APPOINTMENTS, generations.CLIENTS)
+
+
+@receiver(post_save, sender=ClientAccount)
+@receiver(post_delete, sender=ClientAccount)
+def bump_client_table(sender, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        generations.bump_on_commit(generations.CLIENTS)
+
+
+@receiver(post_save, sender=ContactMessage)
+@receiver(post_delete, sender=ContactMessage)
+@receiver(post_save, sender=ContactMessageReply)
+@receiver(post_delete, sender=ContactMessageReply)
+def bump_message_table(sender, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        generations.bump_on_commit(generations.MESSAGES)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs) -> None:
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    if _is_checked_in_database(connection.settings_dict['NAME']):
+        # journal_mode is the one pragma stored in the database file. The demo
+        # database is tracked in git, so leave it in rollback-journal mode
+        # rather than rewrite its header on every run; point SQLITE_PATH at a
+        # copy for WAL.
+        pragmas.pop('journal_mode', None)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def _is_checked_in_database(name) -> bool:
+    try:
+        return Path(name).resolve() == (Path(settings.BASE_DIR) / 'db.sqlite3').resolve()
+    except (TypeError, OSError):
+        return False
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_catalog(sender, raw: bool = False, **kwargs) -> None:
+    if sender in CATALOG_MODELS and not raw:
+        transaction.on_commit(catalog.invalidate)
+
+
+@receiver(request_started)
+def refresh_catalog(sender, **kwargs) -> None:
+    catalog.refresh_if_changed()
@@ -1,3 +1,2107 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import html
+import json
+import multiprocessing
+import os
+import re
+import socketserver
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core import mail
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Sum
+from django.template import engines
+from django.template.loader import get_template
+from django.test import (
+    AsyncClient,
+    Client,
+    LiveServerTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import assignments, bench, querylog, ratelimit, urls, views, warmup
+from .compression import accepted_encoding
+from .management.commands import import_records
+from .catalog import CATALOG_PATH, Catalog, catalog
+from .constants import SESSION_ADMIN_KEY, SESSION_CLIENT_KEY
+from .metrics import collect, registry, write_worker_file
+from .notifications import queue_status_notifications, send_pending_notifications
+from .models import (
+    AdminUser,
+    Appointment,
+    ClientAccount,
+    ContactMessage,
+    DailyAppointmentRollup,
+    DailyAppointmentStat,
+    DeviceBrand,
+    ServiceOffering,
+    ServicePrice,
+    StatusNotification,
+)
+from .seeding import ScaleDataSeeder
+
+MAX_RESPONSE_SECONDS = float(os.getenv('QUERY_BUDGET_MAX_SECONDS', '2.0'))
+
+# Upper bound on queries per request for the worst role. Counts include the
+# session lookup. Every URL in appointments/urls.py needs an entry.
+QUERY_BUDGETS = {
+    'home': 2,
+    'book_appointment': 3,
+    'check_status': 4,
+    'status_lookup': 2,
+    'client_login': 2,
+    'client_logout': 4,
+    'client_register': 2,
+    'contact_admin': 7,
+    'contact_admin_history': 6,
+    'admin_login': 2,
+    'admin_logout': 4,
+    'admin_register': 2,
+    'admin_dashboard': 4,
+    'admin_analytics': 3,
+    'admin_appointments': 3,
+    'admin_bulk_appointments': 2,
+    'admin_detail': 4,
+    'admin_delete_appointment': 3,
+    'admin_claim_appointment': 3,
+    'admin_release_appointment': 3,
+    'admin_queue': 4,
+    'admin_claim_next': 2,
+    'admin_messages': 4,
+    'admin_message_detail': 9,
+    'admin_clients': 3,
+    'admin_client_detail': 4,
+    'admin_export_appointments': 3,
+    'admin_export_clients': 3,
+    'admin_export_messages': 3,
+    'admin_queries': 2,
+    'admin_queries_export': 2,
+    'admin_queries_reset': 2,
+    'admin_profiles': 2,
+    'admin_profile_detail': 2,
+    'admin_profile_download': 2,
+    'admin_catalog': 6,
+    'admin_settings': 2,
+    'terms_of_service': 2,
+    'privacy_policy': 2,
+    'tracking_policy': 2,
+}
+
+SMALL_DATASET = {'clients': 5, 'appointments': 40, 'threads': 5}
+LARGE_DATASET = {'clients': 40, 'appointments': 400, 'threads': 40}
+
+
+# The test runner forces DEBUG off, and the manifest storage would then need
+# collectstatic output.
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = AdminUser.objects.create(username='budget-admin', full_name='Budget Admin', password='!')
+        cls.account = ClientAccount.objects.create(
+            email='budget@campus.test', full_name='Budget Client', contact_number='09170000000', password='!'
+        )
+
+    def setUp(self):
+        # Rate-limit buckets would carry over from earlier runs.
+        _use_private_caches(self)
+
+    def _grow(self, dataset: dict, seed: int) -> None:
+        seeder = ScaleDataSeeder(seed=seed, now=timezone.now(), log=None)
+        seeder.admin_ids = [self.admin.id]
+        seeder.seed_clients(dataset['clients'])
+        seeder.seed_appointments(dataset['appointments'])
+        seeder.seed_threads(dataset['threads'])
+        # The signed-in client's own history grows with the dataset too.
+        seeder.clients = [(self.account.id, self.account.email, self.account.full_name, self.account.contact_number)]
+        seeder.seed_appointments(dataset['appointments'] // 10)
+        seeder.seed_threads(dataset['threads'] // 5)
+        seeder.clients = list(ClientAccount.objects.values_list('id', 'email', 'full_name', 'contact_number'))
+        seeder.refresh_counters()
+        seeder.refresh_daily_stats()
+
+    def _url_for(self, pattern) -> str:
+        kwargs = {}
+        converters = pattern.pattern.converters
+        if 'appointment_id' in converters:
+            kwargs['appointment_id'] = self.appointment.appointment_id
+        if 'message_id' in converters:
+            kwargs['message_id'] = self.message.id
+        if 'client_id' in converters:
+            kwargs['client_id'] = self.account.id
+        if 'profile_id' in converters:
+            kwargs['profile_id'] = '20000101-000000-absent'
+        return reverse(pattern.name, kwargs=kwargs)
+
+    def _measure(self, role: str | None) -> dict:
+        results = {}
+        for pattern in urls.urlpatterns:
+            client = Client()
+            session = client.session
+            if role == 'client':
+                session[SESSION_CLIENT_KEY] = self.account.id
+            elif role == 'admin':
+                session[SESSION_ADMIN_KEY] = self.admin.id
+            session.save()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(self._url_for(pattern))
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+            self.assertLess(response.status_code, 500, pattern.name)
+            results[pattern.name] = (len(queries), elapsed, [query['sql'] for query in queries.captured_queries])
+        return results
+
+    def _assert_budgets(self, role: str | None) -> None:
+        self._grow(SMALL_DATASET, seed=1)
+        self.appointment = Appointment.objects.filter(client=self.account).order_by('id').first()
+        self.message = ContactMessage.objects.filter(client=self.account).order_by('id').first()
+        small = self._measure(role)
+        self._grow(LARGE_DATASET, seed=2)
+        large = self._measure(role)
+
+        for name, (count, elapsed, statements) in large.items():
+            with self.subTest(role=role or 'anonymous', view=name):
+                sql = '\n'.join(f'  {statement}' for statement in statements)
+                self.assertIn(name, QUERY_BUDGETS, f'{name} has no entry in QUERY_BUDGETS')
+                self.assertEqual(
+                    small[name][0],
+                    count,
+                    f'{name} ran {small[name][0]} queries on the small dataset and {count} on the large one:\n{sql}',
+                )
+                self.assertLessEqual(
+                    count, QUERY_BUDGETS[name], f'{name} ran {count} queries (budget {QUERY_BUDGETS[name]}):\n{sql}'
+                )
+                self.assertLess(
+                    elapsed, MAX_RESPONSE_SECONDS, f'{name} took {elapsed:.3f}s (ceiling {MAX_RESPONSE_SECONDS}s)'
+                )
+
+    def test_anonymous_views(self):
+        self._assert_budgets(None)
+
+    def test_client_views(self):
+        self._assert_budgets('client')
+
+    def test_admin_views(self):
+        self._assert_budgets('admin')
+
+
+class _FakeSMTPHandler(socketserver.StreamRequestHandler):
+    # Just enough SMTP for Django's backend. Recipients listed in
+    # server.refused are rejected at RCPT, like an unknown mailbox.
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self._reply('220 fake ESMTP')
+        recipients = []
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self._reply('250 fake')
+            elif verb in ('MAIL', 'RSET', 'NOOP'):
+                recipients = []
+                self._reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip(' <>')
+                if address in server.refused:
+                    self._reply('550 No such user')
+                else:
+                    recipients.append(address)
+                    self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                body = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                server.messages.append((recipients, body.decode()))
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Not implemented')
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class NotificationTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        self.appointments = [
+            Appointment.objects.create(
+                full_name=f'Notified {index}',
+                contact_number=f'0917333{index:04d}',
+                notification_email=f'owner{index}@campus.test',
+                device_type=Appointment.DEVICE_ANDROID,
+                brand_model='Galaxy A54',
+                service_type='lcd',
+                issue_description='Cracked screen',
+                preferred_datetime=timezone.now(),
+                location=Appointment.LOCATION_CHOICES[0][0],
+                status=Appointment.STATUS_APPROVED,
+            )
+            for index in range(5)
+        ]
+
+    @override_settings(NOTIFICATION_BATCH_WINDOW=0)
+    def test_status_change_is_mailed_after_commit(self):
+        appointment = self.appointments[0]
+        Appointment.objects.filter(pk=appointment.pk).update(status=Appointment.STATUS_PENDING)
+        client = _admin_client(AdminUser.objects.create(username='mail-admin', full_name='Mail Admin', password='!'))
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(
+                reverse('admin_detail', kwargs={'appointment_id': appointment.appointment_id}),
+                {
+                    'status': Appointment.STATUS_COMPLETED,
+                    'quoted_price': '350',
+                    'admin_notes': '',
+                    'version': appointment.version,
+                },
+            )
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [appointment.notification_email])
+        self.assertIn(appointment.appointment_id, mail.outbox[0].subject)
+        self.assertEqual(StatusNotification.objects.get().state, StatusNotification.STATE_SENT)
+
+    def test_batch_shares_one_smtp_connection(self):
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _FakeSMTPHandler)
+        server.daemon_threads = True
+        server.connections, server.messages = 0, []
+        server.refused = {self.appointments[2].notification_email}
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        queue_status_notifications(self.appointments)
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=server.server_address[1],
+        ):
+            with self.assertLogs('appointments.notifications', 'WARNING'):
+                self.assertEqual(send_pending_notifications(), {'sent': 4, 'failed': 1})
+        self.assertEqual(server.connections, 1)
+        self.assertCountEqual(
+            [recipients for recipients, _body in server.messages],
+            [[appointment.notification_email] for index, appointment in enumerate(self.appointments) if index != 2],
+        )
+        failed = StatusNotification.objects.get(state=StatusNotification.STATE_FAILED)
+        self.assertEqual(failed.recipient, self.appointments[2].notification_email)
+        self.assertIn('No such user', failed.error)
+        self.assertEqual(send_pending_notifications(), {'sent': 0, 'failed': 0})
+
+    def test_retry_leaves_live_sends_alone(self):
+        failed, live, stuck = queue_status_notifications(self.appointments[:3])
+        StatusNotification.objects.filter(pk=failed.pk).update(state=StatusNotification.STATE_FAILED)
+        StatusNotification.objects.filter(pk__in=[live.pk, stuck.pk]).update(
+            state=StatusNotification.STATE_SENDING, claimed_at=timezone.now()
+        )
+        StatusNotification.objects.filter(pk=stuck.pk).update(claimed_at=timezone.now() - timedelta(hours=2))
+        out = StringIO()
+        call_command('send_notifications', '--retry-failed', stdout=out)
+        self.assertIn('Requeued 2 notification(s).', out.getvalue())
+        self.assertEqual(
+            sorted(recipient for message in mail.outbox for recipient in message.to),
+            sorted([failed.recipient, stuck.recipient]),
+        )
+        self.assertEqual(StatusNotification.objects.get(pk=live.pk).state, StatusNotification.STATE_SENDING)
+
+    def test_mail_defaults_to_the_console_without_a_host(self):
+        def backend(**env) -> str:
+            base = {key: value for key, value in os.environ.items() if key not in ('EMAIL_HOST', 'DJANGO_EMAIL_BACKEND')}
+            return subprocess.run(
+                [sys.executable, '-c', 'from django.conf import settings; print(settings.EMAIL_BACKEND)'],
+                env={**base, 'DJANGO_SETTINGS_MODULE': 'biprepair.settings', **env},
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+
+        self.assertEqual(backend(), 'django.core.mail.backends.console.EmailBackend')
+        self.assertEqual(backend(EMAIL_HOST='mail.campus.test'), 'django.core.mail.backends.smtp.EmailBackend')
+
+
+@skipIf(connection.vendor != 'sqlite', 'SQLite connection tuning')
+class SQLiteConnectionTests(TestCase):
+    def _connect(self, **overrides):
+        # A separate connection to a file database, configured the way the
+        # default alias is, so connection_created runs for it.
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        wrapper = connections.create_connection('default')
+        name = os.path.join(tmpdir.name, 'tuned.sqlite3')
+        wrapper.settings_dict = {**wrapper.settings_dict, 'NAME': name, **overrides}
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def _pragma(self, wrapper, name: str):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_new_connections_get_the_pragmas(self):
+        wrapper = self._connect()
+        self.assertEqual(self._pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self._pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(self._pragma(wrapper, 'busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self._pragma(wrapper, 'cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+        self.assertEqual(self._pragma(wrapper, 'temp_store'), 2)
+
+    def test_checked_in_database_keeps_its_journal_mode(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        with override_settings(BASE_DIR=Path(tmpdir.name)):
+            wrapper = self._connect(NAME=os.path.join(tmpdir.name, 'db.sqlite3'))
+            self.assertEqual(self._pragma(wrapper, 'journal_mode'), 'delete')
+            self.assertEqual(self._pragma(wrapper, 'synchronous'), 1)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_untuned_connections_keep_sqlite_defaults(self):
+        wrapper = self._connect()
+        self.assertEqual(self._pragma(wrapper, 'journal_mode'), 'delete')
+        self.assertEqual(self._pragma(wrapper, 'synchronous'), 2)
+
+    def test_connection_outlives_a_request_within_max_age(self):
+        self.assertEqual(settings.DATABASES['default']['CONN_MAX_AGE'], settings.DB_CONN_MAX_AGE)
+        wrapper = self._connect(CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True)
+        opened = wrapper.connection
+        # What request_started/request_finished do between requests.
+        wrapper.close_if_unusable_or_obsolete()
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, opened)
+
+        expiring = self._connect(CONN_MAX_AGE=0)
+        expiring.close_if_unusable_or_obsolete()
+        self.assertIsNone(expiring.connection)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.metrics_dir = Path(tmpdir.name)
+        overrides = override_settings(METRICS_DIR=tmpdir.name, METRICS_FLUSH_INTERVAL=3600, METRICS_TOKEN='scrape-me')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.admin_client = _admin_client(
+            AdminUser.objects.create(username='metrics-admin', full_name='Metrics Admin', password='!')
+        )
+
+    def test_requests_are_counted_per_view(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        self.admin_client.get(reverse('admin_clients'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        body = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-me').content.decode()
+        self.assertIn('repairhub_http_requests_total{view="home",status="2xx"} 2', body)
+        self.assertIn('repairhub_http_request_duration_seconds_count{view="admin_clients"} 1', body)
+        snapshot = registry.snapshot()
+        self.assertGreater(snapshot['admin_clients']['db_queries'], 0)
+        self.assertGreater(snapshot['admin_clients']['template_seconds'], 0)
+
+    def test_server_timing_is_for_admins_only(self):
+        self.assertFalse(self.client.get(reverse('home')).has_header('Server-Timing'))
+        timing = self.admin_client.get(reverse('admin_clients'))['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[0-9.]+;desc="\d+ queries", tpl;dur=[0-9.]+, total;dur=[0-9.]+$')
+
+    def test_files_of_exited_workers_are_pruned(self):
+        running = subprocess.Popen(['sleep', '30'])
+        self.addCleanup(running.wait)
+        self.addCleanup(running.kill)
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        stats = {'home': {'requests': 5, 'buckets': [5], 'status': {'2xx': 5}}}
+        for pid in (running.pid, exited.pid):
+            write_worker_file(self.metrics_dir, stats)
+            os.replace(self.metrics_dir / f'worker-{os.getpid()}.json', self.metrics_dir / f'worker-{pid}.json')
+
+        self.assertEqual(collect()['home']['requests'], 5)
+        self.assertTrue((self.metrics_dir / f'worker-{running.pid}.json').exists())
+        self.assertFalse((self.metrics_dir / f'worker-{exited.pid}.json').exists())
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.profile_dir = Path(tmpdir.name)
+        overrides = override_settings(PROFILE_DIR=tmpdir.name, PROFILE_KEEP=2)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.admin_client = _admin_client(
+            AdminUser.objects.create(username='profile-admin', full_name='Profile Admin', password='!')
+        )
+
+    def _profiles(self) -> list[str]:
+        return sorted(path.name for path in self.profile_dir.iterdir())
+
+    def test_admin_request_writes_stats_and_sql_log(self):
+        response = self.admin_client.get(reverse('admin_clients'), {'__profile': '1'})
+        profile_id = response['X-Profile-Id']
+        self.assertEqual(self._profiles(), [f'{profile_id}.json', f'{profile_id}.prof'])
+        meta = json.loads((self.profile_dir / f'{profile_id}.json').read_text())
+        self.assertEqual((meta['view'], meta['status']), ('admin_clients', 200))
+        self.assertEqual(meta['query_count'], len(meta['queries']))
+        self.assertTrue(any('FROM "clients"' in query['sql'] for query in meta['queries']))
+
+        by_header = self.admin_client.get(reverse('admin_queue'), HTTP_X_PROFILE='1')
+        self.assertTrue(by_header.has_header('X-Profile-Id'))
+
+        listing = self.admin_client.get(reverse('admin_profiles'))
+        self.assertContains(listing, reverse('admin_profile_detail', args=[profile_id]))
+        detail = self.admin_client.get(reverse('admin_profile_detail', args=[profile_id]), {'sort': 'tottime'})
+        self.assertEqual(detail.status_code, 200)
+        self.assertTrue(detail.context['functions'])
+        self.assertContains(detail, 'FROM &quot;clients&quot;')
+
+    def test_switched_off_or_unrelated_values_do_not_profile(self):
+        self.admin_client.get(reverse('admin_clients'), {'__profile': '0'})
+        self.admin_client.get(reverse('admin_clients'), {'q': '__profile'})
+        self.admin_client.get(reverse('admin_clients'), HTTP_X_PROFILE='off')
+        self.assertEqual(self._profiles(), [])
+
+    def test_only_admins_are_profiled(self):
+        account = ClientAccount.objects.create(
+            email='profiled@campus.test', full_name='Profiled Client', contact_number='09179999999', password='!'
+        )
+        client = Client()
+        session = client.session
+        session[SESSION_CLIENT_KEY] = account.id
+        session.save()
+        for visitor in (Client(), client):
+            response = visitor.get(reverse('home'), {'__profile': '1'}, HTTP_X_PROFILE='1')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(self._profiles(), [])
+
+    def test_only_the_newest_profiles_are_kept(self):
+        for _ in range(4):
+            self.admin_client.get(reverse('admin_settings'), {'__profile': '1'})
+        # PROFILE_KEEP=2: two profiles, each a .json and .prof pair.
+        names = self._profiles()
+        self.assertEqual(len(names), 4)
+        self.assertEqual(len({Path(name).stem for name in names}), 2)
+
+
+class QueryLogTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.log_dir = Path(tmpdir.name)
+        overrides = override_settings(QUERYLOG_DIR=tmpdir.name, METRICS_FLUSH_INTERVAL=3600)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        querylog.registry.reset()
+        self.addCleanup(querylog.registry.reset)
+
+    def test_reset_clears_every_worker(self):
+        # A second registry stands in for another worker process: it has
+        # flushed a file (renamed to a live PID other than ours) and still
+        # holds its totals in memory.
+        other = querylog.QueryLogRegistry()
+        other.observe('home', 'SELECT * FROM clients WHERE id = 7', None, 0.001, connection, can_explain=False)
+        other.maybe_flush(force=True)
+        os.replace(self.log_dir / f'worker-{os.getpid()}.json', self.log_dir / f'worker-{os.getppid()}.json')
+        querylog.registry.observe('home', 'SELECT 1', None, 0.001, connection, can_explain=False)
+        self.assertEqual(sum(entry['count'] for entry in querylog.report()), 2)
+
+        admin = AdminUser.objects.create(username='log-admin', full_name='Log Admin', password='!')
+        response = _admin_client(admin).post(reverse('admin_queries_reset'))
+        self.assertRedirects(response, reverse('admin_queries'), fetch_redirect_response=False)
+        self.assertEqual(querylog.report(), [])
+
+        # The other worker's next flush must not write its old totals back.
+        other.maybe_flush(force=True)
+        self.assertEqual(other.snapshot(), {})
+        self.assertEqual(querylog.report(), [])
+
+    def _logged(self, view: str = 'probe'):
+        # What the middleware wraps around each request, minus the request.
+        return querylog._logged(mock.Mock(resolver_match=mock.Mock(view_name=view)))
+
+    def _entries(self, view: str = 'probe') -> dict[str, dict]:
+        return {entry['fingerprint']: entry for entry in querylog.report(view=view)}
+
+    def test_arguments_collapse_to_one_fingerprint_per_view(self):
+        table = DeviceBrand._meta.db_table
+        with self._logged():
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT id FROM {table} WHERE code = 'apple' AND position = 3")
+                cursor.execute(f"SELECT id FROM {table} WHERE code = 'it''s' AND position = -12.5")
+            list(DeviceBrand.objects.filter(pk__in=[1, 2, 3]))
+            list(DeviceBrand.objects.filter(pk__in=[4]))
+            DeviceBrand.objects.bulk_create(
+                [DeviceBrand(device_type='phone', code=f'b{number}', label='B') for number in range(3)]
+            )
+            DeviceBrand.objects.bulk_create([DeviceBrand(device_type='phone', code='c0', label='C')])
+        with self._logged('other'):
+            list(DeviceBrand.objects.filter(pk__in=[5, 6]))
+
+        entries = self._entries()
+        literal = f'SELECT id FROM {table} WHERE code = ? AND position = ?'
+        self.assertEqual(entries[literal]['count'], 2)
+        in_lists = [shape for shape in entries if 'IN (...)' in shape]
+        self.assertEqual(len(in_lists), 1)
+        self.assertEqual(entries[in_lists[0]]['count'], 2)
+        inserts = [shape for shape in entries if shape.startswith(f'INSERT INTO "{table}"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('VALUES (...)', inserts[0])
+        self.assertEqual(entries[inserts[0]]['count'], 2)
+        # The same shape from another view is its own entry.
+        self.assertEqual([entry['count'] for entry in querylog.report(view='other')], [1])
+
+    @override_settings(QUERYLOG_SLOW_MS=0)
+    def test_slow_select_captures_its_plan(self):
+        with self._logged():
+            list(DeviceBrand.objects.filter(code='apple'))
+        [entry] = [entry for entry in self._entries().values() if entry['fingerprint'].startswith('SELECT')]
+        self.assertEqual(entry['slow_count'], 1)
+        self.assertIn('device_brands', entry['explain'])
+        self.assertNotIn('EXPLAIN failed', entry['explain'])
+        self.assertTrue(entry['explain_sql'].startswith('SELECT'))
+
+    @override_settings(QUERYLOG_SLOW_MS=0)
+    def test_writes_executemany_and_failures_capture_no_plan(self):
+        table = DeviceBrand._meta.db_table
+        with self._logged():
+            DeviceBrand.objects.filter(code='nothing').update(label='X')
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute('SELECT * FROM no_such_table')
+            except DatabaseError:
+                pass
+            # SQLite refuses executemany() for a SELECT, so the statement is
+            # swallowed below the log to see what the log does with it.
+            with connection.execute_wrapper(lambda execute, sql, params, many, context: None):
+                with connection.cursor() as cursor:
+                    cursor.executemany(f'SELECT id FROM {table} WHERE id = %s', [(1,), (2,)])
+
+        entries = self._entries()
+        statements = [
+            f'UPDATE "{table}" SET "label" = ? WHERE "{table}"."code" = ?',
+            'SELECT * FROM no_such_table',
+            f'SELECT id FROM {table} WHERE id = ?',
+        ]
+        for shape in statements:
+            with self.subTest(shape=shape):
+                self.assertEqual(entries[shape]['slow_count'], 1)
+                self.assertEqual((entries[shape]['explain'], entries[shape]['explain_sql']), ('', ''))
+        self.assertFalse(any(shape.startswith('EXPLAIN') for shape in entries))
+
+    @override_settings(QUERYLOG_MAX_ENTRIES=2)
+    def test_shapes_beyond_the_limit_share_an_overflow_entry(self):
+        for number in range(5):
+            querylog.registry.observe('probe', f'SELECT c{number} FROM t', None, 0.001, connection, can_explain=False)
+        querylog.registry.observe('probe', 'SELECT c0 FROM t', None, 0.001, connection, can_explain=False)
+
+        entries = self._entries()
+        self.assertEqual(set(entries), {'SELECT c0 FROM t', 'SELECT c1 FROM t', querylog.OVERFLOW_FINGERPRINT})
+        self.assertEqual(entries['SELECT c0 FROM t']['count'], 2)
+        self.assertEqual(entries[querylog.OVERFLOW_FINGERPRINT]['count'], 3)
+
+    def test_export_streams_export_fields(self):
+        querylog.registry.observe('home', 'SELECT 1', None, 0.002, connection, can_explain=False)
+        querylog.registry.observe('home', 'SELECT 2', None, 0.004, connection, can_explain=False)
+        querylog.registry.observe('admin_queue', 'SELECT name FROM t', None, 0.001, connection, can_explain=False)
+        admin = AdminUser.objects.create(username='export-log', full_name='Export Log', password='!')
+        client = _admin_client(admin)
+
+        response = client.get(reverse('admin_queries_export'))
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], querylog.EXPORT_FIELDS)
+        # The export request logs its own session and admin lookups too.
+        logged = {tuple(row[:3]) for row in rows[1:] if row[0] in ('home', 'admin_queue')}
+        self.assertEqual(logged, {('home', 'SELECT ?', '2'), ('admin_queue', 'SELECT name FROM t', '1')})
+
+        response = client.get(reverse('admin_queries_export'), {'format': 'ndjson', 'view': 'home'})
+        [row] = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(list(row), querylog.EXPORT_FIELDS)
+        self.assertEqual((row['view'], row['fingerprint'], row['count']), ('home', 'SELECT ?', 2))
+        self.assertAlmostEqual(row['mean_seconds'], 0.003)
+
+
+@skipIf(settings.DATABASES['replica'].get('TEST', {}).get('MIRROR'), 'replica is a test mirror of default')
+@override_settings(
+    READ_REPLICA_ENABLED=True,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.admin = AdminUser.objects.create(username='replica-admin', full_name='Replica Admin', password='!')
+        self.seeder = ScaleDataSeeder(seed=3, now=timezone.now(), log=None)
+        self.seeder.admin_ids = [self.admin.id]
+        self.seeder.seed_clients(3)
+        self.replicated = self.seeder.seed_appointments(5)
+        self._sync_replica()
+        # Written after the last sync, so only the primary has these.
+        self.unreplicated = self.seeder.seed_appointments(2)
+
+    def _sync_replica(self) -> None:
+        # Stands in for replication: copy the whole primary file over the replica.
+        primary, replica = connections['default'], connections['replica']
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+
+    def _admin_client(self) -> Client:
+        client = Client()
+        session = client.session
+        session[SESSION_ADMIN_KEY] = self.admin.id
+        session.save()
+        return client
+
+    def _assert_lists(self, body: str, present: list[str], absent: list[str]) -> None:
+        for appointment_id in present:
+            self.assertIn(appointment_id, body)
+        for appointment_id in absent:
+            self.assertNotIn(appointment_id, body)
+
+    def test_list_and_export_read_from_replica(self):
+        client = self._admin_client()
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            page = client.get(reverse('admin_appointments')).content.decode()
+            export = b''.join(
+                client.get(reverse('admin_export_appointments')).streaming_content
+            ).decode()
+        self.assertTrue(replica_queries.captured_queries)
+        self._assert_lists(page, self.replicated, self.unreplicated)
+        self._assert_lists(export, self.replicated, self.unreplicated)
+
+    def test_session_reads_its_own_writes(self):
+        writer, bystander = self._admin_client(), self._admin_client()
+        deleted = self.replicated[0]
+        # Follow the redirect so the "deleted" flash message is consumed.
+        response = writer.post(reverse('admin_delete_appointment', kwargs={'appointment_id': deleted}), follow=True)
+        self.assertEqual(response.status_code, 200)
+
+        page = writer.get(reverse('admin_appointments')).content.decode()
+        self._assert_lists(page, self.unreplicated, [deleted])
+        # Other sessions keep reading the (stale) replica.
+        page = bystander.get(reverse('admin_appointments')).content.decode()
+        self._assert_lists(page, [deleted], self.unreplicated)
+
+        with override_settings(DB_REPLICA_PIN_SECONDS=0):
+            writer.post(
+                reverse('admin_delete_appointment', kwargs={'appointment_id': self.replicated[1]}), follow=True
+            )
+        page = writer.get(reverse('admin_appointments')).content.decode()
+        self._assert_lists(page, [self.replicated[1]], self.unreplicated)
+
+
+@override_settings(
+    MESSENGER_LONGPOLL_SECONDS=2,
+    MESSENGER_LONGPOLL_INTERVAL=0.05,
+    RATELIMIT_ENABLED=False,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class AsyncEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = ClientAccount.objects.create(
+            email='async@campus.test', full_name='Async Client', contact_number='09171111111', password='!'
+        )
+        cls.message = ContactMessage.objects.create(client=cls.account, subject='Screen', body='Cracked')
+        cls.appointment = Appointment.objects.create(
+            full_name='Async Client',
+            contact_number='09171111111',
+            device_type=Appointment.DEVICE_CHOICES[0][0],
+            brand_model='Galaxy A54',
+            service_type='screen',
+            issue_description='Cracked screen',
+            preferred_datetime=timezone.now(),
+            location=Appointment.LOCATION_CHOICES[0][0],
+        )
+
+    def setUp(self):
+        session = SessionStore()
+        session[SESSION_CLIENT_KEY] = self.account.id
+        session.create()
+        self.async_client = AsyncClient()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    def test_middleware_stack_is_async_under_asgi(self):
+        # Django logs on django.request whenever it has to wrap a middleware
+        # in a sync/async adapter.
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    async def test_history_long_poll(self):
+        url = reverse('contact_admin_history')
+        first = await self.async_client.get(url)
+        data = first.json()
+        self.assertTrue(data['longpoll'])
+        self.assertEqual([message['id'] for message in data['messages']], [self.message.id])
+
+        with override_settings(MESSENGER_LONGPOLL_SECONDS=0.2):
+            unchanged = await self.async_client.get(url, {'since': data['version']})
+        self.assertEqual(unchanged.status_code, 204)
+
+        async def reply():
+            await asyncio.sleep(0.2)
+            self.message.admin_reply = 'Bring it in Wednesday.'
+            await self.message.asave(update_fields=['admin_reply', 'updated_at'])
+
+        started = time.perf_counter()
+        changed, _ = await asyncio.gather(self.async_client.get(url, {'since': data['version']}), reply())
+        self.assertLess(time.perf_counter() - started, 1.5)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['messages'][0]['admin_reply'], 'Bring it in Wednesday.')
+        self.assertNotEqual(changed.json()['version'], data['version'])
+
+    async def test_history_requires_client(self):
+        response = await AsyncClient().get(reverse('contact_admin_history'))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_status_lookup(self):
+        url = reverse('status_lookup')
+        self.assertEqual((await self.async_client.get(url)).status_code, 400)
+        by_id = (await self.async_client.get(url, {'appointment_id': self.appointment.appointment_id})).json()
+        self.assertEqual(by_id['results'][0]['appointment_id'], self.appointment.appointment_id)
+        by_number = (await self.async_client.get(url, {'contact_number': '09171111111'})).json()
+        self.assertEqual(by_number['results'][0]['appointment_id'], self.appointment.masked_id)
+        self.assertEqual(by_number['results'][0]['status'], self.appointment.status)
+
+
+class LongPollConnectionTests(TransactionTestCase):
+    # Outside a test transaction, so the view is free to close connections.
+    def setUp(self):
+        account = ClientAccount.objects.create(
+            email='waiter@campus.test', full_name='Waiting Client', contact_number='09178888888', password='!'
+        )
+        ContactMessage.objects.create(client=account, subject='Screen', body='Cracked')
+        session = SessionStore()
+        session[SESSION_CLIENT_KEY] = account.id
+        session.create()
+        self.async_client = AsyncClient()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    async def test_waiting_poll_holds_no_connection(self):
+        url = reverse('contact_admin_history')
+        version = (await self.async_client.get(url)).json()['version']
+        # The in-memory test database ignores close(), so count the calls.
+        closing = mock.patch.object(type(connections['default']), 'close', autospec=True)
+        with closing as close, override_settings(MESSENGER_LONGPOLL_SECONDS=0.35, MESSENGER_LONGPOLL_INTERVAL=0.1):
+            response = await self.async_client.get(url, {'since': version})
+        self.assertEqual(response.status_code, 204)
+        self.assertGreaterEqual(close.call_count, 3)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        admin = AdminUser.objects.create(username='export-admin', full_name='Export Admin', password='!')
+        seeder = ScaleDataSeeder(seed=13, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id]
+        seeder.seed_clients(4)
+        seeder.seed_appointments(40)
+        self.client = _admin_client(admin)
+
+    def _export(self, name: str, export_format: str = 'csv') -> str:
+        response = self.client.get(reverse(name), {'format': export_format})
+        return b''.join(response.streaming_content).decode()
+
+    def test_keyset_walk_returns_every_row_once(self):
+        expected = list(Appointment.objects.order_by('pk').values_list('appointment_id', flat=True))
+        # Chunks that split the table unevenly, evenly, and not at all.
+        for chunk_size in (7, 8, 40, 1000):
+            with self.subTest(chunk_size=chunk_size), override_settings(EXPORT_CHUNK_SIZE=chunk_size):
+                with CaptureQueriesContext(connection) as queries:
+                    rows = list(csv.reader(self._export('admin_export_appointments').splitlines()))
+                self.assertEqual(rows[0][0], 'appointment_id')
+                self.assertEqual([row[0] for row in rows[1:]], expected)
+                self.assertLessEqual(len(queries), 3 + len(expected) // chunk_size + 1)
+                lines = self._export('admin_export_appointments', 'ndjson').splitlines()
+                self.assertEqual([json.loads(line)['appointment_id'] for line in lines], expected)
+
+    def test_csv_cells_cannot_start_formulas(self):
+        account = ClientAccount.objects.order_by('id').first()
+        ClientAccount.objects.filter(pk=account.pk).update(
+            full_name='=HYPERLINK("http://evil.example","Click")', student_id='@SUM(A1)'
+        )
+        ContactMessage.objects.create(client=account, subject='+1 urgent', body='-2 stars')
+        rows = {row['email']: row for row in csv.DictReader(self._export('admin_export_clients').splitlines())}
+        self.assertEqual(rows[account.email]['full_name'], '\'=HYPERLINK("http://evil.example","Click")')
+        self.assertEqual(rows[account.email]['student_id'], "'@SUM(A1)")
+        message = next(csv.DictReader(self._export('admin_export_messages').splitlines()))
+        self.assertEqual((message['subject'], message['body']), ("'+1 urgent", "'-2 stars"))
+        # NDJSON consumers get the stored values.
+        lines = [json.loads(line) for line in self._export('admin_export_clients', 'ndjson').splitlines()]
+        self.assertIn('=HYPERLINK("http://evil.example","Click")', [line['full_name'] for line in lines])
+
+
+def _drain_bucket(bucket: str, rate: str, attempts: int, results) -> None:
+    results.put(sum(1 for _ in range(attempts) if not ratelimit.consume(bucket, rate)))
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        # A private bucket file, so buckets neither leak between runs nor touch
+        # the development server's.
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        overrides = override_settings(
+            RATELIMIT_ENABLED=True,
+            RATELIMIT_DB_PATH=os.path.join(tmpdir.name, 'ratelimit.sqlite3'),
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_threads_share_one_bucket(self):
+        allowed = []
+
+        def worker():
+            allowed.append(sum(1 for _ in range(5) if not ratelimit.consume('threads', '50/h')))
+
+        threads = [threading.Thread(target=worker) for _ in range(64)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(allowed), 50)
+
+    def test_processes_share_one_bucket(self):
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        processes = [context.Process(target=_drain_bucket, args=('processes', '50/h', 25, results)) for _ in range(8)]
+        for process in processes:
+            process.start()
+        allowed = sum(results.get(timeout=60) for _ in processes)
+        for process in processes:
+            process.join()
+        self.assertEqual(allowed, 50)
+
+    def test_bucket_refills(self):
+        self.assertEqual(ratelimit.consume('refill', '2/s'), 0)
+        self.assertEqual(ratelimit.consume('refill', '2/s'), 0)
+        wait = ratelimit.consume('refill', '2/s')
+        self.assertGreater(wait, 0)
+        time.sleep(wait)
+        self.assertEqual(ratelimit.consume('refill', '2/s'), 0)
+
+    def test_sprayed_identifiers_evict_no_bucket(self):
+        for _ in range(3):
+            ratelimit.consume('victim', '3/h')
+        self.assertGreater(ratelimit.consume('victim', '3/h'), 0)
+        # Far more live buckets than the file cache would hold before culling.
+        for number in range(1000):
+            ratelimit.consume(f'spray-{number}', '3/h')
+        self.assertGreater(ratelimit.consume('victim', '3/h'), 0)
+
+    def test_login_limited_per_identifier(self):
+        url = reverse('client_login')
+        for attempt in range(10):
+            response = self.client.post(url, {'email': 'victim@campus.test', 'password': f'guess-{attempt}'})
+            self.assertEqual(response.status_code, 200)
+        response = self.client.post(url, {'email': 'Victim@campus.test ', 'password': 'guess'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Another account from the same address still gets through.
+        response = self.client.post(url, {'email': 'other@campus.test', 'password': 'guess'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_status_lookup_limited_per_ip(self):
+        url = reverse('check_status')
+        statuses = [
+            self.client.post(url, {'contact_number': f'0917{number:07d}'}, REMOTE_ADDR='203.0.113.9').status_code
+            for number in range(25)
+        ]
+        self.assertEqual(statuses.count(200), 20)
+        self.assertEqual(statuses[20:], [429] * 5)
+        self.assertEqual(self.client.post(url, {'contact_number': '09170000000'}).status_code, 200)
+
+
+def _use_private_caches(test) -> None:
+    # The generation tokens live in the default cache; fresh caches keep
+    # fragments and tokens from leaking between tests.
+    tmpdir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmpdir.cleanup)
+    # Cleanups run last-in first-out: once the real caches are back, rebuild
+    # the catalog snapshot against their token so later tests don't reload it.
+    test.addCleanup(catalog.load)
+    test.addCleanup(catalog.invalidate)
+    overrides = override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(tmpdir.name, 'cache'),
+            },
+            'fragments': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': tmpdir.name,
+            },
+        },
+        RATELIMIT_ENABLED=False,
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    )
+    overrides.enable()
+    test.addCleanup(overrides.disable)
+    # The snapshot still carries the previous cache's token; left alone, the
+    # periodic check would reload it at some timing-dependent point mid-test.
+    catalog.invalidate()
+    catalog.load()
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        admin = AdminUser.objects.create(username='fragment-admin', full_name='Fragment Admin', password='!')
+        seeder = ScaleDataSeeder(seed=4, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id]
+        seeder.seed_clients(5)
+        seeder.seed_appointments(60)
+        seeder.refresh_counters()
+        session = self.client.session
+        session[SESSION_ADMIN_KEY] = admin.id
+        session.save()
+        self.open = list(Appointment.objects.exclude(Appointment.management_lock_q()).order_by('id'))
+
+    def _page(self, name: str) -> tuple[str, int]:
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get(reverse(name)).content.decode()
+        # CSRF tokens are masked differently on every render; compare the table.
+        return body[body.index('<tbody>') : body.index('</tbody>')], len(queries)
+
+    def _row(self, rows: str, text: str) -> str:
+        return next(row for row in rows.split('<tr>') if text in row)
+
+    def test_unchanged_tables_render_from_cache(self):
+        for name in ('admin_appointments', 'admin_clients'):
+            with self.subTest(view=name):
+                cold, cold_queries = self._page(name)
+                warm, warm_queries = self._page(name)
+                self.assertEqual(warm, cold)
+                self.assertLess(warm_queries, cold_queries)
+        # Only the bulk form and the shared delete form carry a token; rows don't.
+        page = self.client.get(reverse('admin_appointments')).content.decode()
+        self.assertEqual(page.count('csrfmiddlewaretoken'), 2)
+
+    def test_edits_invalidate_cached_tables(self):
+        edited, declined, deleted = self.open[0], self.open[1], self.open[2]
+        self._page('admin_appointments')
+        clients, _ = self._page('admin_clients')
+        owner = ClientAccount.objects.get(pk=deleted.client_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('admin_detail', kwargs={'appointment_id': edited.appointment_id}),
+                {'status': Appointment.STATUS_IN_PROGRESS, 'quoted_price': '0', 'admin_notes': '', 'version': edited.version},
+            )
+        rows, _ = self._page('admin_appointments')
+        self.assertIn('status-in_progress', self._row(rows, edited.appointment_id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('admin_bulk_appointments'), {'action': 'decline', 'appointment_ids': [declined.appointment_id]}
+            )
+        rows, _ = self._page('admin_appointments')
+        self.assertIn('status-declined', self._row(rows, declined.appointment_id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin_delete_appointment', kwargs={'appointment_id': deleted.appointment_id}))
+        rows, _ = self._page('admin_appointments')
+        self.assertNotIn(deleted.appointment_id, rows)
+        owner.refresh_from_db()
+        self.assertNotEqual(self._row(clients, owner.email), self._row(self._page('admin_clients')[0], owner.email))
+        self.assertIn(f'<td>{owner.appointment_count}</td>', self._row(self._page('admin_clients')[0], owner.email))
+
+
+class CatalogDataTests(TestCase):
+    DATA = {
+        'version': 1,
+        'services': {'android': [['lcd', 'Screen replacement'], ['battery', 'Battery swap']]},
+        'pricing': {'android': {'lcd': 1800, 'battery': 900}},
+        'brands': {'android': [['samsung', 'Samsung'], ['other', 'Other']]},
+        'models': {'android': {'samsung': ['Galaxy A54', 'Galaxy Z-Flip 5']}},
+    }
+
+    def _file_catalog(self) -> Catalog:
+        # Empty tables, as before the catalog migration has run.
+        DeviceBrand.objects.all().delete()
+        ServiceOffering.objects.all().delete()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = Path(tmpdir.name) / 'catalog.json'
+        path.write_text(json.dumps(self.DATA), encoding='utf-8')
+        return Catalog(path)
+
+    def test_file_is_read_once_on_first_lookup(self):
+        data_file = self._file_catalog()
+        with mock.patch.object(Path, 'read_text', autospec=True, side_effect=Path.read_text) as read_text:
+            self.assertEqual(read_text.call_count, 0)
+            self.assertEqual(data_file.price('android', 'lcd'), 1800)
+            self.assertEqual(data_file.service_label('battery'), 'Battery swap')
+            self.assertEqual(data_file.brand_choices('android'), (('samsung', 'Samsung'), ('other', 'Other')))
+        self.assertEqual(read_text.call_count, 1)
+
+    def test_lookups_are_read_only(self):
+        data_file = self._file_catalog()
+        self.assertEqual(data_file.price('android', 'unknown'), 0)
+        self.assertEqual(data_file.service_label('unknown'), 'unknown')
+        self.assertTrue(data_file.is_known_model('android', 'samsung', 'galaxy z flip 5'))
+        self.assertFalse(data_file.is_known_model('android', 'samsung', 'Galaxy S99'))
+        # Brands without suggestions take any model name.
+        self.assertTrue(data_file.is_known_model('android', 'other', 'Anything'))
+        self.assertEqual(json.loads(data_file.page_json()['service_pricing_json']), self.DATA['pricing'])
+        with self.assertRaises(TypeError):
+            data_file.pricing()['android']['lcd'] = 1
+
+    def test_shipped_file_matches_the_seeded_tables(self):
+        from_tables = Catalog(CATALOG_PATH)
+        from_file = Catalog(CATALOG_PATH)
+        with mock.patch('appointments.catalog._read_tables', return_value=None):
+            from_file.load()
+        for lookup in ('service_map', 'brand_map', 'model_map', 'pricing'):
+            self.assertEqual(getattr(from_tables, lookup)(), getattr(from_file, lookup)(), lookup)
+
+
+class CatalogEditTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        admin = AdminUser.objects.create(username='catalog-admin', full_name='Catalog Admin', password='!')
+        self.client = _admin_client(admin)
+        self.url = f"{reverse('admin_catalog')}?device={Appointment.DEVICE_ANDROID}"
+        self.first, self.second = ServiceOffering.objects.filter(device_type=Appointment.DEVICE_ANDROID)[:2]
+
+    def _amounts(self) -> tuple[int, int]:
+        return tuple(ServicePrice.objects.get(offering=offering).amount for offering in (self.first, self.second))
+
+    def test_invalid_price_rolls_back_the_whole_save(self):
+        before = self._amounts()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url,
+                {
+                    'action': 'save_prices',
+                    f'price_{self.first.id}': str(before[0] + 50),
+                    f'price_{self.second.id}': '-5',
+                },
+                follow=True,
+            )
+        self.assertContains(response, 'cannot be negative. No prices were changed.')
+        self.assertEqual(self._amounts(), before)
+        self.assertEqual(catalog.price(Appointment.DEVICE_ANDROID, self.first.code), before[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url, {'action': 'save_prices', f'price_{self.first.id}': str(before[0] + 50)}, follow=True
+            )
+        self.assertContains(response, 'Updated 1 price(s).')
+        # The snapshot was retired on commit and reloads with the new price.
+        self.assertEqual(catalog.price(Appointment.DEVICE_ANDROID, self.first.code), before[0] + 50)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        admin = AdminUser.objects.create(username='etag-admin', full_name='Etag Admin', password='!')
+        seeder = ScaleDataSeeder(seed=5, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id]
+        seeder.seed_clients(3)
+        seeder.seed_appointments(20)
+        seeder.seed_threads(3)
+        self.account = ClientAccount.objects.order_by('id').first()
+        self.open = Appointment.objects.exclude(Appointment.management_lock_q()).order_by('id').first()
+        session = self.client.session
+        session[SESSION_ADMIN_KEY] = admin.id
+        session[SESSION_CLIENT_KEY] = self.account.id
+        session.save()
+        # Sets the CSRF cookie, which is part of every tag.
+        self.client.get(reverse('admin_appointments'))
+
+    def test_unchanged_pages_are_not_modified(self):
+        for name in ('admin_appointments', 'admin_messages', 'check_status'):
+            with self.subTest(view=name):
+                url = reverse(name)
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                self.assertIn('no-cache', first['Cache-Control'])
+                with CaptureQueriesContext(connection) as queries:
+                    again = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again['ETag'], first['ETag'])
+                # Session and signed-in user only; the page's own queries never run.
+                self.assertLessEqual(len(queries), 2)
+                filtered = self.client.get(f'{url}?status=open', HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(filtered.status_code, 200)
+
+    def test_edits_and_flash_messages_bypass_the_tag(self):
+        url = reverse('admin_appointments')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('admin_detail', kwargs={'appointment_id': self.open.appointment_id}),
+                {'status': Appointment.STATUS_IN_PROGRESS, 'quoted_price': '0', 'admin_notes': '', 'version': self.open.version},
+            )
+        # The success message is still pending: rendered, and not tagged.
+        flashed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(flashed.status_code, 200)
+        self.assertFalse(flashed.has_header('ETag'))
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=changed['ETag']).status_code, 304)
+
+    async def test_json_lookup_is_not_modified(self):
+        url = reverse('status_lookup')
+        params = {'contact_number': self.account.contact_number}
+        client = AsyncClient()
+        first = await client.get(url, params)
+        self.assertEqual(first.status_code, 200)
+        again = await client.get(url, params, headers={'If-None-Match': first['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        admin = AdminUser.objects.create(username='gzip-admin', full_name='Gzip Admin', password='!')
+        seeder = ScaleDataSeeder(seed=6, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id]
+        seeder.seed_clients(40)
+        seeder.seed_appointments(80)
+        session = self.client.session
+        session[SESSION_ADMIN_KEY] = admin.id
+        session[SESSION_CLIENT_KEY] = ClientAccount.objects.order_by('id').first().id
+        session.save()
+
+    def _both(self, name: str):
+        plain = self.client.get(reverse(name))
+        packed = self.client.get(reverse(name), HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        return plain, packed
+
+    def test_pages_and_exports_are_gzipped(self):
+        registry.reset()
+        for name in ('admin_clients', 'book_appointment'):
+            with self.subTest(view=name):
+                plain, packed = self._both(name)
+                self.assertFalse(plain.has_header('Content-Encoding'))
+                self.assertEqual(packed['Content-Encoding'], 'gzip')
+                self.assertIn('Accept-Encoding', packed['Vary'])
+                self.assertLess(len(packed.content), len(plain.content))
+                body = gzip.decompress(packed.content).decode()
+                self.assertIn('</html>', body)
+        self.assertEqual(registry.snapshot()['admin_clients']['compressed_responses'], 1)
+
+        plain, packed = self._both('admin_export_appointments')
+        self.assertEqual(packed['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(packed.streaming_content)), b''.join(plain.streaming_content)
+        )
+
+    def test_csrf_pages_and_small_bodies_stay_plain(self):
+        _, packed = self._both('admin_appointments')
+        self.assertIn('csrfmiddlewaretoken', packed.content.decode())
+        self.assertFalse(packed.has_header('Content-Encoding'))
+        _, packed = self._both('contact_admin_history')
+        self.assertLess(len(packed.content), settings.COMPRESSION_MIN_BYTES)
+        self.assertFalse(packed.has_header('Content-Encoding'))
+
+    def test_negotiation(self):
+        self.assertEqual(accepted_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(accepted_encoding('*;q=0.5'), 'gzip')
+        self.assertIsNone(accepted_encoding('gzip;q=0, identity'))
+        self.assertIsNone(accepted_encoding(''))
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        admin = AdminUser.objects.create(username='analytics-admin', full_name='Analytics Admin', password='!')
+        seeder = ScaleDataSeeder(seed=7, months=30, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id]
+        seeder.seed_clients(12)
+        seeder.seed_appointments(240)
+        seeder.refresh_counters()
+        seeder.refresh_daily_stats()
+        session = self.client.session
+        session[SESSION_ADMIN_KEY] = admin.id
+        session.save()
+        today = timezone.localdate()
+        self.everything = {'start': (today - timedelta(days=3 * 365)).isoformat(), 'end': today.isoformat()}
+
+    def _get(self, **params):
+        response = self.client.get(reverse('admin_analytics'), {**self.everything, **params})
+        return response.status_code, response.json()
+
+    def _facts(self):
+        tables = []
+        for model in (DailyAppointmentStat, DailyAppointmentRollup):
+            fields = [field.name for field in model._meta.fields if field.name != 'id']
+            tables.append(sorted(model.objects.values_list(*fields)))
+        return tables
+
+    def _assert_facts_current(self):
+        maintained = self._facts()
+        DailyAppointmentStat.rebuild()
+        self.assertEqual(maintained, self._facts())
+
+    def test_series_match_the_appointments_table(self):
+        status, data = self._get(granularity='month')
+        self.assertEqual(status, 200)
+        appointments = Appointment.objects.all()
+        earning = appointments.filter(status__in=Appointment.EARNING_STATUSES)
+        self.assertEqual(data['totals']['bookings'], appointments.count())
+        self.assertEqual(data['totals']['completed'], appointments.filter(status=Appointment.STATUS_COMPLETED).count())
+        self.assertAlmostEqual(data['totals']['earnings'], float(earning.aggregate(total=Sum('quoted_price'))['total']))
+        by_month = {}
+        for created_at in appointments.values_list('created_at', flat=True):
+            month = timezone.localtime(created_at).date().replace(day=1).isoformat()
+            by_month[month] = by_month.get(month, 0) + 1
+        self.assertEqual({point['period']: point['bookings'] for point in data['series'] if point['bookings']}, by_month)
+
+        _, filtered = self._get(location='meetup-east')
+        self.assertEqual(filtered['totals']['bookings'], appointments.filter(location='meetup-east').count())
+        program = ClientAccount.objects.exclude(school_program='').values_list('school_program', flat=True).first()
+        _, filtered = self._get(device_type=Appointment.DEVICE_LAPTOP, school_program=program)
+        self.assertEqual(
+            filtered['totals']['bookings'],
+            appointments.filter(device_type=Appointment.DEVICE_LAPTOP, client__school_program=program).count(),
+        )
+
+    def test_granularity_and_validation(self):
+        end = timezone.localdate()
+        start = end - timedelta(days=40)
+        _, daily = self._get(granularity='day', start=start.isoformat(), end=end.isoformat())
+        self.assertEqual(len(daily['series']), 41)
+        _, weekly = self._get(granularity='week', start=start.isoformat(), end=end.isoformat())
+        weeks = [date.fromisoformat(point['period']) for point in weekly['series']]
+        self.assertTrue(all(week.weekday() == 0 for week in weeks))
+        self.assertTrue(all(later - earlier == timedelta(days=7) for earlier, later in zip(weeks, weeks[1:])))
+        # The first week is labelled by its Monday but only counts days from start.
+        self.assertEqual(weekly['totals'], daily['totals'])
+        self.assertEqual(self._get(start=end.isoformat(), end=start.isoformat())[0], 400)
+        self.assertEqual(self._get(granularity='year')[0], 400)
+        self.assertEqual(self._get(start='2000-01-01')[0], 400)
+
+    def test_facts_follow_edits(self):
+        pending = list(Appointment.objects.filter(status=Appointment.STATUS_PENDING, client__isnull=False)[:3])
+        self.client.post(
+            reverse('admin_detail', kwargs={'appointment_id': pending[0].appointment_id}),
+            {
+                'status': Appointment.STATUS_COMPLETED,
+                'quoted_price': '500',
+                'admin_notes': '',
+                'version': pending[0].version,
+            },
+        )
+        self.assertIsNotNone(Appointment.objects.get(pk=pending[0].pk).completed_at)
+        self._assert_facts_current()
+
+        self.client.post(
+            reverse('admin_bulk_appointments'), {'action': 'complete', 'appointment_ids': [pending[1].appointment_id]}
+        )
+        self.assertIsNotNone(Appointment.objects.get(pk=pending[1].pk).completed_at)
+        self._assert_facts_current()
+
+        self.client.post(reverse('admin_delete_appointment', kwargs={'appointment_id': pending[2].appointment_id}))
+        self._assert_facts_current()
+
+        client = ClientAccount.objects.get(pk=pending[0].client_id)
+        client.school_program = 'nursing' if client.school_program != 'nursing' else 'education'
+        client.save()
+        self._assert_facts_current()
+        client.delete()
+        self._assert_facts_current()
+
+
+def _admin_client(admin: AdminUser) -> Client:
+    client = Client()
+    session = client.session
+    session[SESSION_ADMIN_KEY] = admin.id
+    session.save()
+    return client
+
+
+class WorkQueueTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        self.admins = [
+            AdminUser.objects.create(username=f'tech-{index}', full_name=f'Tech {index}', password='!')
+            for index in range(2)
+        ]
+        seeder = ScaleDataSeeder(seed=8, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id for admin in self.admins]
+        seeder.seed_clients(4)
+        seeder.seed_appointments(40)
+        Appointment.objects.filter(id__in=Appointment.objects.order_by('id').values('id')[:10]).update(
+            status=Appointment.STATUS_PENDING
+        )
+        self.pending = list(
+            Appointment.objects.filter(status=Appointment.STATUS_PENDING).order_by('created_at', 'id')
+        )
+
+    def test_claim_next_takes_the_oldest_pending(self):
+        first, second = self.admins
+        claimed = assignments.claim_next(first)
+        self.assertEqual(claimed.pk, self.pending[0].pk)
+        self.assertEqual(claimed.assigned_to, first)
+        self.assertEqual(assignments.claim_next(second).pk, self.pending[1].pk)
+
+        client = _admin_client(first)
+        response = client.post(reverse('admin_claim_next'))
+        self.assertRedirects(response, reverse('admin_detail', kwargs={'appointment_id': self.pending[2].appointment_id}))
+        page = client.get(reverse('admin_queue')).content.decode()
+        self.assertIn(self.pending[0].appointment_id, page)
+        self.assertIn(self.pending[2].appointment_id, page)
+        self.assertNotIn(self.pending[1].appointment_id, page)
+
+        Appointment.objects.filter(status=Appointment.STATUS_PENDING).update(assigned_to=second)
+        self.assertIsNone(assignments.claim_next(first))
+
+    def test_claim_and_release_respect_the_holder(self):
+        first, second = self.admins
+        appointment = self.pending[0]
+        _admin_client(first).post(reverse('admin_claim_appointment', kwargs={'appointment_id': appointment.appointment_id}))
+        response = _admin_client(second).post(
+            reverse('admin_claim_appointment', kwargs={'appointment_id': appointment.appointment_id}), follow=True
+        )
+        self.assertContains(response, 'already assigned to Tech 0')
+        self.assertFalse(assignments.release(appointment, second))
+        self.assertEqual(Appointment.objects.get(pk=appointment.pk).assigned_to, first)
+
+        self.assertTrue(assignments.release(appointment, first))
+        self.assertIsNone(Appointment.objects.get(pk=appointment.pk).assigned_to)
+        self.assertTrue(assignments.claim(appointment, second))
+
+    def test_finished_appointments_cannot_be_claimed(self):
+        first, _ = self.admins
+        for status in (Appointment.STATUS_COMPLETED, Appointment.STATUS_DECLINED):
+            appointment = self.pending[0]
+            Appointment.objects.filter(pk=appointment.pk).update(status=status, assigned_to=None)
+            self.assertFalse(assignments.claim(appointment, first))
+            self.assertIsNone(Appointment.objects.get(pk=appointment.pk).assigned_to)
+        response = _admin_client(first).post(
+            reverse('admin_claim_appointment', kwargs={'appointment_id': appointment.appointment_id}), follow=True
+        )
+        self.assertContains(response, 'cannot be claimed')
+        self.assertIsNone(Appointment.objects.get(pk=appointment.pk).assigned_to)
+
+
+class EditConflictTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        self.admins = [
+            AdminUser.objects.create(username=f'editor-{index}', full_name=f'Editor {index}', password='!')
+            for index in range(2)
+        ]
+        seeder = ScaleDataSeeder(seed=10, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id for admin in self.admins]
+        seeder.seed_clients(2)
+        seeder.seed_appointments(5)
+        Appointment.objects.update(status=Appointment.STATUS_PENDING, parts_ordered=False)
+        self.appointment = Appointment.objects.filter(client__isnull=False).first()
+        self.url = reverse('admin_detail', kwargs={'appointment_id': self.appointment.appointment_id})
+
+    def _form(self, client: Client) -> dict:
+        form = client.get(self.url).context['form']
+        return {name: value for name, value in form.initial.items() if value is not None}
+
+    def test_second_concurrent_save_is_refused(self):
+        first, second = (_admin_client(admin) for admin in self.admins)
+        first_form, second_form = self._form(first), self._form(second)
+        self.assertEqual(first_form['version'], second_form['version'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            saved = first.post(self.url, {**first_form, 'status': Appointment.STATUS_IN_PROGRESS, 'admin_notes': 'first'})
+        self.assertRedirects(saved, self.url)
+        conflict = second.post(self.url, {**second_form, 'quoted_price': '999', 'admin_notes': 'second'})
+        self.assertEqual(conflict.status_code, 409)
+        self.assertContains(conflict, 'Someone else saved this appointment', status_code=409)
+        current = Appointment.objects.get(pk=self.appointment.pk)
+        self.assertEqual((current.status, current.admin_notes), (Appointment.STATUS_IN_PROGRESS, 'first'))
+        self.assertEqual(current.version, first_form['version'] + 1)
+        # The refused edit is kept, now against the current version.
+        self.assertEqual(conflict.context['form']['admin_notes'].value(), 'second')
+        self.assertEqual(int(conflict.context['form']['version'].value()), current.version)
+
+        # The list pages and counters saw the first save.
+        self.assertIn('status-in_progress', first.get(reverse('admin_appointments')).content.decode())
+        client = ClientAccount.objects.get(pk=current.client_id)
+        active = Appointment.objects.filter(client=client, status__in=Appointment.ACTIVE_STATUSES).count()
+        self.assertEqual(client.active_appointment_count, active)
+
+        resubmitted = second.post(self.url, {**second_form, 'version': current.version, 'admin_notes': 'second'})
+        self.assertRedirects(resubmitted, self.url)
+        self.assertEqual(Appointment.objects.get(pk=self.appointment.pk).admin_notes, 'second')
+
+    def test_lock_taken_by_a_concurrent_save_holds(self):
+        first, second = (_admin_client(admin) for admin in self.admins)
+        first_form, second_form = self._form(first), self._form(second)
+        first.post(
+            self.url, {**first_form, 'status': Appointment.STATUS_APPROVED, 'parts_ordered': 'on', 'quoted_price': '800'}
+        )
+        response = second.post(self.url, {**second_form, 'status': Appointment.STATUS_DECLINED}, follow=True)
+        self.assertContains(response, 'This appointment is locked')
+        current = Appointment.objects.get(pk=self.appointment.pk)
+        self.assertEqual(current.status, Appointment.STATUS_APPROVED)
+        self.assertTrue(current.is_management_locked)
+        # A request that read the row before the lock landed is refused by
+        # the UPDATE itself, as is one made against the current version.
+        self.appointment.status = Appointment.STATUS_DECLINED
+        self.assertFalse(views._save_status_update(self.appointment, second_form['version']))
+        self.assertFalse(views._save_status_update(self.appointment, current.version))
+        self.assertEqual(Appointment.objects.get(pk=current.pk).status, Appointment.STATUS_APPROVED)
+
+    def test_bulk_actions_and_saves_move_the_version(self):
+        version = self.appointment.version
+        _admin_client(self.admins[0]).post(
+            reverse('admin_bulk_appointments'),
+            {'action': 'approve', 'appointment_ids': [self.appointment.appointment_id]},
+        )
+        self.appointment.refresh_from_db()
+        self.assertEqual(self.appointment.version, version + 1)
+        self.appointment.admin_notes = 'edited elsewhere'
+        self.appointment.save()
+        self.assertEqual(self.appointment.version, version + 2)
+
+
+class SeedScaleDataTests(TestCase):
+    ARGUMENTS = ['--clients', '12', '--appointments', '90', '--threads', '6', '--max-replies', '2']
+
+    def _seed(self, *extra: str) -> str:
+        out = StringIO()
+        call_command('seed_scale_data', *self.ARGUMENTS, '--until', '2026-06-30', '--months', '6', *extra, stdout=out)
+        return out.getvalue()
+
+    def _dataset(self) -> tuple:
+        return (
+            list(ClientAccount.objects.order_by('pk').values_list('email', 'full_name', 'school_program')),
+            list(
+                Appointment.objects.order_by('pk').values_list(
+                    'appointment_id', 'client__email', 'status', 'service_type', 'created_at', 'quoted_price'
+                )
+            ),
+            list(ContactMessage.objects.order_by('pk').values_list('client__email', 'subject', 'created_at')),
+        )
+
+    def test_seeded_data_is_consistent(self):
+        self.assertIn('Seeded 12 clients, 90 appointments and 6 threads', self._seed('--seed', '7'))
+        self.assertEqual(ClientAccount.objects.count(), 12)
+        self.assertEqual(Appointment.objects.count(), 90)
+        self.assertEqual(ContactMessage.objects.count(), 6)
+        self.assertTrue(AdminUser.objects.exists())
+        window_start = timezone.make_aware(datetime(2025, 12, 30))
+        window_end = timezone.make_aware(datetime(2026, 6, 30))
+        for created_at in Appointment.objects.values_list('created_at', flat=True):
+            self.assertTrue(window_start <= created_at <= window_end, created_at)
+        # Counters and daily facts are rebuilt after the bulk inserts.
+        for client in ClientAccount.objects.all():
+            self.assertEqual(client.appointment_count, client.appointments.count())
+        self.assertEqual(DailyAppointmentStat.objects.aggregate(total=Sum('bookings'))['total'], 90)
+
+    def test_same_seed_gives_the_same_dataset(self):
+        self._seed('--seed', '7', '--batch-size', '7')
+        first = self._dataset()
+        for model in (ContactMessage, Appointment, ClientAccount):
+            model.objects.all().delete()
+        self._seed('--seed', '7')
+        self.assertEqual(self._dataset(), first)
+        for model in (ContactMessage, Appointment, ClientAccount):
+            model.objects.all().delete()
+        self._seed('--seed', '8')
+        self.assertNotEqual(self._dataset(), first)
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaisesMessage(CommandError, '--max-replies cannot be negative.'):
+            call_command('seed_scale_data', '--max-replies', '-1', stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, 'Appointments need clients'):
+            call_command('seed_scale_data', '--clients', '0', '--appointments', '5', stdout=StringIO())
+
+
+class ClientCounterTests(TestCase):
+    def setUp(self):
+        self.first = ClientAccount.objects.create(
+            email='first@campus.test', full_name='First Client', contact_number='09174444444', password='!'
+        )
+        self.second = ClientAccount.objects.create(
+            email='second@campus.test', full_name='Second Client', contact_number='09175555555', password='!'
+        )
+
+    def _book(self, client, **fields):
+        return Appointment.objects.create(
+            client=client,
+            full_name=client.full_name,
+            contact_number=client.contact_number,
+            device_type=Appointment.DEVICE_ANDROID,
+            brand_model='Galaxy A54',
+            service_type='lcd',
+            issue_description='Cracked screen',
+            preferred_datetime=timezone.now(),
+            location=Appointment.LOCATION_CHOICES[0][0],
+            quoted_price=Decimal('1500.00'),
+            **fields,
+        )
+
+    def _counters(self, client):
+        client.refresh_from_db()
+        return (client.appointment_count, client.active_appointment_count, client.lifetime_spend)
+
+    def test_counters_follow_create_status_change_move_and_delete(self):
+        first = self._book(self.first)
+        second = self._book(self.first, status=Appointment.STATUS_APPROVED)
+        self.assertEqual(self._counters(self.first), (2, 2, Decimal('1500.00')))
+        self.assertIsNotNone(self.first.last_appointment_at)
+
+        first.status = Appointment.STATUS_COMPLETED
+        first.save()
+        self.assertEqual(self._counters(self.first), (2, 1, Decimal('3000.00')))
+
+        second.client = self.second
+        second.save()
+        self.assertEqual(self._counters(self.first), (1, 0, Decimal('1500.00')))
+        self.assertEqual(self._counters(self.second), (1, 1, Decimal('1500.00')))
+
+        first.delete()
+        self.assertEqual(self._counters(self.first), (0, 0, Decimal('0.00')))
+        self.assertIsNone(self.first.last_appointment_at)
+
+    def test_queryset_delete_refreshes_counters(self):
+        for _ in range(3):
+            self._book(self.first)
+        self._book(self.second)
+        Appointment.objects.filter(client=self.first).delete()
+        self.assertEqual(self._counters(self.first), (0, 0, Decimal('0.00')))
+        self.assertEqual(self._counters(self.second), (1, 1, Decimal('0.00')))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ClientPagingTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        admin = AdminUser.objects.create(username='paging-admin', full_name='Paging Admin', password='!')
+        self.admin_client = _admin_client(admin)
+        # Shared names make the id half of the (full_name, id) cursor matter.
+        for index in range(views.CLIENTS_PAGE_SIZE * 2 + 10):
+            ClientAccount.objects.create(
+                email=f'paged{index}@campus.test',
+                full_name=f'Paged Client {index % 40:02d}',
+                contact_number=f'0917666{index:04d}',
+                password='!',
+            )
+        self.detail_prefix = reverse('admin_client_detail', args=[0])[:-2]
+
+    def _page(self, query: str = '') -> tuple[list[int], str | None]:
+        body = self.admin_client.get(reverse('admin_clients') + query).content.decode()
+        ids = [int(found) for found in re.findall(re.escape(self.detail_prefix) + r'(\d+)/', body)]
+        next_link = re.search(r'href="(\?[^"]*)">Next', body)
+        return ids, html.unescape(next_link.group(1)) if next_link else None
+
+    def test_walk_visits_each_client_once(self):
+        seen, query = [], ''
+        while query is not None:
+            ids, query = self._page(query)
+            self.assertLessEqual(len(ids), views.CLIENTS_PAGE_SIZE)
+            seen += ids
+        expected = list(ClientAccount.objects.order_by('full_name', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_pages_stay_stable_when_rows_are_added_before_the_cursor(self):
+        first_ids, next_query = self._page()
+        second_ids, _ = self._page(next_query)
+        # A newcomer that sorts onto page one must not shift page two.
+        ClientAccount.objects.create(
+            email='early@campus.test', full_name='Aaron Early', contact_number='09177777777', password='!'
+        )
+        again, _ = self._page(next_query)
+        self.assertEqual(again, second_ids)
+        self.assertFalse(set(first_ids) & set(second_ids))
+
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        _use_private_caches(self)
+        self.admin = AdminUser.objects.create(username='bulk-admin', full_name='Bulk Admin', password='!')
+        seeder = ScaleDataSeeder(seed=12, now=timezone.now(), log=None)
+        seeder.admin_ids = [self.admin.id]
+        seeder.seed_clients(3)
+        seeder.seed_appointments(30)
+        Appointment.objects.update(
+            status=Appointment.STATUS_PENDING, parts_ordered=False, notification_email='owner@campus.test'
+        )
+        seeder.refresh_counters()
+        seeder.refresh_daily_stats()
+        self.seeder = seeder
+        self.rows = list(Appointment.objects.filter(client__isnull=False).order_by('id'))
+        self.client = _admin_client(self.admin)
+
+    def _bulk(self, action: str, appointments, **extra):
+        return self.client.post(
+            reverse('admin_bulk_appointments'),
+            {'action': action, 'appointment_ids': [appointment.appointment_id for appointment in appointments], **extra},
+            **({} if extra else {'HTTP_ACCEPT': 'application/json'}),
+        )
+
+    def _assert_derived_tables_current(self):
+        for client in ClientAccount.objects.all():
+            appointments = Appointment.objects.filter(client=client)
+            self.assertEqual(client.appointment_count, appointments.count())
+            self.assertEqual(
+                client.active_appointment_count, appointments.filter(status__in=Appointment.ACTIVE_STATUSES).count()
+            )
+        fields = ('day', 'device_type', 'location', 'bookings')
+        facts = sorted(DailyAppointmentStat.objects.values_list(*fields))
+        DailyAppointmentStat.rebuild()
+        self.assertEqual(facts, sorted(DailyAppointmentStat.objects.values_list(*fields)))
+
+    def test_status_actions_report_and_notify_only_real_changes(self):
+        pending, approved, locked = self.rows[:2], self.rows[2], self.rows[3]
+        Appointment.objects.filter(pk=approved.pk).update(status=Appointment.STATUS_APPROVED)
+        Appointment.objects.filter(pk=locked.pk).update(status=Appointment.STATUS_COMPLETED)
+        self.seeder.refresh_counters()
+        missing = Appointment(appointment_id='BIP-000000-NONE')
+
+        data = self._bulk('approve', [*pending, approved, locked, missing]).json()
+        self.assertEqual(data['summary'], {'updated': 2, 'unchanged': 1, 'locked': 1, 'not_found': 1})
+        self.assertEqual(
+            [row['result'] for row in data['results']], ['updated', 'updated', 'unchanged', 'locked', 'not_found']
+        )
+        notified = StatusNotification.objects.values_list('appointment__appointment_id', flat=True)
+        self.assertCountEqual(notified, [appointment.appointment_id for appointment in pending])
+        self.assertEqual(Appointment.objects.get(pk=approved.pk).version, approved.version)
+
+        again = self._bulk('approve', pending).json()
+        self.assertEqual(again['summary'], {'unchanged': 2})
+        self.assertEqual(StatusNotification.objects.count(), 2)
+        self._assert_derived_tables_current()
+
+    def test_delete_refreshes_each_client_and_day_once(self):
+        doomed = self.rows[:12]
+        with (
+            mock.patch.object(ClientAccount, 'refresh_counters', wraps=ClientAccount.refresh_counters) as counters,
+            mock.patch.object(DailyAppointmentStat, 'refresh_days', wraps=DailyAppointmentStat.refresh_days) as days,
+        ):
+            data = self._bulk('delete', doomed).json()
+        self.assertEqual(data['summary'], {'deleted': len(doomed)})
+        self.assertEqual(counters.call_count, 1)
+        self.assertEqual(set(counters.call_args.args[0]), {appointment.client_id for appointment in doomed})
+        self.assertEqual(days.call_count, 1)
+        self.assertFalse(Appointment.objects.filter(pk__in=[appointment.pk for appointment in doomed]).exists())
+        self._assert_derived_tables_current()
+
+    def test_next_must_stay_on_site(self):
+        target = reverse('admin_appointments')
+        response = self._bulk('in_progress', self.rows[:1], next='https://evil.example/phish')
+        self.assertRedirects(response, target, fetch_redirect_response=False)
+        response = self._bulk('in_progress', self.rows[:1], next=f'{target}?status=open')
+        self.assertRedirects(response, f'{target}?status=open', fetch_redirect_response=False)
+
+
+class ImportRecordsTests(TestCase):
+    APPOINTMENT = {
+        'full_name': 'Import Client',
+        'contact_number': '09172222222',
+        'client_email': 'importer@campus.test',
+        'device_type': 'android',
+        'device_brand': 'samsung',
+        'brand_model': 'Galaxy A54',
+        'service_type': 'lcd',
+        'issue_description': 'Cracked screen',
+        'preferred_datetime': '2025-03-04T10:00:00',
+        'created_at': '2025-03-01T09:00:00',
+        'location': 'meetup-central',
+        'status': 'completed',
+    }
+
+    def setUp(self):
+        _use_private_caches(self)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.account = ClientAccount.objects.create(
+            email='importer@campus.test', full_name='Import Client', contact_number='09172222222', password='!'
+        )
+
+    def _import(self, kind: str, name: str, text: str, *options: str) -> tuple[str, str]:
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+        out, err = StringIO(), StringIO()
+        call_command('import_records', kind, path, '--workers', '1', *options, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_clients_are_fully_validated_and_duplicates_reported(self):
+        rows = [
+            'email,full_name,contact_number,school_program,student_type',
+            'ana@campus.test,Ana Cruz,09170000001,nursing,regular',
+            'ANA@campus.test,Ana Again,09170000002,,',
+            f"ben@campus.test,{'B' * 151},09170000003,,",
+            'cy@campus.test,Cy Lim,09170000004,astrology,',
+            'importer@campus.test,Import Client,09172222222,,',
+            'not-an-email,Dee Uy,09170000005,,',
+        ]
+        out, err = self._import('clients', 'clients.csv', '\n'.join(rows) + '\n')
+        self.assertIn('Imported 1 clients; 2 already present and 3 invalid row(s) skipped.', out)
+        self.assertIn('Line 4: full_name: Ensure this value has at most 150 characters', err)
+        self.assertIn("Line 5: school_program: Value 'astrology' is not a valid choice.", err)
+        self.assertIn('Line 7: email: Enter a valid email address.', err)
+        self.assertEqual(ClientAccount.objects.get(email='ana@campus.test').full_name, 'Ana Cruz')
+
+    def test_appointments_from_ndjson(self):
+        lines = [
+            json.dumps(self.APPOINTMENT),
+            json.dumps([1, 2]),
+            json.dumps('just text'),
+            '{"broken": ',
+            json.dumps({**self.APPOINTMENT, 'location': 'rooftop'}),
+            json.dumps({**self.APPOINTMENT, 'appointment_id': 'BIP-250301-LEGC', 'status': 'pending'}),
+            json.dumps({**self.APPOINTMENT, 'brand_model': 'G' * 151}),
+        ]
+        out, err = self._import('appointments', 'history.ndjson', '\n'.join(lines) + '\n')
+        self.assertIn('Imported 2 appointments; 0 already present and 5 invalid row(s) skipped.', out)
+        self.assertIn('Line 2: Each line must be a JSON object.', err)
+        self.assertIn('Line 3: Each line must be a JSON object.', err)
+        self.assertIn("Line 5: location: Value 'rooftop' is not a valid choice.", err)
+        self.assertIn('Line 7: brand_model: Ensure this value has at most 150 characters', err)
+        self.account.refresh_from_db()
+        self.assertEqual((self.account.appointment_count, self.account.active_appointment_count), (2, 1))
+        self.assertEqual(DailyAppointmentRollup.objects.get(dimension='', day=date(2025, 3, 1)).bookings, 2)
+
+        # Replaying a file with a fixed ID writes nothing new.
+        out, _ = self._import('appointments', 'replay.ndjson', lines[5] + '\n')
+        self.assertIn('Imported 0 appointments; 1 already present and 0 invalid row(s) skipped.', out)
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_resume_after_a_crash_reuses_the_allocated_ids(self):
+        checkpoint = os.path.join(self.tmpdir, 'progress.json')
+        text = '\n'.join(json.dumps(self.APPOINTMENT) for _ in range(3)) + '\n'
+        save_checkpoint = import_records.Command._save_checkpoint
+
+        def crash_after_commit(command, path, state):
+            # The batch has committed; die before its progress is recorded.
+            if state['rows_done']:
+                raise RuntimeError('killed')
+            save_checkpoint(command, path, state)
+
+        with mock.patch.object(
+            import_records.Command, '_save_checkpoint', autospec=True, side_effect=crash_after_commit
+        ), self.assertRaisesMessage(RuntimeError, 'killed'):
+            self._import('appointments', 'history.ndjson', text, '--checkpoint', checkpoint)
+        stored = set(Appointment.objects.values_list('appointment_id', flat=True))
+        self.assertEqual(len(stored), 3)
+
+        out, _ = self._import('appointments', 'history.ndjson', text, '--checkpoint', checkpoint)
+        self.assertIn('Imported 0 appointments; 3 already present', out)
+        self.assertEqual(set(Appointment.objects.values_list('appointment_id', flat=True)), stored)
+
+    def test_rows_another_writer_stored_first_are_not_counted(self):
+        insert = import_records.Command._insert
+
+        def racing_writer(command, model, key, objects):
+            # Another import stores the first email between the duplicate
+            # check and this insert.
+            ClientAccount.objects.create(
+                email=objects[0].email, full_name='Other Import', password='!', created_at=timezone.now()
+            )
+            return insert(command, model, key, objects)
+
+        rows = [
+            'email,full_name,contact_number',
+            'eve@campus.test,Eve Go,09170000006',
+            'fay@campus.test,Fay Ong,09170000007',
+        ]
+        with mock.patch.object(import_records.Command, '_insert', autospec=True, side_effect=racing_writer):
+            out, _ = self._import('clients', 'clients.csv', '\n'.join(rows) + '\n')
+        self.assertIn('Imported 1 clients; 1 already present', out)
+        self.assertEqual(ClientAccount.objects.get(email='eve@campus.test').full_name, 'Other Import')
+        self.assertEqual(ClientAccount.objects.get(email='fay@campus.test').full_name, 'Fay Ong')
+
+
+def _in_worker(database: str | None) -> None:
+    if database:
+        # A forked child: leave the parent's in-memory connection alone
+        # and work on the file copy of the test database.
+        connection.settings_dict['NAME'] = database
+        connection.connection = None
+
+
+def _claim_until_empty(database: str | None, admin_id: int, results) -> None:
+    try:
+        _in_worker(database)
+        admin = AdminUser.objects.get(pk=admin_id)
+        claimed = []
+        while (appointment := assignments.claim_next(admin)) is not None:
+            claimed.append(appointment.appointment_id)
+        results.put((admin_id, claimed))
+    except Exception as exc:  # noqa: BLE001 - reported to the parent
+        results.put((admin_id, exc))
+    finally:
+        if not database:
+            connection.close()
+
+
+def _save_edit(database: str | None, pk: int, version: int, notes: str, results) -> None:
+    try:
+        _in_worker(database)
+        appointment = Appointment.objects.get(pk=pk)
+        appointment.admin_notes = notes
+        results.put((notes, views._save_status_update(appointment, version)))
+    except Exception as exc:  # noqa: BLE001 - reported to the parent
+        results.put((notes, exc))
+    finally:
+        if not database:
+            connection.close()
+
+
+def _concurrently(test, target, arguments) -> tuple[list, object]:
+    # Runs target(database, *args, results) for every argument tuple at once.
+    # Returns what the workers reported and a function running SQL against
+    # the database they wrote to.
+    if connection.vendor != 'sqlite':
+        # Each thread gets its own connection to the test database.
+        results = multiprocessing.Queue()
+        workers = [threading.Thread(target=target, args=(None, *args, results)) for args in arguments]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        def query(sql):
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                return cursor.fetchall()
+
+        return [results.get(timeout=60) for _ in workers], query
+    # The SQLite test database lives in memory, so the workers are forked
+    # processes sharing a file copy of it, as separate web workers would.
+    tmpdir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmpdir.cleanup)
+    database = os.path.join(tmpdir.name, 'concurrent.sqlite3')
+    copy = sqlite3.connect(database)
+    connection.ensure_connection()
+    connection.connection.backup(copy)
+    copy.close()
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=target, args=(database, *args, results)) for args in arguments]
+    for worker in workers:
+        worker.start()
+    reported = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    def query(sql):
+        copy = sqlite3.connect(database)
+        try:
+            return copy.execute(sql).fetchall()
+        finally:
+            copy.close()
+
+    return reported, query
+
+
+@override_settings(
+    RATELIMIT_ENABLED=False,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class BenchmarkTests(LiveServerTestCase):
+    def setUp(self):
+        _use_private_caches(self)
+
+    def test_every_flow_runs_cleanly_and_is_summarized(self):
+        data = bench.seed_database(clients=4, appointments=20, threads=3, seed=5)
+        # One user at a time: the live server shares the in-memory database.
+        recorder, wall, failures = bench.drive(self.live_server_url, bench.DEFAULT_MIX, data, 1, 2.0, seed=5)
+        self.assertEqual(failures, 0)
+        results = bench.summarize(recorder, wall)
+        self.assertEqual(results['totals']['errors'], 0)
+        self.assertGreater(results['totals']['requests'], 0)
+        self.assertIn('home', results['endpoints'])
+        for stats in results['endpoints'].values():
+            self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+            self.assertLessEqual(stats['p95_ms'], stats['p99_ms'])
+            self.assertLessEqual(stats['p99_ms'], stats['max_ms'])
+
+        home = results['endpoints']['home']
+        slower = {'endpoints': {'home': dict(home, p50_ms=home['p50_ms'] * 2)}}
+        (label, p50, *_), = bench.compare(slower, results)
+        self.assertEqual(label, 'home')
+        self.assertAlmostEqual(p50[2], -50.0, places=3)
+
+    def test_mix_rejects_unknown_scenarios(self):
+        self.assertEqual(bench.parse_mix('anonymous_home=3,admin_triage'), {'anonymous_home': 3, 'admin_triage': 1})
+        with self.assertRaisesMessage(CommandError, 'Unknown scenario "everything"'):
+            call_command('run_benchmarks', '--mix', 'everything=1', stdout=StringIO())
+
+
+class WarmupTests(TestCase):
+    def test_warm_up_compiles_templates_and_loads_the_catalog(self):
+        catalog.invalidate()
+        self.addCleanup(catalog.invalidate)
+        for engine in engines.all():
+            engine.engine.template_loaders[0].reset()
+        # The in-memory test database ignores close(), so watch for the call.
+        with mock.patch.object(warmup.connections, 'close_all') as close_all:
+            timings = warmup.warm_up()
+        self.assertEqual(list(timings), [name for name, _ in warmup.WARMUP_STEPS])
+        self.assertIsNotNone(catalog._data)
+        close_all.assert_called_once_with()
+
+        # Every project template is already compiled: rendering one reads no file.
+        with mock.patch('builtins.open', side_effect=AssertionError('template read from disk')):
+            get_template('admin_dashboard.html')
+            get_template('emails/status_completed.txt')
+
+    @override_settings(READ_REPLICA_ENABLED=False)
+    def test_open_connections_skips_the_idle_replica_and_short_lived_connections(self):
+        def opened(max_age: int) -> list[str]:
+            aliases = []
+            record = mock.patch.object(
+                BaseDatabaseWrapper,
+                'ensure_connection',
+                autospec=True,
+                side_effect=lambda wrapper: aliases.append(wrapper.alias),
+            )
+            with mock.patch.dict(connections['default'].settings_dict, CONN_MAX_AGE=max_age), record:
+                warmup.open_connections()
+            return aliases
+
+        self.assertEqual(opened(60), ['default'])
+        self.assertEqual(opened(0), [])
+
+
+class ClaimConcurrencyTests(TransactionTestCase):
+    CLAIMERS = 8
+
+    def setUp(self):
+        _use_private_caches(self)
+        self.admins = [
+            AdminUser.objects.create(username=f'claimer-{index}', full_name=f'Claimer {index}', password='!')
+            for index in range(self.CLAIMERS)
+        ]
+        seeder = ScaleDataSeeder(seed=9, now=timezone.now(), log=None)
+        seeder.admin_ids = [admin.id for admin in self.admins]
+        seeder.seed_clients(10)
+        seeder.seed_appointments(400)
+        # Most seeded history is long finished; put a backlog in the queue.
+        Appointment.objects.filter(id__in=Appointment.objects.order_by('id').values('id')[:300]).update(
+            status=Appointment.STATUS_PENDING
+        )
+        self.pending = set(
+            Appointment.objects.filter(status=Appointment.STATUS_PENDING).values_list('appointment_id', flat=True)
+        )
+
+    def _claim_concurrently(self) -> tuple[dict, dict]:
+        reported, query = _concurrently(self, _claim_until_empty, [(admin.id,) for admin in self.admins])
+        holders = dict(query('SELECT appointment_id, assigned_to_id FROM appointments WHERE assigned_to_id IS NOT NULL'))
+        return dict(reported), holders
+
+    def test_concurrent_claimers_never_share_an_appointment(self):
+        self.assertGreaterEqual(len(self.pending), 300)
+        claims, holders = self._claim_concurrently()
+        for admin_id, claimed in claims.items():
+            self.assertIsInstance(claimed, list, f'claimer {admin_id} failed: {claimed!r}')
+        every_claim = [appointment_id for claimed in claims.values() for appointment_id in claimed]
+        self.assertEqual(len(every_claim), len(set(every_claim)))
+        self.assertEqual(set(every_claim), self.pending)
+        self.assertEqual(
+            holders, {appointment_id: admin_id for admin_id, claimed in claims.items() for appointment_id in claimed}
+        )
+        # The queue is shared out, not drained by whoever started first.
+        self.assertGreater(sum(1 for claimed in claims.values() if claimed), 1)
+
+
+class EditConcurrencyTests(TransactionTestCase):
+    EDITORS = 8
+
+    def setUp(self):
+        _use_private_caches(self)
+        seeder = ScaleDataSeeder(seed=11, now=timezone.now(), log=None)
+        seeder.admin_ids = [AdminUser.objects.create(username='editor', full_name='Editor', password='!').id]
+        seeder.seed_clients(2)
+        seeder.seed_appointments(5)
+        Appointment.objects.update(status=Appointment.STATUS_PENDING, parts_ordered=False)
+        self.appointment = Appointment.objects.first()
+
+    def test_one_of_many_simultaneous_saves_wins(self):
+        version = self.appointment.version
+        arguments = [(self.appointment.pk, version, f'editor {index}') for index in range(self.EDITORS)]
+        reported, query = _concurrently(self, _save_edit, arguments)
+        outcomes = dict(reported)
+        for notes, saved in outcomes.items():
+            self.assertIsInstance(saved, bool, f'{notes} failed: {saved!r}')
+        winners = [notes for notes, saved in outcomes.items() if saved]
+        self.assertEqual(len(winners), 1)
+        rows = query(f'SELECT admin_notes, version FROM appointments WHERE id = {self.appointment.pk}')
+        self.assertEqual(rows, [(winners[0], version + 1)])
+
+
+def _book_today(database: str | None, booker: int, bookings: int, results) -> None:
+    try:
+        _in_worker(database)
+        for number in range(bookings):
+            Appointment.objects.create(
+                # Random ids for 180 same-day bookings collide about 1% of the time.
+                appointment_id=f'BIP-TEST-{booker}{number:03d}',
+                full_name=f'Booker {booker}',
+                contact_number=f'0917{booker:03d}{number:04d}',
+                device_type=Appointment.DEVICE_LAPTOP,
+                device_brand='lenovo',
+                brand_model='IdeaPad 3',
+                service_type='cleaning',
+                issue_description='Overheating',
+                preferred_datetime=timezone.now(),
+                location=Appointment.LOCATION_CHOICES[number % 2][0],
+            )
+        results.put((booker, bookings))
+    except Exception as exc:  # noqa: BLE001 - reported to the parent
+        results.put((booker, exc))
+    finally:
+        if not database:
+            connection.close()
+
+
+class DailyStatConcurrencyTests(TransactionTestCase):
+    BOOKERS = 6
+    BOOKINGS = 30
+
+    def setUp(self):
+        _use_private_caches(self)
+
+    def test_same_day_bookings_from_many_workers(self):
+        arguments = [(booker, self.BOOKINGS) for booker in range(self.BOOKERS)]
+        reported, query = _concurrently(self, _book_today, arguments)
+        for booker, booked in reported:
+            self.assertEqual(booked, self.BOOKINGS, f'booker {booker} failed: {booked!r}')
+        total = self.BOOKERS * self.BOOKINGS
+        self.assertEqual(query('SELECT COUNT(*) FROM appointments'), [(total,)])
+        # The last refresh to commit saw every booking.
+        self.assertEqual(query("SELECT SUM(bookings) FROM daily_appointment_rollups WHERE dimension = ''"), [(total,)])
+        self.assertEqual(query('SELECT SUM(bookings) FROM daily_appointment_stats'), [(total,)])
+        self.assertEqual(
+            sorted(query("SELECT value, bookings FROM daily_appointment_rollups WHERE dimension = 'location'")),
+            [(Appointment.LOCATION_CHOICES[0][0], total // 2), (Appointment.LOCATION_CHOICES[1][0], total // 2)],
+        )
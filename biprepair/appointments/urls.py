@@ -6,6 +6,7 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('book/', views.book_appointment, name='book_appointment'),
     path('status/', views.check_status, name='check_status'),
+    path('status/lookup/', views.status_lookup, name='status_lookup'),
     path('clients/login/', views.client_login, name='client_login'),
     path('clients/logout/', views.client_logout, name='client_logout'),
     path('clients/register/', views.client_register, name='client_register'),
@@ -15,13 +16,29 @@ urlpatterns = [
     path('admin/logout/', views.admin_logout, name='admin_logout'),
     path('admin/register/', views.admin_register, name='admin_register'),
     path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin/analytics/', views.admin_analytics, name='admin_analytics'),
     path('admin/appointments/', views.admin_appointments, name='admin_appointments'),
+    path('admin/appointments/bulk/', views.admin_bulk_appointments, name='admin_bulk_appointments'),
     path('admin/appointments/<str:appointment_id>/', views.admin_detail, name='admin_detail'),
     path('admin/appointments/<str:appointment_id>/delete/', views.admin_delete_appointment, name='admin_delete_appointment'),
+    path('admin/appointments/<str:appointment_id>/claim/', views.admin_claim_appointment, name='admin_claim_appointment'),
+    path('admin/appointments/<str:appointment_id>/release/', views.admin_release_appointment, name='admin_release_appointment'),
+    path('admin/queue/', views.admin_queue, name='admin_queue'),
+    path('admin/queue/claim/', views.admin_claim_next, name='admin_claim_next'),
     path('admin/messages/', views.admin_messages, name='admin_messages'),
     path('admin/messages/<int:message_id>/', views.admin_message_detail, name='admin_message_detail'),
     path('admin/clients/', views.admin_clients, name='admin_clients'),
     path('admin/clients/<int:client_id>/', views.admin_client_detail, name='admin_client_detail'),
+    path('admin/exports/appointments/', views.admin_export_appointments, name='admin_export_appointments'),
+    path('admin/exports/clients/', views.admin_export_clients, name='admin_export_clients'),
+    path('admin/exports/messages/', views.admin_export_messages, name='admin_export_messages'),
+    path('admin/queries/', views.admin_queries, name='admin_queries'),
+    path('admin/queries/export/', views.admin_queries_export, name='admin_queries_export'),
+    path('admin/queries/reset/', views.admin_queries_reset, name='admin_queries_reset'),
+    path('admin/profiles/', views.admin_profiles, name='admin_profiles'),
+    path('admin/profiles/<str:profile_id>/', views.admin_profile_detail, name='admin_profile_detail'),
+    path('admin/profiles/<str:profile_id>/download/', views.admin_profile_download, name='admin_profile_download'),
+    path('admin/catalog/', views.admin_catalog, name='admin_catalog'),
     path('admin/settings/', views.admin_settings, name='admin_settings'),
     path('tos/', views.terms_of_service, name='terms_of_service'),
     path('privacy/', views.privacy_policy, name='privacy_policy'),
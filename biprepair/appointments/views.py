@@ -1,21 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+from decimal import Decimal
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
 from django.contrib import messages
-from django.db.models import Count, Sum, Max, Q
-from django.db.models.functions import TruncMonth
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import BooleanField, Case, Count, F, Sum, Max, Q, TextField, Value, When
+from django.db.models.functions import Concat, Lower, TruncMonth, TruncWeek
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.utils.crypto import constant_time_compare
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.templatetags.static import static
 
+from . import assignments, generations
+from .catalog import catalog
+from .compression import breach_safe
+from .conditional import conditional
 from .constants import POLICIES_VERSION, SESSION_ADMIN_KEY, SESSION_CLIENT_KEY
 from .forms import (
     AdminLoginForm,
     AdminRegisterForm,
+    AnalyticsFilterForm,
     AppointmentForm,
     CheckStatusForm,
     ClientAcademicForm,
@@ -23,30 +40,50 @@ from .forms import (
     ClientRegisterForm,
     ContactAdminForm,
     AdminMessageReplyForm,
+    DeviceBrandForm,
+    DeviceModelForm,
+    ServiceOfferingForm,
     StatusUpdateForm,
 )
-from .models import AdminUser, Appointment, ClientAccount, ContactMessage
+from .exports import (
+    APPOINTMENT_EXPORT_FIELDS,
+    CLIENT_EXPORT_FIELDS,
+    MESSAGE_EXPORT_FIELDS,
+    stream_export,
+    stream_rows,
+)
+from .metrics import render_prometheus
+from .models import (
+    AdminUser,
+    Appointment,
+    ClientAccount,
+    ContactMessage,
+    DailyAppointmentRollup,
+    DailyAppointmentStat,
+    DeviceBrand,
+    DeviceModel,
+    ServiceOffering,
+    ServicePrice,
+    local_day,
+)
+from .notifications import queue_status_notification, queue_status_notifications
+from . import querylog
+from .profiling import PROFILE_SORTS, list_profiles, load_profile, stats_path, top_functions
+from .ratelimit import field as request_field, rate_limit, session_client
+from .routers import reading_replica, replica_reads
+from .signals import deferred_refreshes
 
 SESSION_ADMIN_KEY = 'admin_user_id'
 SESSION_CLIENT_KEY = 'client_user_id'
 
-
-def _service_map():
-    return {
-        key: [{'value': value, 'label': label} for value, label in choices]
-        for key, choices in Appointment.SERVICE_CHOICES.items()
-    }
-
-
-def _brand_map():
-    return {
-        key: [{'value': value, 'label': label} for value, label in choices]
-        for key, choices in Appointment.BRAND_CHOICES.items()
-    }
-
-
-def _model_map():
-    return Appointment.MODEL_SUGGESTIONS
+BULK_STATUS_ACTIONS = {
+    'approve': (Appointment.STATUS_APPROVED, 'approved'),
+    'in_progress': (Appointment.STATUS_IN_PROGRESS, 'marked in progress'),
+    'complete': (Appointment.STATUS_COMPLETED, 'completed'),
+    'decline': (Appointment.STATUS_DECLINED, 'declined'),
+}
+BULK_ACTION_LIMIT = 500
+CLIENTS_PAGE_SIZE = 50
 
 
 def service_worker(_request: HttpRequest) -> HttpResponse:
@@ -102,10 +139,13 @@ self.addEventListener('fetch', (event) => {{
     return response
 
 
-def _earning_queryset():
-    return Appointment.objects.filter(
-        Q(status=Appointment.STATUS_COMPLETED) | Q(status=Appointment.STATUS_APPROVED)
-    )
+def metrics(request: HttpRequest) -> HttpResponse:
+    token = settings.METRICS_TOKEN
+    bearer = request.headers.get('Authorization', '')
+    authorized = bool(token) and constant_time_compare(bearer, f'Bearer {token}')
+    if not authorized and not _get_logged_admin(request):
+        return HttpResponseForbidden('Metrics are available to admins only.', content_type='text/plain')
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 def _get_logged_admin(request: HttpRequest) -> AdminUser | None:
@@ -128,6 +168,27 @@ def _get_logged_client(request: HttpRequest) -> ClientAccount | None:
         return None
 
 
+async def _aget_logged_client(request: HttpRequest) -> ClientAccount | None:
+    # Sessions have no async API in Django 4.2; loading one is a single query.
+    client_id = await sync_to_async(request.session.get)(SESSION_CLIENT_KEY)
+    if not client_id:
+        return None
+    try:
+        return await ClientAccount.objects.aget(id=client_id)
+    except ClientAccount.DoesNotExist:
+        return None
+
+
+def _next_url(request: HttpRequest, default: str) -> str:
+    # "next" comes from the form or query string; only same-site paths count.
+    candidate = request.POST.get('next') or request.GET.get('next')
+    if candidate and url_has_allowed_host_and_scheme(
+        candidate, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+    ):
+        return candidate
+    return default
+
+
 def _style_contact_admin_form(form: ContactAdminForm) -> None:
     form.fields['subject'].widget.attrs['placeholder'] = 'Subject or topic'
     form.fields['body'].widget.attrs['placeholder'] = 'Write your message…'
@@ -135,14 +196,16 @@ def _style_contact_admin_form(form: ContactAdminForm) -> None:
     form.fields['preferred_contact'].widget.attrs.setdefault('class', 'composer-select')
 
 
-def _admin_profiles_with_primary():
+def _admin_profiles_with_primary(admins=None):
+    if admins is None:
+        admins = AdminUser.objects.all().order_by('full_name')
     admin_profiles = []
     status_palette = [
         {'label': 'Online now', 'tone': 'online'},
         {'label': 'Replying soon', 'tone': 'soon'},
         {'label': 'Away · leave a note', 'tone': 'away'},
     ]
-    for idx, admin in enumerate(AdminUser.objects.all().order_by('full_name')):
+    for idx, admin in enumerate(admins):
         initials = ''.join(part[0] for part in admin.full_name.split()[:2]).upper() or admin.full_name[:2].upper()
         status = status_palette[idx % len(status_palette)]
         admin_profiles.append(
@@ -160,9 +223,9 @@ def _admin_profiles_with_primary():
 
 def home(request: HttpRequest) -> HttpResponse:
     context = {
-        'service_map': _service_map(),
-        'brand_map': _brand_map(),
-        'model_map': _model_map(),
+        'service_map': catalog.service_map(),
+        'brand_map': catalog.brand_map(),
+        'model_map': catalog.model_map(),
         'device_choices': Appointment.DEVICE_CHOICES,
         'blocked_notice': 'iPhone battery issues are NOT accepted. No soldering / board-level repairs.',
     }
@@ -170,6 +233,18 @@ def home(request: HttpRequest) -> HttpResponse:
 
 
 def _client_guard(view_func):
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def async_wrapper(request: HttpRequest, *args, **kwargs):
+            client = await _aget_logged_client(request)
+            if not client:
+                return redirect(f"{reverse('client_login')}?next={request.path}")
+            request.client_user = client  # type: ignore[attr-defined]
+            return await view_func(request, *args, **kwargs)
+
+        return async_wrapper
+
     @wraps(view_func)
     def wrapper(request: HttpRequest, *args, **kwargs):
         client = _get_logged_client(request)
@@ -181,6 +256,7 @@ def _client_guard(view_func):
     return wrapper
 
 
+@breach_safe
 @_client_guard
 def book_appointment(request: HttpRequest) -> HttpResponse:
     client = request.client_user  # type: ignore[attr-defined]
@@ -215,16 +291,36 @@ def book_appointment(request: HttpRequest) -> HttpResponse:
         )
     context = {
         'form': form,
-        'service_map_json': json.dumps(_service_map()),
-        'brand_map_json': json.dumps(_brand_map()),
-        'model_map_json': json.dumps(_model_map()),
-        'service_pricing_json': json.dumps(Appointment.SERVICE_PRICING),
+        **catalog.page_json(),
         'blocked_notice': 'No iPhone battery fixes. No board-level / soldering requests.',
         'client_user': client,
     }
     return render(request, 'book.html', context)
 
 
+def _status_filters(cleaned_data: dict) -> dict:
+    filters = {}
+    if cleaned_data['appointment_id']:
+        filters['appointment_id__iexact'] = cleaned_data['appointment_id']
+    if cleaned_data['contact_number']:
+        filters['contact_number__iexact'] = cleaned_data['contact_number']
+    if cleaned_data.get('email'):
+        filters['notification_email__iexact'] = cleaned_data['email']
+    return filters
+
+
+def _status_version(request: HttpRequest) -> str:
+    if not request.session.get(SESSION_CLIENT_KEY):
+        return ''
+    # A signed-in client's own appointments are listed.
+    return ':'.join(
+        (generations.current(generations.APPOINTMENTS), generations.current(generations.CLIENTS), catalog.version)
+    )
+
+
+@rate_limit('status-ip', '20/m')
+@rate_limit('status-id', '10/m', key=request_field('appointment_id', 'contact_number', 'email'))
+@conditional(_status_version)
 def check_status(request: HttpRequest) -> HttpResponse:
     results = None
     client = _get_logged_client(request)
@@ -236,14 +332,7 @@ def check_status(request: HttpRequest) -> HttpResponse:
         form = CheckStatusForm(request.POST)
         if form.is_valid():
             mask_tracking = not bool(form.cleaned_data['appointment_id'])
-            filters = {}
-            if form.cleaned_data['appointment_id']:
-                filters['appointment_id__iexact'] = form.cleaned_data['appointment_id']
-            if form.cleaned_data['contact_number']:
-                filters['contact_number__iexact'] = form.cleaned_data['contact_number']
-            if form.cleaned_data.get('email'):
-                filters['notification_email__iexact'] = form.cleaned_data['email']
-            results = Appointment.objects.filter(**filters)
+            results = Appointment.objects.filter(**_status_filters(form.cleaned_data))
             if not results.exists():
                 messages.warning(request, 'No appointments found. Please double-check your details.')
     else:
@@ -261,8 +350,36 @@ def check_status(request: HttpRequest) -> HttpResponse:
     )
 
 
+@rate_limit('status-ip', '20/m', methods=('GET',))
+@rate_limit('status-id', '10/m', key=request_field('appointment_id', 'contact_number', 'email'), methods=('GET',))
+@conditional(lambda request: f'{generations.current(generations.APPOINTMENTS)}:{catalog.version}')
+async def status_lookup(request: HttpRequest) -> JsonResponse:
+    form = CheckStatusForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    mask_tracking = not bool(form.cleaned_data['appointment_id'])
+    queryset = Appointment.objects.filter(**_status_filters(form.cleaned_data)).order_by('-created_at')
+    await catalog.aload()
+    results = [
+        {
+            'appointment_id': appointment.masked_id if mask_tracking else appointment.appointment_id,
+            'status': appointment.status,
+            'status_display': appointment.get_status_display(),
+            'device_type_display': appointment.get_device_type_display(),
+            'service_label': appointment.service_label,
+            'preferred_iso': appointment.preferred_datetime.isoformat(),
+            'location_display': appointment.get_location_display(),
+            'updated_iso': appointment.updated_at.isoformat(),
+        }
+        async for appointment in queryset[:20]
+    ]
+    return JsonResponse({'results': results})
+
+
+@rate_limit('login-ip', '20/m')
+@rate_limit('admin-login', '10/h', key=request_field('username'))
 def admin_login(request: HttpRequest) -> HttpResponse:
-    next_url = request.GET.get('next') or request.POST.get('next') or reverse('admin_dashboard')
+    next_url = _next_url(request, reverse('admin_dashboard'))
     if _get_logged_admin(request):
         return redirect(next_url)
 
@@ -316,58 +433,185 @@ def admin_guard(view_func):
     return wrapper
 
 
-def _monthly_series(queryset, value_field: str | None = None):
-    if value_field:
-        data = (
-            queryset.annotate(month=TruncMonth('created_at'))
-            .values('month')
-            .annotate(total=Sum(value_field))
-            .order_by('month')
-        )
-        return [
-            {'label': item['month'].strftime('%b %Y'), 'value': float(item['total'] or 0)}
-            for item in data
-        ]
-    data = (
-        queryset.annotate(month=TruncMonth('created_at'))
+@admin_guard
+@replica_reads
+def admin_dashboard(request: HttpRequest) -> HttpResponse:
+    total_clients = ClientAccount.objects.filter(is_active=True).count()
+    months = list(
+        DailyAppointmentRollup.objects.filter(dimension='')
+        .annotate(month=TruncMonth('day'))
         .values('month')
-        .annotate(total=Count('id'))
+        .annotate(month_bookings=Sum('bookings'), month_earnings=Sum('earnings'))
         .order_by('month')
+        .values_list('month', 'month_bookings', 'month_earnings')
     )
-    return [
-        {'label': item['month'].strftime('%b %Y'), 'value': item['total']}
-        for item in data
+    monthly_earnings = [
+        {'label': month.strftime('%b %Y'), 'value': float(earnings)} for month, _bookings, earnings in months
+    ]
+    monthly_appointments = [
+        {'label': month.strftime('%b %Y'), 'value': bookings} for month, bookings, _earnings in months
     ]
-
-
-@admin_guard
-def admin_dashboard(request: HttpRequest) -> HttpResponse:
-    earning_qs = _earning_queryset()
-    total_earnings = earning_qs.aggregate(total=Sum('quoted_price'))['total'] or 0
-    total_clients = ClientAccount.objects.filter(is_active=True).count()
-    total_appointments = Appointment.objects.count()
-    monthly_earnings = _monthly_series(earning_qs, 'quoted_price')
-    monthly_appointments = _monthly_series(Appointment.objects.all())
     return render(
         request,
         'admin_home.html',
         {
             'admin_user': request.admin_user,
-            'total_earnings': total_earnings,
+            'total_earnings': sum((earnings for _month, _bookings, earnings in months), Decimal('0')),
             'total_clients': total_clients,
-            'total_appointments': total_appointments,
+            'total_appointments': sum(bookings for _month, bookings, _earnings in months),
             'monthly_earnings': json.dumps(monthly_earnings),
             'monthly_appointments': json.dumps(monthly_appointments),
         },
     )
 
 
+ANALYTICS_PERIODS = {'day': F('day'), 'week': TruncWeek('day'), 'month': TruncMonth('day')}
+
+
+def _period_start(day, granularity: str):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(period, granularity: str):
+    if granularity == 'week':
+        return period + timedelta(days=7)
+    if granularity == 'month':
+        return (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return period + timedelta(days=1)
+
+
+def _analytics_point(bookings, completed, earnings, turnaround_seconds, turnaround_count) -> dict:
+    return {
+        'bookings': bookings,
+        'completed': completed,
+        'completion_rate': round(completed / bookings, 4) if bookings else None,
+        'earnings': float(earnings),
+        'avg_turnaround_hours': round(turnaround_seconds / turnaround_count / 3600, 2) if turnaround_count else None,
+    }
+
+
+def _analytics_facts(filters: dict):
+    # No filter or a single one is answered from the per-day rollups, at
+    # most one row a day; combined filters need the full-grain facts.
+    if len(filters) > 1:
+        return DailyAppointmentStat.objects.filter(**filters)
+    dimension, value = next(iter(filters.items()), ('', ''))
+    return DailyAppointmentRollup.objects.filter(dimension=dimension, value=value)
+
+
+def _analytics_version(request: HttpRequest) -> str:
+    # Facts change with appointments and with a client's school program.
+    return f'{generations.current(generations.APPOINTMENTS)}:{generations.current(generations.CLIENTS)}'
+
+
 @admin_guard
-def admin_appointments(request: HttpRequest) -> HttpResponse:
+@replica_reads
+@conditional(_analytics_version)
+def admin_analytics(request: HttpRequest) -> JsonResponse:
+    # Reads only the pre-aggregated daily tables (see DailyAppointmentStat),
+    # never the appointments themselves.
+    form = AnalyticsFilterForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    options = form.cleaned_data
+    granularity, start, end = options['granularity'], options['start'], options['end']
+    filters = {name: options[name] for name in DailyAppointmentStat.DIMENSIONS if options[name]}
+    rows = (
+        _analytics_facts(filters)
+        .filter(day__range=(start, end))
+        .annotate(period=ANALYTICS_PERIODS[granularity])
+        .values('period')
+        .annotate(
+            period_bookings=Sum('bookings'),
+            period_completed=Sum('completed'),
+            period_earnings=Sum('earnings'),
+            period_turnaround_seconds=Sum('turnaround_seconds'),
+            period_turnaround_count=Sum('turnaround_count'),
+        )
+        .order_by()
+        .values_list(
+            'period',
+            'period_bookings',
+            'period_completed',
+            'period_earnings',
+            'period_turnaround_seconds',
+            'period_turnaround_count',
+        )
+    )
+    measures = {period: values for period, *values in rows}
+    empty = (0, 0, Decimal('0'), 0, 0)
+    totals = list(empty)
+    series = []
+    period = _period_start(start, granularity)
+    while period <= end:
+        values = measures.get(period, empty)
+        totals = [total + value for total, value in zip(totals, values)]
+        series.append({'period': period.isoformat(), **_analytics_point(*values)})
+        period = _next_period(period, granularity)
+    return JsonResponse(
+        {
+            'granularity': granularity,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'filters': filters,
+            'totals': _analytics_point(*totals),
+            'series': series,
+        }
+    )
+
+
+def _filtered_appointments(request: HttpRequest):
     appointments = Appointment.objects.all()
     status_filter = request.GET.get('status')
     if status_filter:
         appointments = appointments.filter(status=status_filter)
+    return appointments
+
+
+def _filtered_messages(request: HttpRequest):
+    search_query = request.GET.get('q', '').strip()
+    status_filter = request.GET.get('status', '').strip()
+    message_qs = ContactMessage.objects.select_related('client').order_by('-updated_at')
+    if search_query:
+        message_qs = message_qs.filter(
+            Q(client__full_name__icontains=search_query)
+            | Q(client__email__icontains=search_query)
+            | Q(subject__icontains=search_query)
+        )
+    if status_filter:
+        message_qs = message_qs.filter(status=status_filter)
+    return message_qs
+
+
+def _fragment_cache(*versions: str) -> dict:
+    # Version and lifetime for the {% cache %} blocks of an admin table. The
+    # generations are read before any table query runs, so rows rendered
+    # from an older read are stored under a token that is already retired.
+    # A lagging replica can still serve rows older than the newest token, so
+    # replica renders get their own key and only live as long as a writer
+    # stays pinned to the primary.
+    seconds = settings.FRAGMENT_CACHE_SECONDS
+    if reading_replica():
+        versions += ('replica',)
+        seconds = min(seconds, settings.DB_REPLICA_PIN_SECONDS)
+    return {'fragment_version': '-'.join(versions), 'fragment_seconds': seconds}
+
+
+def _appointments_version(request: HttpRequest) -> str:
+    return ':'.join(
+        (generations.current(generations.APPOINTMENTS), catalog.version, request.admin_user.full_name)
+    )
+
+
+@admin_guard
+@replica_reads
+@conditional(_appointments_version)
+def admin_appointments(request: HttpRequest) -> HttpResponse:
+    appointments = _filtered_appointments(request).select_related('assigned_to')
     contact_messages = ContactMessage.objects.select_related('client').all()[:10]
     return render(
         request,
@@ -377,13 +621,16 @@ def admin_appointments(request: HttpRequest) -> HttpResponse:
             'status_choices': Appointment.STATUS_CHOICES,
             'admin_user': request.admin_user,
             'contact_messages': contact_messages,
+            # Rows show service labels from the catalog.
+            'catalog_version': catalog.version,
+            **_fragment_cache(generations.current(generations.APPOINTMENTS), catalog.version),
         },
     )
 
 
 @admin_guard
 def admin_delete_appointment(request: HttpRequest, appointment_id: str) -> HttpResponse:
-    redirect_to = request.POST.get('next') or request.GET.get('next') or reverse('admin_appointments')
+    redirect_to = _next_url(request, reverse('admin_appointments'))
     appointment = get_object_or_404(Appointment, appointment_id=appointment_id)
     if request.method != 'POST':
         messages.error(request, 'Use the delete button to remove an appointment.')
@@ -394,18 +641,209 @@ def admin_delete_appointment(request: HttpRequest, appointment_id: str) -> HttpR
 
 
 @admin_guard
+def admin_queue(request: HttpRequest) -> HttpResponse:
+    appointments = Appointment.objects.filter(
+        assigned_to=request.admin_user, status__in=Appointment.ACTIVE_STATUSES
+    ).order_by('created_at', 'id')
+    unclaimed = Appointment.objects.filter(status=Appointment.STATUS_PENDING, assigned_to__isnull=True).count()
+    return render(
+        request,
+        'admin_queue.html',
+        {'admin_user': request.admin_user, 'appointments': appointments, 'unclaimed': unclaimed},
+    )
+
+
+@admin_guard
+def admin_claim_next(request: HttpRequest) -> HttpResponse:
+    if request.method != 'POST':
+        messages.error(request, 'Use the claim button to take the next appointment.')
+        return redirect('admin_queue')
+    appointment = assignments.claim_next(request.admin_user)
+    if appointment is None:
+        messages.info(request, 'No unassigned pending appointments right now.')
+        return redirect('admin_queue')
+    messages.success(request, f'Appointment {appointment.appointment_id} is now assigned to you.')
+    return redirect('admin_detail', appointment_id=appointment.appointment_id)
+
+
+@admin_guard
+def admin_claim_appointment(request: HttpRequest, appointment_id: str) -> HttpResponse:
+    redirect_to = _next_url(request, reverse('admin_detail', kwargs={'appointment_id': appointment_id}))
+    appointment = get_object_or_404(Appointment, appointment_id=appointment_id)
+    if request.method != 'POST':
+        messages.error(request, 'Use the claim button to take an appointment.')
+    elif assignments.claim(appointment, request.admin_user):
+        messages.success(request, f'Appointment {appointment_id} is now assigned to you.')
+    else:
+        current = Appointment.objects.select_related('assigned_to').get(pk=appointment.pk)
+        if current.status not in Appointment.ACTIVE_STATUSES:
+            messages.warning(
+                request, f'Appointment {appointment_id} is {current.get_status_display().lower()} and cannot be claimed.'
+            )
+        else:
+            holder = current.assigned_to.full_name if current.assigned_to else 'someone else'
+            messages.warning(request, f'Appointment {appointment_id} is already assigned to {holder}.')
+    return redirect(redirect_to)
+
+
+@admin_guard
+def admin_release_appointment(request: HttpRequest, appointment_id: str) -> HttpResponse:
+    redirect_to = _next_url(request, reverse('admin_queue'))
+    appointment = get_object_or_404(Appointment, appointment_id=appointment_id)
+    if request.method != 'POST':
+        messages.error(request, 'Use the release button to hand an appointment back.')
+    elif assignments.release(appointment, request.admin_user):
+        messages.success(request, f'Appointment {appointment_id} is back in the unassigned queue.')
+    else:
+        messages.warning(request, f'Appointment {appointment_id} is not assigned to you.')
+    return redirect(redirect_to)
+
+
+def _apply_bulk_action(action: str, appointment_ids: list[str]) -> list[dict]:
+    with transaction.atomic():
+        rows = list(
+            Appointment.objects.select_for_update()
+            .filter(appointment_id__in=appointment_ids)
+            .annotate(
+                locked=Case(
+                    When(Appointment.management_lock_q(), then=Value(True)),
+                    default=Value(False),
+                    output_field=BooleanField(),
+                )
+            )
+            .values_list('appointment_id', 'locked', 'status', 'client_id', 'created_at')
+        )
+        found = {appointment_id: (locked, status) for appointment_id, locked, status, _client, _created in rows}
+        if action == 'delete':
+            # The per-row delete signals are collected, so counters and daily
+            # facts are recomputed once per affected client and day.
+            with deferred_refreshes():
+                Appointment.objects.filter(appointment_id__in=list(found)).delete()
+            outcome = {appointment_id: 'deleted' for appointment_id in found}
+        else:
+            target_status, _label = BULK_STATUS_ACTIONS[action]
+            outcome = {
+                appointment_id: 'locked' if locked else 'unchanged'
+                for appointment_id, (locked, status) in found.items()
+                if locked or status == target_status
+            }
+            eligible = [appointment_id for appointment_id in found if appointment_id not in outcome]
+            now = timezone.now()
+            updates = {
+                'status': target_status,
+                'updated_at': now,
+                'completed_at': now if target_status == Appointment.STATUS_COMPLETED else None,
+                # Detail pages opened before this change must not save over it.
+                'version': F('version') + 1,
+            }
+            if target_status == Appointment.STATUS_DECLINED:
+                updates['admin_notes'] = Case(
+                    When(admin_notes__icontains='unsupported', then=F('admin_notes')),
+                    default=Concat(Value('Unsupported: '), F('admin_notes'), output_field=TextField()),
+                )
+            # The lock and status rules are repeated in the WHERE clause so a
+            # row that changed since the read above is left alone, even where
+            # that read cannot lock rows.
+            changed = (
+                Appointment.objects.filter(appointment_id__in=eligible)
+                .exclude(Appointment.management_lock_q())
+                .exclude(status=target_status)
+                .update(**updates)
+            )
+            updated_ids = set(eligible)
+            if changed != len(eligible):
+                updated_ids = set(
+                    Appointment.objects.filter(
+                        appointment_id__in=eligible, status=target_status, updated_at=now
+                    ).values_list('appointment_id', flat=True)
+                )
+            if updated_ids:
+                # update() sends no signals; deletes above do.
+                generations.bump_on_commit(generations.APPOINTMENTS, generations.CLIENTS)
+                ClientAccount.refresh_counters(
+                    client_id for appointment_id, _locked, _status, client_id, _created in rows
+                    if appointment_id in updated_ids
+                )
+                DailyAppointmentStat.refresh_days(
+                    local_day(created_at) for appointment_id, _locked, _status, _client, created_at in rows
+                    if appointment_id in updated_ids
+                )
+            if updated_ids and target_status in (Appointment.STATUS_APPROVED, Appointment.STATUS_COMPLETED):
+                queue_status_notifications(
+                    Appointment.objects.filter(appointment_id__in=updated_ids).exclude(notification_email='')
+                )
+            for appointment_id in eligible:
+                outcome[appointment_id] = 'updated' if appointment_id in updated_ids else 'locked'
+    return [
+        {'appointment_id': appointment_id, 'result': outcome.get(appointment_id, 'not_found')}
+        for appointment_id in appointment_ids
+    ]
+
+
+@admin_guard
+def admin_bulk_appointments(request: HttpRequest) -> HttpResponse:
+    redirect_to = _next_url(request, reverse('admin_appointments'))
+    wants_json = 'application/json' in request.headers.get('Accept', '')
+    if request.method != 'POST':
+        messages.error(request, 'Select appointments and choose a bulk action first.')
+        return redirect(redirect_to)
+
+    action = request.POST.get('action', '')
+    appointment_ids = list(dict.fromkeys(value for value in request.POST.getlist('appointment_ids') if value))
+    error = None
+    if action != 'delete' and action not in BULK_STATUS_ACTIONS:
+        error = 'Choose a valid bulk action.'
+    elif not appointment_ids:
+        error = 'Select at least one appointment.'
+    elif len(appointment_ids) > BULK_ACTION_LIMIT:
+        error = f'Bulk actions are limited to {BULK_ACTION_LIMIT} appointments at a time.'
+    if error:
+        if wants_json:
+            return JsonResponse({'error': error}, status=400)
+        messages.error(request, error)
+        return redirect(redirect_to)
+
+    results = _apply_bulk_action(action, appointment_ids)
+    summary = {}
+    for row in results:
+        summary[row['result']] = summary.get(row['result'], 0) + 1
+    if wants_json:
+        return JsonResponse({'action': action, 'summary': summary, 'results': results})
+
+    done_label = 'deleted' if action == 'delete' else BULK_STATUS_ACTIONS[action][1]
+    done = summary.get('deleted', 0) + summary.get('updated', 0)
+    if done:
+        messages.success(request, f'{done} appointment(s) {done_label}.')
+    locked = [row['appointment_id'] for row in results if row['result'] == 'locked']
+    if locked:
+        messages.warning(request, f"Skipped locked appointment(s): {', '.join(locked)}.")
+    unchanged = [row['appointment_id'] for row in results if row['result'] == 'unchanged']
+    if unchanged:
+        messages.info(request, f"Already {done_label}: {', '.join(unchanged)}.")
+    missing = [row['appointment_id'] for row in results if row['result'] == 'not_found']
+    if missing:
+        messages.warning(request, f"Appointment(s) not found: {', '.join(missing)}.")
+    return redirect(redirect_to)
+
+
+def _messages_version(request: HttpRequest) -> str:
+    # Conversations show the client's name.
+    return ':'.join(
+        (
+            generations.current(generations.MESSAGES),
+            generations.current(generations.CLIENTS),
+            request.admin_user.full_name,
+        )
+    )
+
+
+@admin_guard
+@replica_reads
+@conditional(_messages_version)
 def admin_messages(request: HttpRequest) -> HttpResponse:
     search_query = request.GET.get('q', '').strip()
     status_filter = request.GET.get('status', '').strip()
-    message_qs = ContactMessage.objects.select_related('client').order_by('-updated_at')
-    if search_query:
-        message_qs = message_qs.filter(
-            Q(client__full_name__icontains=search_query)
-            | Q(client__email__icontains=search_query)
-            | Q(subject__icontains=search_query)
-        )
-    if status_filter:
-        message_qs = message_qs.filter(status=status_filter)
+    message_qs = _filtered_messages(request)
 
     status_counts = (
         ContactMessage.objects.values('status')
@@ -443,60 +881,6 @@ def admin_messages(request: HttpRequest) -> HttpResponse:
             'statuses': statuses,
         },
     )
-def admin_message_detail(request: HttpRequest, message_id: int) -> HttpResponse:
-    contact_message = get_object_or_404(
-        ContactMessage.objects.select_related('client').prefetch_related('replies__admin'),
-        pk=message_id,
-    )
-    client = contact_message.client
-    thread_messages = (
-        client.contact_messages.select_related('client')
-        .prefetch_related('replies__admin')
-        .order_by('created_at')
-    )
-    active_message = thread_messages.last() or contact_message
-
-    form = AdminMessageReplyForm(request.POST or None)
-    if request.method == 'POST' and form.is_valid():
-        target_id = request.POST.get('message_id')
-        target_message = None
-        if target_id and target_id.isdigit():
-            target_message = thread_messages.filter(pk=int(target_id)).first()
-        if not target_message:
-            target_message = active_message
-        reply = form.save(commit=False)
-        reply.message = target_message
-        reply.admin = request.admin_user
-        reply.save()
-        target_message.admin_reply = reply.body
-        target_message.save(update_fields=['admin_reply', 'updated_at'])
-        messages.success(request, 'Reply sent.')
-        return redirect('admin_message_detail', message_id=message_id)
-
-    client_initials = (
-        ''.join(part[0] for part in client.full_name.split()[:2]).upper()
-        if client and client.full_name
-        else 'CL'
-    )
-    admin_initials = (
-        ''.join(part[0] for part in request.admin_user.full_name.split()[:2]).upper()
-        if request.admin_user.full_name
-        else 'AD'
-    )
-
-    return render(
-        request,
-        'admin_message_detail.html',
-        {
-            'admin_user': request.admin_user,
-            'contact_message': contact_message,
-            'form': form,
-            'client_initials': client_initials,
-            'admin_initials': admin_initials,
-            'thread_messages': thread_messages,
-            'active_message': active_message,
-        },
-    )
 
 
 @admin_guard
@@ -556,10 +940,40 @@ def admin_message_detail(request: HttpRequest, message_id: int) -> HttpResponse:
     )
 
 
+def _save_status_update(appointment: Appointment, version: int) -> bool:
+    # A single conditional UPDATE: it only lands while the row is still at
+    # the version the form was rendered from and not locked, so neither a
+    # concurrent edit nor the lock rules can be slipped past by a stale read.
+    now = timezone.now()
+    with transaction.atomic():
+        updated = (
+            Appointment.objects.filter(pk=appointment.pk, version=version)
+            .exclude(Appointment.management_lock_q())
+            .update(
+                status=appointment.status,
+                quoted_price=appointment.quoted_price,
+                parts_ordered=appointment.parts_ordered,
+                admin_notes=appointment.admin_notes,
+                completed_at=now if appointment.status == Appointment.STATUS_COMPLETED else None,
+                updated_at=now,
+                version=F('version') + 1,
+            )
+        )
+        if not updated:
+            return False
+        # update() sends no signals.
+        generations.bump_on_commit(generations.APPOINTMENTS, generations.CLIENTS)
+        ClientAccount.refresh_counters([appointment.client_id])
+        DailyAppointmentStat.refresh_days([local_day(appointment.created_at)])
+    appointment.version = version + 1
+    return True
+
+
 @admin_guard
 def admin_detail(request: HttpRequest, appointment_id: str) -> HttpResponse:
-    appointment = get_object_or_404(Appointment, appointment_id=appointment_id)
+    appointment = get_object_or_404(Appointment.objects.select_related('assigned_to'), appointment_id=appointment_id)
     is_locked = appointment.is_management_locked
+    conflict = False
     if request.method == 'POST':
         if is_locked:
             messages.warning(
@@ -567,16 +981,29 @@ def admin_detail(request: HttpRequest, appointment_id: str) -> HttpResponse:
                 'This appointment is locked because it was marked completed, rejected, or already has parts ordered.',
             )
             return redirect('admin_detail', appointment_id=appointment_id)
+        previous_status = appointment.status
         form = StatusUpdateForm(request.POST, instance=appointment)
         if form.is_valid():
             updated = form.save(commit=False)
             if updated.status == Appointment.STATUS_DECLINED and 'unsupported' not in updated.admin_notes.lower():
                 updated.admin_notes = f'Unsupported: {updated.admin_notes}'
-            updated.save()
-            if updated.is_management_locked:
-                messages.info(request, 'Appointment locked. Replacement parts ordered and approval recorded.')
-            messages.success(request, 'Appointment updated successfully.')
-            return redirect('admin_detail', appointment_id=appointment_id)
+            if _save_status_update(updated, form.cleaned_data['version']):
+                if updated.status != previous_status:
+                    queue_status_notification(updated)
+                if updated.is_management_locked:
+                    messages.info(request, 'Appointment locked. Replacement parts ordered and approval recorded.')
+                messages.success(request, 'Appointment updated successfully.')
+                return redirect('admin_detail', appointment_id=appointment_id)
+            appointment = Appointment.objects.select_related('assigned_to').get(pk=appointment.pk)
+            if appointment.is_management_locked:
+                messages.warning(request, 'This appointment was locked by another update before your changes were saved.')
+                return redirect('admin_detail', appointment_id=appointment_id)
+            # Someone else saved first. Keep what this user typed, shown
+            # against the current values; saving again applies it on purpose.
+            data = request.POST.copy()
+            data['version'] = appointment.version
+            form = StatusUpdateForm(data, instance=appointment)
+            conflict = True
     else:
         form = StatusUpdateForm(instance=appointment)
         if appointment.service_price and not appointment.quoted_price:
@@ -592,23 +1019,84 @@ def admin_detail(request: HttpRequest, appointment_id: str) -> HttpResponse:
             'form': form,
             'admin_user': request.admin_user,
             'is_locked': is_locked,
+            'conflict': conflict,
         },
+        status=409 if conflict else 200,
     )
 
 
+def _filtered_clients(request: HttpRequest):
+    clients = ClientAccount.objects.all()
+    search_query = request.GET.get('q', '').strip().lower()
+    if search_query:
+        # Prefix ranges on lower-cased columns, so each branch is served by an
+        # index (email is stored lower-cased already).
+        upper_bound = search_query + '\U0010ffff'
+        clients = clients.alias(name_lower=Lower('full_name'), student_id_lower=Lower('student_id')).filter(
+            Q(name_lower__gte=search_query, name_lower__lt=upper_bound)
+            | Q(email__gte=search_query, email__lt=upper_bound)
+            | Q(student_id_lower__gte=search_query, student_id_lower__lt=upper_bound)
+        )
+    return clients
+
+
+def _encode_cursor(client: ClientAccount) -> str:
+    raw = json.dumps([client.full_name, client.id]).encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(value: str) -> tuple[str, int] | None:
+    try:
+        full_name, client_id = json.loads(urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+        return str(full_name), int(client_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def _clients_page(request: HttpRequest) -> dict:
+    clients = _filtered_clients(request)
+    after = _decode_cursor(request.GET.get('after', ''))
+    before = None if after else _decode_cursor(request.GET.get('before', ''))
+    if after:
+        name, client_id = after
+        clients = clients.filter(Q(full_name__gt=name) | Q(full_name=name, id__gt=client_id))
+    elif before:
+        name, client_id = before
+        clients = clients.filter(Q(full_name__lt=name) | Q(full_name=name, id__lt=client_id))
+    ordering = ('-full_name', '-id') if before else ('full_name', 'id')
+    page = list(clients.order_by(*ordering)[: CLIENTS_PAGE_SIZE + 1])
+    has_more = len(page) > CLIENTS_PAGE_SIZE
+    page = page[:CLIENTS_PAGE_SIZE]
+    if before:
+        page.reverse()
+
+    base_query = request.GET.copy()
+    base_query.pop('after', None)
+    base_query.pop('before', None)
+    next_url = prev_url = None
+    if page and (has_more or before):
+        next_query = base_query.copy()
+        next_query['after'] = _encode_cursor(page[-1])
+        next_url = f'?{next_query.urlencode()}'
+    if page and (after or (before and has_more)):
+        prev_query = base_query.copy()
+        prev_query['before'] = _encode_cursor(page[0])
+        prev_url = f'?{prev_query.urlencode()}'
+    return {'clients': page, 'next_url': next_url, 'prev_url': prev_url}
+
+
 @admin_guard
+@replica_reads
 def admin_clients(request: HttpRequest) -> HttpResponse:
-    clients = (
-        ClientAccount.objects.annotate(appointment_count=Count('appointments'))
-        .order_by('full_name')
-        .all()
-    )
     return render(
         request,
         'admin_clients.html',
         {
-            'clients': clients,
+            # Only evaluated when the cached table fragment misses.
+            'page': SimpleLazyObject(lambda: _clients_page(request)),
+            'search_query': request.GET.get('q', '').strip(),
             'admin_user': request.admin_user,
+            **_fragment_cache(generations.current(generations.CLIENTS)),
         },
     )
 
@@ -691,6 +1179,235 @@ def admin_settings(request: HttpRequest) -> HttpResponse:
     )
 
 
+def _form_errors(form) -> str:
+    return ' '.join(error for errors in form.errors.values() for error in errors)
+
+
+def _save_prices(request: HttpRequest, device_type: str) -> int:
+    # Raises on the first invalid value so the caller's transaction rolls
+    # back every price saved before it.
+    changed = 0
+    for offering in ServiceOffering.objects.filter(device_type=device_type).select_related('price'):
+        raw = request.POST.get(f'price_{offering.id}', '').strip()
+        if not raw:
+            continue
+        try:
+            amount = int(raw)
+        except ValueError:
+            raise ValidationError(f'Price for {offering.label} must be a whole number.')
+        if amount < 0:
+            raise ValidationError(f'Price for {offering.label} cannot be negative.')
+        price = getattr(offering, 'price', None) or ServicePrice(offering=offering)
+        if price.pk is None or price.amount != amount:
+            price.amount = amount
+            price.save()
+            changed += 1
+    return changed
+
+
+@admin_guard
+def admin_catalog(request: HttpRequest) -> HttpResponse:
+    device_types = dict(Appointment.DEVICE_CHOICES)
+    device_type = request.GET.get('device', '')
+    if device_type not in device_types:
+        device_type = Appointment.DEVICE_CHOICES[0][0]
+    service_form = ServiceOfferingForm(prefix='service', instance=ServiceOffering(device_type=device_type))
+    brand_form = DeviceBrandForm(prefix='brand', instance=DeviceBrand(device_type=device_type))
+    model_form = DeviceModelForm(prefix='model', device_type=device_type)
+
+    if request.method == 'POST':
+        # Every edit goes through Model.save()/delete() so the catalog
+        # signals bump the snapshot generation once the transaction commits.
+        action = request.POST.get('action', '')
+        if action == 'save_prices':
+            try:
+                with transaction.atomic():
+                    changed = _save_prices(request, device_type)
+            except ValidationError as exc:
+                messages.error(request, f"{exc.messages[0]} No prices were changed.")
+            else:
+                messages.success(request, f'Updated {changed} price(s).' if changed else 'Prices unchanged.')
+        elif action == 'add_service':
+            service_form = ServiceOfferingForm(
+                request.POST, prefix='service', instance=ServiceOffering(device_type=device_type)
+            )
+            if service_form.is_valid():
+                with transaction.atomic():
+                    offering = service_form.save()
+                    ServicePrice.objects.create(offering=offering, amount=service_form.cleaned_data['amount'])
+                messages.success(request, f'Added {offering.label}.')
+            else:
+                messages.error(request, _form_errors(service_form))
+        elif action == 'add_brand':
+            brand_form = DeviceBrandForm(request.POST, prefix='brand', instance=DeviceBrand(device_type=device_type))
+            if brand_form.is_valid():
+                brand = brand_form.save()
+                messages.success(request, f'Added {brand.label}.')
+            else:
+                messages.error(request, _form_errors(brand_form))
+        elif action == 'add_model':
+            model_form = DeviceModelForm(request.POST, prefix='model', device_type=device_type)
+            if model_form.is_valid():
+                device_model = model_form.save()
+                messages.success(request, f'Added {device_model.name} to {device_model.brand.label}.')
+            else:
+                messages.error(request, _form_errors(model_form))
+        elif action in ('delete_service', 'delete_brand', 'delete_model'):
+            queryset = {
+                'delete_service': ServiceOffering.objects.filter(device_type=device_type),
+                'delete_brand': DeviceBrand.objects.filter(device_type=device_type),
+                'delete_model': DeviceModel.objects.filter(brand__device_type=device_type),
+            }[action]
+            target = queryset.filter(pk=request.POST.get('target_id') or 0).first()
+            if target is None:
+                messages.error(request, 'That catalog entry no longer exists.')
+            else:
+                target.delete()
+                messages.success(request, f'Removed {target}.')
+        else:
+            messages.error(request, 'Unknown catalog action.')
+        return redirect(f"{reverse('admin_catalog')}?device={device_type}")
+
+    return render(
+        request,
+        'admin_catalog.html',
+        {
+            'device_type': device_type,
+            'device_types': Appointment.DEVICE_CHOICES,
+            'services': ServiceOffering.objects.filter(device_type=device_type).select_related('price'),
+            'brands': DeviceBrand.objects.filter(device_type=device_type).prefetch_related('device_models'),
+            'service_form': service_form,
+            'brand_form': brand_form,
+            'model_form': model_form,
+        },
+    )
+
+
+@admin_guard
+@replica_reads
+def admin_export_appointments(request: HttpRequest) -> HttpResponse:
+    return stream_export(
+        _filtered_appointments(request),
+        APPOINTMENT_EXPORT_FIELDS,
+        request.GET.get('format', 'csv'),
+        'appointments',
+    )
+
+
+@admin_guard
+@replica_reads
+def admin_export_clients(request: HttpRequest) -> HttpResponse:
+    return stream_export(
+        _filtered_clients(request),
+        CLIENT_EXPORT_FIELDS,
+        request.GET.get('format', 'csv'),
+        'clients',
+    )
+
+
+@admin_guard
+@replica_reads
+def admin_export_messages(request: HttpRequest) -> HttpResponse:
+    return stream_export(
+        _filtered_messages(request),
+        MESSAGE_EXPORT_FIELDS,
+        request.GET.get('format', 'csv'),
+        'messages',
+    )
+
+
+@admin_guard
+def admin_queries(request: HttpRequest) -> HttpResponse:
+    sort = request.GET.get('sort', 'total')
+    if sort not in querylog.QUERYLOG_SORTS:
+        sort = 'total'
+    view_filter = request.GET.get('view', '').strip()
+    entries = querylog.report(sort)
+    views = sorted({entry['view'] for entry in entries})
+    if view_filter:
+        entries = [entry for entry in entries if entry['view'] == view_filter]
+    for entry in entries[:200]:
+        for key in ('total', 'mean', 'max'):
+            entry[f'{key}_ms'] = entry[f'{key}_seconds'] * 1000
+    return render(
+        request,
+        'admin_queries.html',
+        {
+            'admin_user': request.admin_user,
+            'entries': entries[:200],
+            'total_shapes': len(entries),
+            'sort': sort,
+            'sort_choices': querylog.QUERYLOG_SORTS,
+            'view_filter': view_filter,
+            'views': views,
+            'slow_ms': settings.QUERYLOG_SLOW_MS,
+        },
+    )
+
+
+@admin_guard
+def admin_queries_export(request: HttpRequest) -> HttpResponse:
+    entries = querylog.report(request.GET.get('sort', 'total'), request.GET.get('view', '').strip())
+    fields = querylog.EXPORT_FIELDS
+    return stream_rows(
+        ([entry[field] for field in fields] for entry in entries),
+        fields,
+        request.GET.get('format', 'csv'),
+        'query-log',
+    )
+
+
+@admin_guard
+def admin_queries_reset(request: HttpRequest) -> HttpResponse:
+    if request.method == 'POST':
+        querylog.reset()
+        messages.success(request, 'Query statistics cleared.')
+    return redirect('admin_queries')
+
+
+@admin_guard
+def admin_profiles(request: HttpRequest) -> HttpResponse:
+    return render(
+        request,
+        'admin_profiles.html',
+        {'admin_user': request.admin_user, 'profiles': list_profiles()},
+    )
+
+
+@admin_guard
+def admin_profile_detail(request: HttpRequest, profile_id: str) -> HttpResponse:
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise Http404('Profile not found.')
+    sort = request.GET.get('sort', 'cumulative')
+    if sort not in PROFILE_SORTS:
+        sort = 'cumulative'
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 40)), 500))
+    except ValueError:
+        limit = 40
+    return render(
+        request,
+        'admin_profile_detail.html',
+        {
+            'admin_user': request.admin_user,
+            'profile': profile,
+            'functions': top_functions(profile_id, sort, limit),
+            'sort': sort,
+            'sort_choices': PROFILE_SORTS,
+            'limit': limit,
+        },
+    )
+
+
+@admin_guard
+def admin_profile_download(request: HttpRequest, profile_id: str) -> HttpResponse:
+    path = stats_path(profile_id)
+    if path is None:
+        raise Http404('Profile not found.')
+    return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
+
+
 def terms_of_service(request: HttpRequest) -> HttpResponse:
     return render(request, 'tos.html')
 
@@ -703,8 +1420,10 @@ def tracking_policy(request: HttpRequest) -> HttpResponse:
     return render(request, 'tracking.html')
 
 
+@rate_limit('login-ip', '20/m')
+@rate_limit('client-login', '10/h', key=request_field('email'))
 def client_login(request: HttpRequest) -> HttpResponse:
-    next_url = request.GET.get('next') or request.POST.get('next') or reverse('book_appointment')
+    next_url = _next_url(request, reverse('book_appointment'))
     if _get_logged_client(request):
         return redirect(next_url)
 
@@ -753,6 +1472,8 @@ def client_register(request: HttpRequest) -> HttpResponse:
     return render(request, 'client_register.html', {'form': form})
 
 
+@rate_limit('contact-ip', '20/m')
+@rate_limit('contact-client', '10/m', key=session_client)
 @_client_guard
 def contact_admin(request: HttpRequest) -> HttpResponse:
     client = request.client_user  # type: ignore[attr-defined]
@@ -790,15 +1511,49 @@ def contact_admin(request: HttpRequest) -> HttpResponse:
     )
 
 
+def _thread_version(count: int, updated) -> str:
+    # Replies and status changes both bump ContactMessage.updated_at.
+    return f"{count}:{updated.isoformat() if updated else ''}"
+
+
+async def _current_thread_version(client: ClientAccount) -> str:
+    state = await client.contact_messages.aaggregate(count=Count('id'), updated=Max('updated_at'))
+    return _thread_version(state['count'], state['updated'])
+
+
+def _release_idle_connections() -> None:
+    # A waiting long-poll must not pin a database connection, or the number
+    # of waiters is capped by the database instead of the event loop. The
+    # next check reconnects. Connections inside a transaction stay open.
+    for db_connection in connections.all(initialized_only=True):
+        if not db_connection.in_atomic_block:
+            db_connection.close()
+
+
 @_client_guard
-def contact_admin_history(request: HttpRequest) -> JsonResponse:
+async def contact_admin_history(request: HttpRequest) -> HttpResponse:
+    # Long-poll: with ?since=<version> the request is held until the thread
+    # changes or MESSENGER_LONGPOLL_SECONDS pass (204). Only pages served over
+    # ASGI are told to long-poll; a sync worker would be tied up meanwhile.
     client = request.client_user  # type: ignore[attr-defined]
+    since = request.GET.get('since')
+    if since:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.MESSENGER_LONGPOLL_SECONDS
+        while await _current_thread_version(client) == since:
+            if loop.time() >= deadline:
+                return HttpResponse(status=204)
+            await sync_to_async(_release_idle_connections)()
+            await asyncio.sleep(min(settings.MESSENGER_LONGPOLL_INTERVAL, deadline - loop.time()))
     messages_qs = client.contact_messages.order_by('created_at').prefetch_related('replies__admin')
-    admin_profiles, primary_admin = _admin_profiles_with_primary()
+    admins = [admin async for admin in AdminUser.objects.order_by('full_name')]
+    admin_profiles, primary_admin = _admin_profiles_with_primary(admins)
     payload = []
-    for message in messages_qs:
+    latest = None
+    async for message in messages_qs:
+        latest = max(latest, message.updated_at) if latest else message.updated_at
         replies = []
-        for reply in message.replies.select_related('admin').all():
+        for reply in message.replies.all():
             admin = reply.admin
             replies.append(
                 {
@@ -833,4 +1588,12 @@ def contact_admin_history(request: HttpRequest) -> JsonResponse:
         'initials': primary_admin['initials'] if primary_admin else 'RC',
         'name': primary_admin['name'] if primary_admin else 'Repair Crew',
     }
-    return JsonResponse({'messages': payload, 'admin': admin_meta})
+    return JsonResponse(
+        {
+            'messages': payload,
+            'admin': admin_meta,
+            'version': _thread_version(len(payload), latest),
+            'longpoll': isinstance(request, ASGIRequest),
+            'poll_ms': settings.MESSENGER_POLL_MS,
+        }
+    )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template import engines
+from django.urls import reverse
+
+from .routers import REPLICA_ALIAS
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def _load_pillow() -> None:
+    # ImageField validation imports Pillow and registers its format plugins
+    # on first use; both are slow.
+    from PIL import Image
+
+    Image.init()
+
+
+def _build_catalog() -> None:
+    # The snapshot is read from the database. Close that connection again so
+    # workers forked from a preloaded master never share it.
+    from .catalog import catalog
+
+    catalog.load()
+    connections.close_all()
+
+
+def _resolve_urls() -> None:
+    # Imports the URLconf (and every view module) and fills the reverse cache.
+    reverse('home')
+
+
+def _compile_templates() -> None:
+    # Only the project's own templates; contrib.admin's are never rendered.
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for engine in engines.all():
+        for directory in map(Path, engine.template_dirs):
+            if not directory.resolve().is_relative_to(base_dir):
+                continue
+            for path in sorted(directory.rglob('*')):
+                if path.is_file() and path.suffix in TEMPLATE_SUFFIXES:
+                    engine.get_template(path.relative_to(directory).as_posix())
+
+
+def _prime_caches() -> None:
+    for alias in settings.CACHES:
+        caches[alias].get('warmup')
+
+
+WARMUP_STEPS = [
+    ('pillow', _load_pillow),
+    ('catalog', _build_catalog),
+    ('urls', _resolve_urls),
+    ('templates', _compile_templates),
+    ('caches', _prime_caches),
+]
+
+
+def warm_up() -> dict[str, float]:
+    # Safe before gunicorn forks: nothing here leaves a socket or database
+    # connection open for the workers to share.
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def open_connections() -> None:
+    # Run in each worker after fork. Only worth it when connections persist
+    # (CONN_MAX_AGE != 0); otherwise Django closes them at the first request.
+    for alias in connections:
+        if alias == REPLICA_ALIAS and not settings.READ_REPLICA_ENABLED:
+            continue
+        connection = connections[alias]
+        if connection.settings_dict['CONN_MAX_AGE'] != 0:
+            connection.ensure_connection()
@@ -9,8 +9,24 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'biprepair.settings')
+# Under ASGI each request gets its own database connections (they follow the
+# request's context, not a worker thread), so persistent ones would only pile
+# up until garbage collection.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
+# Serves the async JSON endpoints (messenger history long-poll, status lookup)
+# next to the WSGI app, e.g. with the same gunicorn.conf.py:
+#   gunicorn -k uvicorn.workers.UvicornWorker biprepair.asgi:application
+# and the proxy sending /clients/contact/history/ and /status/lookup/ here.
+# Every middleware in settings.MIDDLEWARE is async-capable, so nothing below
+# the server holds a thread while a long-poll waits.
 application = get_asgi_application()
+
+if settings.WARMUP_ON_LOAD:
+    from appointments.warmup import warm_up
+
+    warm_up()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 try:
@@ -52,11 +53,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'appointments.metrics.RequestMetricsMiddleware',
+    'appointments.querylog.QueryLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'appointments.staticfiles.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'appointments.routers.ReplicaPinMiddleware',
+    'appointments.profiling.ProfilingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    # Inside CsrfViewMiddleware, which clears the "token was rendered" flag
+    # once it has set the cookie.
+    'appointments.compression.CompressionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -66,7 +74,7 @@ ROOT_URLCONF = 'biprepair.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'appointments.metrics.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -92,6 +100,13 @@ USE_MYSQL = all(
     for key in ['MYSQL_DATABASE', 'MYSQL_USER', 'MYSQL_PASSWORD', 'MYSQL_HOST', 'MYSQL_PORT']
 )
 
+# Seconds a worker keeps its database connection between requests ("none"
+# for unlimited, 0 to reconnect every request). Health checks re-validate a
+# reused connection before its first query in each request.
+_conn_max_age = os.getenv('DB_CONN_MAX_AGE', '60')
+DB_CONN_MAX_AGE = None if _conn_max_age.lower() == 'none' else int(_conn_max_age)
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true'
+
 if USE_MYSQL:
     DATABASES = {
         'default': {
@@ -102,16 +117,59 @@ if USE_MYSQL:
             'HOST': os.getenv('MYSQL_HOST'),
             'PORT': os.getenv('MYSQL_PORT'),
             'OPTIONS': {'charset': 'utf8mb4'},
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH') or BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
 
+# Read replica for heavy admin reads (see appointments.routers). Set
+# MYSQL_REPLICA_HOST (other MYSQL_REPLICA_* fall back to the primary's values)
+# or SQLITE_REPLICA_PATH to enable it. Without one the "replica" alias points
+# at the primary and the router never uses it. A session that just wrote
+# stays on the primary for DB_REPLICA_PIN_SECONDS so it reads its own writes.
+if USE_MYSQL:
+    READ_REPLICA_ENABLED = bool(os.getenv('MYSQL_REPLICA_HOST'))
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('MYSQL_REPLICA_DATABASE') or DATABASES['default']['NAME'],
+        'USER': os.getenv('MYSQL_REPLICA_USER') or DATABASES['default']['USER'],
+        'PASSWORD': os.getenv('MYSQL_REPLICA_PASSWORD') or DATABASES['default']['PASSWORD'],
+        'HOST': os.getenv('MYSQL_REPLICA_HOST') or DATABASES['default']['HOST'],
+        'PORT': os.getenv('MYSQL_REPLICA_PORT') or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+else:
+    READ_REPLICA_ENABLED = bool(os.getenv('SQLITE_REPLICA_PATH'))
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('SQLITE_REPLICA_PATH') or DATABASES['default']['NAME'],
+    }
+DATABASE_ROUTERS = ['appointments.routers.ReplicaRouter']
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '5'))
+
+# Applied by appointments.signals on every new SQLite connection. WAL lets
+# readers run alongside the single writer, and busy_timeout makes a writer
+# wait for the lock instead of failing with "database is locked".
+# SQLITE_TUNING=false connects with SQLite's defaults.
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', 'True').lower() == 'true'
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-20000')),
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNING else {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -155,6 +213,114 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Email / status notifications
+# Without EMAIL_HOST the notices are printed to the console rather than
+# failing against a mail server that isn't there. Point EMAIL_HOST/EMAIL_PORT
+# at a local stand-in such as `python -m aiosmtpd -n -l localhost:1025` to
+# inspect outgoing notices over SMTP.
+
+_email_host = os.getenv('EMAIL_HOST', '')
+EMAIL_BACKEND = os.getenv('DJANGO_EMAIL_BACKEND') or (
+    'django.core.mail.backends.smtp.EmailBackend' if _email_host else 'django.core.mail.backends.console.EmailBackend'
+)
+EMAIL_HOST = _email_host or 'localhost'
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False').lower() == 'true'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '10'))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Student-Technician Repair HUB <no-reply@repairhub.local>')
+
+# Seconds to coalesce Approved/Completed notices before they go out over one
+# SMTP connection. Use 0 to send right after the update commits.
+NOTIFICATION_BATCH_WINDOW = float(os.getenv('NOTIFICATION_BATCH_WINDOW', '5'))
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '100'))
+
+# Rows fetched per round-trip by the streaming CSV/NDJSON admin exports.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Per-view latency/query metrics. Each gunicorn worker writes its totals to
+# METRICS_DIR and /metrics merges them; scrapers authenticate with
+# "Authorization: Bearer $METRICS_TOKEN" (admins can also open it signed in).
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'repairhub-metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Per-view SQL fingerprint stats (count, total/max time) for the admin query
+# report. Statements slower than QUERYLOG_SLOW_MS get their EXPLAIN plan
+# captured; each worker keeps at most QUERYLOG_MAX_ENTRIES shapes.
+QUERYLOG_ENABLED = os.getenv('QUERYLOG_ENABLED', 'True').lower() == 'true'
+QUERYLOG_SLOW_MS = float(os.getenv('QUERYLOG_SLOW_MS', '100'))
+QUERYLOG_MAX_ENTRIES = int(os.getenv('QUERYLOG_MAX_ENTRIES', '2000'))
+QUERYLOG_DIR = os.getenv('QUERYLOG_DIR', os.path.join(tempfile.gettempdir(), 'repairhub-querylog'))
+
+# Signed-in admins can profile a single request by adding ?__profile=1 or an
+# X-Profile header. The pstats dump and SQL log land in PROFILE_DIR and are
+# browsable under /admin/profiles/; only the newest PROFILE_KEEP are kept.
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'repairhub-profiles'))
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '50'))
+
+# Shared by every worker on the host. Holds the generation tokens
+# (appointments.generations), so it must not be a per-process cache.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'repairhub-cache')),
+    },
+    # Rendered admin table fragments. Per process on purpose: the file cache
+    # scans its directory on every write and culls at a few hundred entries.
+    # Keys carry the table generation from the default cache, so an edit in
+    # one worker still retires every worker's copy.
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'repairhub-fragments',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('FRAGMENT_CACHE_ENTRIES', '5000'))},
+    },
+}
+# How often a worker checks whether the catalog was edited elsewhere.
+CATALOG_CHECK_SECONDS = float(os.getenv('CATALOG_CHECK_SECONDS', '2'))
+# Upper bound on how long a rendered admin table fragment is reused. Pages
+# read from the replica are kept no longer than DB_REPLICA_PIN_SECONDS.
+FRAGMENT_CACHE_SECONDS = int(os.getenv('FRAGMENT_CACHE_SECONDS', '600'))
+
+# Conditional GET (appointments.conditional): list pages and status lookups
+# answer 304 Not Modified while their data is unchanged. APP_RELEASE names the
+# deployed build; when unset it is derived from the template files.
+CONDITIONAL_GET_ENABLED = os.getenv('CONDITIONAL_GET_ENABLED', 'True').lower() == 'true'
+APP_RELEASE = os.getenv('APP_RELEASE', '')
+
+# Compression of dynamic responses (appointments.compression): gzip, or br
+# when the optional Brotli package is installed. Bodies under
+# COMPRESSION_MIN_BYTES aren't worth the CPU; streamed exports always qualify.
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Messenger history long-poll: a request carrying the thread version it
+# already has waits up to MESSENGER_LONGPOLL_SECONDS for a change, re-checking
+# every MESSENGER_LONGPOLL_INTERVAL seconds. Pages only long-poll when the
+# endpoint is served over ASGI (biprepair/asgi.py); otherwise they re-fetch
+# every MESSENGER_POLL_MS.
+MESSENGER_LONGPOLL_SECONDS = float(os.getenv('MESSENGER_LONGPOLL_SECONDS', '25'))
+MESSENGER_LONGPOLL_INTERVAL = float(os.getenv('MESSENGER_LONGPOLL_INTERVAL', '1'))
+MESSENGER_POLL_MS = int(os.getenv('MESSENGER_POLL_MS', '6000'))
+
+# Token buckets for login and lookup endpoints (appointments/ratelimit.py),
+# kept in a SQLite file shared by every worker on the host. Behind a proxy,
+# point the client IP header at the one it sets, e.g. HTTP_X_REAL_IP.
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True').lower() == 'true'
+RATELIMIT_CLIENT_IP_HEADER = os.getenv('RATELIMIT_CLIENT_IP_HEADER', 'REMOTE_ADDR')
+RATELIMIT_DB_PATH = os.getenv(
+    'RATELIMIT_DB_PATH', os.path.join(tempfile.gettempdir(), 'repairhub-ratelimit.sqlite3')
+)
+
+# Warm each server process before it takes traffic: Pillow, catalog maps, URL
+# resolver, compiled templates and cache clients at WSGI load (once in the
+# gunicorn master with preload_app), and DB connections in every worker via
+# gunicorn.conf.py.
+WARMUP_ON_LOAD = os.getenv('WARMUP_ON_LOAD', 'True').lower() == 'true'
+
 LOGIN_URL = 'admin_login'
 LOGOUT_REDIRECT_URL = 'home'
 
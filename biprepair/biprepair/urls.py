@@ -25,6 +25,7 @@ from appointments import views as appointment_views
 urlpatterns = [
     path('admin/', appointment_views.admin_login, name='admin_root'),
     path('service-worker.js', appointment_views.service_worker, name='service_worker'),
+    path('metrics', appointment_views.metrics, name='metrics'),
     path('', include('appointments.urls')),
 ]
 
@@ -0,0 +1,24 @@
+# Picked up automatically when gunicorn runs from this directory.
+import gc
+import os
+
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+# Import and warm the app once in the master so workers fork already warm and
+# share those pages copy-on-write.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach, so a GC pass
+    # in a worker doesn't write to (and un-share) the preloaded pages.
+    if preload_app:
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+
+    if settings.WARMUP_ON_LOAD:
+        from appointments.warmup import open_connections
+
+        open_connections()
@@ -643,32 +643,61 @@ document.addEventListener('DOMContentLoaded', () => {
             threadEl.scrollTop = threadEl.scrollHeight;
         };
 
+        // Served over ASGI the endpoint holds a request carrying `since` until
+        // the thread changes (or answers 204), so the next request goes out
+        // straight away; otherwise it answers at once and we wait poll_ms.
+        let polling = false;
+        let version = '';
+        let controller = null;
+
         const fetchMessages = async () => {
+            let delay = 6000;
+            controller = new AbortController();
             try {
-                const response = await fetch(historyUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
-                if (!response.ok) throw new Error(`History request failed: ${response.status}`);
-                const data = await response.json();
-                const signature = JSON.stringify(
-                    data.messages.map((msg) => `${msg.id}-${msg.updated_iso}-${msg.admin_reply || ''}`),
-                );
-                if (signature === lastSignature) return;
-                lastSignature = signature;
-                renderThread(data.messages || [], data.admin || {});
+                const url = new URL(historyUrl, window.location.origin);
+                if (version) url.searchParams.set('since', version);
+                const response = await fetch(url, {
+                    headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                    signal: controller.signal,
+                });
+                if (response.status === 204) {
+                    delay = 0;
+                } else {
+                    if (!response.ok) throw new Error(`History request failed: ${response.status}`);
+                    const data = await response.json();
+                    delay = data.poll_ms || delay;
+                    if (data.longpoll) {
+                        version = data.version;
+                        delay = 0;
+                    }
+                    const signature = JSON.stringify(
+                        data.messages.map((msg) => `${msg.id}-${msg.updated_iso}-${msg.admin_reply || ''}`),
+                    );
+                    if (signature !== lastSignature) {
+                        lastSignature = signature;
+                        renderThread(data.messages || [], data.admin || {});
+                    }
+                }
             } catch (error) {
+                if (error.name === 'AbortError') return;
                 console.error('[contact-admin] Unable to refresh thread', error);
             }
+            if (polling) pollTimer = setTimeout(fetchMessages, delay);
         };
 
         const startPolling = () => {
+            if (polling) return;
+            polling = true;
             fetchMessages();
-            pollTimer = setInterval(fetchMessages, 6000);
         };
 
         const stopPolling = () => {
+            polling = false;
             if (pollTimer) {
-                clearInterval(pollTimer);
+                clearTimeout(pollTimer);
                 pollTimer = null;
             }
+            controller?.abort();
         };
 
         document.addEventListener('visibilitychange', () => {
@@ -717,6 +746,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 if (!formId) return;
                 const form = document.getElementById(formId);
                 if (!(form instanceof HTMLFormElement)) return;
+                if (button.dataset.deleteAction) form.action = button.dataset.deleteAction;
                 openModal({
                     id: button.dataset.appointmentId || 'this appointment',
                     client: button.dataset.appointmentClient || 'this client',
@@ -743,6 +773,47 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     };
 
+    const initializeBulkActions = () => {
+        const form = document.querySelector('[data-bulk-form]');
+        if (!(form instanceof HTMLFormElement)) return;
+        const selectAll = document.querySelector('[data-bulk-select-all]');
+        const boxes = Array.from(document.querySelectorAll('[data-bulk-select]'));
+        const countEl = form.querySelector('[data-bulk-count]');
+
+        const refreshCount = () => {
+            const selected = boxes.filter((box) => box.checked).length;
+            if (countEl) countEl.textContent = `${selected} selected`;
+            if (selectAll instanceof HTMLInputElement) {
+                selectAll.checked = selected > 0 && selected === boxes.length;
+                selectAll.indeterminate = selected > 0 && selected < boxes.length;
+            }
+        };
+
+        selectAll?.addEventListener('change', () => {
+            boxes.forEach((box) => {
+                box.checked = selectAll.checked;
+            });
+            refreshCount();
+        });
+        boxes.forEach((box) => box.addEventListener('change', refreshCount));
+
+        form.addEventListener('submit', (event) => {
+            const selected = boxes.filter((box) => box.checked).length;
+            const action = form.querySelector('select[name="action"]');
+            if (!selected) {
+                event.preventDefault();
+                return;
+            }
+            if (action instanceof HTMLSelectElement && action.value === 'delete') {
+                if (!window.confirm(`Permanently delete ${selected} appointment(s)? This cannot be undone.`)) {
+                    event.preventDefault();
+                }
+            }
+        });
+        refreshCount();
+    };
+
     initializeContactMessenger();
     initializeDeleteModal();
+    initializeBulkActions();
 });